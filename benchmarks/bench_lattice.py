@@ -0,0 +1,53 @@
+"""Benchmarks for element positions and element lookups over a whole ring."""
+import pytest
+
+import pytac
+
+
+def bench_element_s(benchmark, vmx_lattice):
+    positions = benchmark(lambda: [element.s for element in vmx_lattice])
+    assert len(positions) == len(vmx_lattice)
+
+
+def bench_element_index(benchmark, vmx_lattice):
+    indices = benchmark(lambda: [element.index for element in vmx_lattice])
+    assert indices[-1] == len(vmx_lattice)
+
+
+@pytest.mark.parametrize("family", ["BPM", "QUAD", "HSTR"])
+def bench_get_elements_by_family(benchmark, vmx_lattice, family):
+    assert benchmark(vmx_lattice.get_elements, family)
+
+
+def bench_get_elements_by_cell(benchmark, vmx_lattice):
+    assert benchmark(vmx_lattice.get_elements, "BPM", cell=12)
+
+
+def bench_cell_bounds(benchmark, vmx_lattice):
+    assert len(benchmark(lambda: vmx_lattice.cell_bounds)) == 25
+
+
+def bench_diff(benchmark, vmx_lattice, lattice):
+    benchmark(vmx_lattice.diff, lattice)
+
+
+def bench_view_by_cell(benchmark, vmx_lattice):
+    assert len(benchmark(vmx_lattice.view, cell=12))
+
+
+def bench_elements_between(benchmark, vmx_lattice):
+    assert benchmark(vmx_lattice.elements_between, 100.0, 150.0)
+
+
+def bench_nearest_of_many_positions(benchmark, vmx_lattice):
+    positions = [0.1 * i for i in range(5000)]
+    assert len(benchmark(vmx_lattice.nearest, positions, "BPM")) == 5000
+
+
+def bench_lookup_pvs(benchmark, vmx_lattice):
+    pvs = vmx_lattice.get_element_pv_names("BPM", "x", pytac.RB)
+    assert all(benchmark(vmx_lattice.lookup_pvs, pvs))
+
+
+def bench_get_elements_with_field(benchmark, vmx_lattice):
+    assert benchmark(vmx_lattice.get_elements_with_field, "x_kick")
@@ -0,0 +1,28 @@
+"""Benchmarks for loading lattices from csv files."""
+import pytac
+from pytac.memory_cs import InMemoryControlSystem
+
+
+def bench_load(benchmark, mode, control_system):
+    benchmark.group = "load " + mode
+    lattice = benchmark(pytac.load_csv.load, mode, control_system, symmetry=24)
+    assert len(lattice) > 2000
+
+
+def bench_load_npz(benchmark, tmpdir_factory, mode, control_system):
+    benchmark.group = "load " + mode
+    filename = str(tmpdir_factory.mktemp("npz").join(mode + ".npz"))
+    pytac.load_npz.convert_csv(mode, filename)
+    lattice = benchmark(pytac.load_npz.load, filename, control_system, symmetry=24)
+    assert len(lattice) > 2000
+
+
+def bench_save(benchmark, tmpdir_factory, lattice):
+    directory = str(tmpdir_factory.mktemp("saved"))
+    benchmark(lattice.save, directory)
+
+
+def bench_load_modes(benchmark):
+    cs = InMemoryControlSystem.from_csv("VMX", value=1.0)
+    lattices = benchmark(pytac.load_csv.load_modes, ["VMX", "VMXSP"], cs)
+    assert len(lattices) == 2
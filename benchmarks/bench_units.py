@@ -0,0 +1,43 @@
+"""Benchmarks for scalar and bulk unit conversions."""
+import pytest
+
+import pytac
+
+
+# (family, field, engineering value) for a polynomial and a pchip conversion.
+CONVERSIONS = [("HSTR", "x_kick", 1.0), ("QUAD", "b1", 123.4)]
+
+
+@pytest.mark.parametrize("family, field, eng_value", CONVERSIONS)
+def bench_scalar_eng_to_phys(benchmark, vmx_lattice, family, field, eng_value):
+    uc = vmx_lattice.get_elements(family)[0].get_unitconv(field)
+    benchmark(uc.convert, eng_value, pytac.ENG, pytac.PHYS)
+
+
+@pytest.mark.parametrize("family, field, eng_value", CONVERSIONS)
+def bench_scalar_phys_to_eng(benchmark, vmx_lattice, family, field, eng_value):
+    uc = vmx_lattice.get_elements(family)[0].get_unitconv(field)
+    phys_value = uc.convert(eng_value, pytac.ENG, pytac.PHYS)
+    benchmark(uc.convert, phys_value, pytac.PHYS, pytac.ENG)
+
+
+@pytest.mark.parametrize("family, field, eng_value", CONVERSIONS)
+def bench_bulk_eng_to_phys(benchmark, vmx_lattice, family, field, eng_value):
+    values = [eng_value] * len(vmx_lattice.get_elements(family))
+    benchmark(
+        vmx_lattice.convert_family_values, family, field, values, pytac.ENG, pytac.PHYS
+    )
+
+
+@pytest.mark.parametrize("family, field, eng_value", CONVERSIONS)
+def bench_bulk_phys_to_eng(benchmark, vmx_lattice, family, field, eng_value):
+    values = vmx_lattice.convert_family_values(
+        family,
+        field,
+        [eng_value] * len(vmx_lattice.get_elements(family)),
+        pytac.ENG,
+        pytac.PHYS,
+    )
+    benchmark(
+        vmx_lattice.convert_family_values, family, field, values, pytac.PHYS, pytac.ENG
+    )
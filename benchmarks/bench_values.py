@@ -0,0 +1,52 @@
+"""Benchmarks for the EpicsLattice bulk get and set paths against an in-memory
+control system.
+"""
+import pytest
+
+import pytac
+
+
+FAMILY_FIELDS = [("BPM", "x"), ("HSTR", "x_kick"), ("QUAD", "b1")]
+# BPMs have no setpoints.
+SET_FAMILY_FIELDS = FAMILY_FIELDS[1:]
+UNITS = [pytac.ENG, pytac.PHYS]
+
+
+@pytest.mark.parametrize("units", UNITS)
+@pytest.mark.parametrize("family, field", FAMILY_FIELDS)
+def bench_get_element_values(benchmark, vmx_lattice, family, field, units):
+    values = benchmark(
+        vmx_lattice.get_element_values, family, field, units=units, dtype=float
+    )
+    assert len(values) == len(vmx_lattice.get_elements(family))
+
+
+@pytest.mark.parametrize("units", UNITS)
+@pytest.mark.parametrize("family, field", SET_FAMILY_FIELDS)
+def bench_set_element_values(benchmark, vmx_lattice, family, field, units):
+    values = vmx_lattice.get_element_values(family, field, pytac.SP, units=units)
+    benchmark(vmx_lattice.set_element_values, family, field, values, units=units)
+
+
+@pytest.mark.parametrize("family, field", FAMILY_FIELDS)
+def bench_get_element_values_single_pv(benchmark, vmx_lattice, family, field):
+    elements = vmx_lattice.get_elements(family)
+    values = benchmark(lambda: [element.get_value(field) for element in elements])
+    assert len(values) == len(elements)
+
+
+@pytest.mark.parametrize("family, field", FAMILY_FIELDS)
+def bench_get_element_values_of_cell_view(benchmark, vmx_lattice, family, field):
+    view = vmx_lattice.view(cell=12)
+    values = benchmark(view.get_element_values, family, field, dtype=float)
+    assert len(values) == len(view.get_elements(family))
+
+
+def bench_get_element_values_after_a_length_change(benchmark, vmx_lattice):
+    element = vmx_lattice[10]
+
+    def get_values():
+        element.length = element.length
+        return vmx_lattice.get_element_values("BPM", "x", dtype=float)
+
+    assert len(benchmark(get_values)) == len(vmx_lattice.get_elements("BPM"))
@@ -0,0 +1,33 @@
+"""Fixtures for the pytac benchmarks.
+
+The lattices use an InMemoryControlSystem preloaded from each mode's
+devices.csv, so no IOC or cothread installation is needed.
+"""
+import pytest
+
+import pytac
+from pytac.memory_cs import InMemoryControlSystem
+
+
+MODES = ["VMX", "VMXSP", "DIAD"]
+
+
+@pytest.fixture(scope="session", params=MODES)
+def mode(request):
+    return request.param
+
+
+@pytest.fixture(scope="session")
+def control_system(mode):
+    return InMemoryControlSystem.from_csv(mode, value=1.0)
+
+
+@pytest.fixture(scope="session")
+def lattice(mode, control_system):
+    return pytac.load_csv.load(mode, control_system, symmetry=24)
+
+
+@pytest.fixture(scope="session")
+def vmx_lattice():
+    cs = InMemoryControlSystem.from_csv("VMX", value=1.0)
+    return pytac.load_csv.load("VMX", cs, symmetry=24)
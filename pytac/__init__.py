@@ -13,12 +13,17 @@ DEFAULT = "default"
 
 
 from . import (  # noqa: 402
+    acquisition,
     data_source,
     device,
     element,
     exceptions,
+    instrument,
     lattice,
     load_csv,
+    load_npz,
+    recorder,
+    stream,
     units,
     utils,
 )
@@ -27,12 +32,17 @@ from . import (  # noqa: 402
 file as the strings above must be set first or the imports will fail.
 """
 __all__ = [
+    "acquisition",
     "data_source",
     "device",
     "element",
     "exceptions",
+    "instrument",
     "lattice",
     "load_csv",
+    "load_npz",
+    "recorder",
+    "stream",
     "units",
     "utils",
 ]
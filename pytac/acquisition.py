@@ -0,0 +1,141 @@
+"""Classes for averaging repeated readings of lattice values."""
+import numpy
+
+
+class RunningStatistics(object):
+    """Running mean, variance, minimum and maximum of a series of readings.
+
+    Each reading is a sequence of values, one per element, and statistics are
+    kept separately for every element. The mean and variance are updated with
+    Welford's algorithm so that no readings have to be stored; memory use is
+    therefore independent of the number of readings. Values that are None or
+    NaN, for example from a PV that could not be read, are ignored for that
+    element only.
+
+    Optionally the most recent raw readings can be kept in a fixed-size ring
+    buffer.
+
+    **Attributes:**
+
+    Attributes:
+        n_values (int): The number of values in each reading.
+        buffer_size (int): The number of raw readings kept, 0 if none are.
+
+    .. Private Attributes:
+           _n_readings (int): The total number of readings added.
+           _count (numpy.array): The number of valid values for each element.
+           _mean (numpy.array): The running mean for each element.
+           _m2 (numpy.array): The running sum of squared differences from the
+                               mean for each element.
+           _min (numpy.array): The minimum value for each element.
+           _max (numpy.array): The maximum value for each element.
+           _buffer (numpy.array): The ring buffer of raw readings, or None.
+    """
+
+    def __init__(self, n_values, buffer_size=0):
+        """
+        Args:
+            n_values (int): The number of values in each reading.
+            buffer_size (int): The number of most recent raw readings to keep,
+                                0 to keep none.
+
+        Raises:
+            ValueError: if buffer_size is negative.
+
+        **Methods:**
+        """
+        if buffer_size < 0:
+            raise ValueError(
+                "Buffer size must not be negative ({0}).".format(buffer_size)
+            )
+        self.n_values = n_values
+        self.buffer_size = buffer_size
+        self._n_readings = 0
+        self._count = numpy.zeros(n_values, dtype=numpy.int64)
+        self._mean = numpy.zeros(n_values)
+        self._m2 = numpy.zeros(n_values)
+        self._min = numpy.full(n_values, numpy.nan)
+        self._max = numpy.full(n_values, numpy.nan)
+        if buffer_size > 0:
+            self._buffer = numpy.full((buffer_size, n_values), numpy.nan)
+        else:
+            self._buffer = None
+
+    def add(self, values):
+        """Add one reading to the statistics.
+
+        Args:
+            values (sequence): one value per element; None or NaN entries are
+                                ignored.
+
+        Raises:
+            IndexError: if the number of values is not n_values.
+        """
+        values = numpy.array(values, dtype=float)
+        if values.shape != (self.n_values,):
+            raise IndexError(
+                "Number of values in given reading({0}) must be equal to the "
+                "number of values being averaged({1}).".format(
+                    values.size, self.n_values
+                )
+            )
+        if self._buffer is not None:
+            self._buffer[self._n_readings % self.buffer_size] = values
+        self._n_readings += 1
+        valid = ~numpy.isnan(values)
+        self._count += valid
+        delta = numpy.where(valid, values - self._mean, 0.0)
+        self._mean += delta / numpy.maximum(self._count, 1)
+        self._m2 += numpy.where(valid, delta * (values - self._mean), 0.0)
+        self._min = numpy.fmin(self._min, values)
+        self._max = numpy.fmax(self._max, values)
+
+    @property
+    def n_readings(self):
+        """int: The number of readings added so far."""
+        return self._n_readings
+
+    @property
+    def count(self):
+        """numpy.array: The number of valid values for each element."""
+        return self._count.copy()
+
+    @property
+    def mean(self):
+        """numpy.array: The mean for each element, NaN if it has no values."""
+        return numpy.where(self._count > 0, self._mean, numpy.nan)
+
+    @property
+    def variance(self):
+        """numpy.array: The sample variance for each element, NaN if it has
+        fewer than two values.
+        """
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            return numpy.where(self._count > 1, self._m2 / (self._count - 1), numpy.nan)
+
+    @property
+    def std(self):
+        """numpy.array: The sample standard deviation for each element."""
+        return numpy.sqrt(self.variance)
+
+    @property
+    def min(self):
+        """numpy.array: The minimum for each element, NaN if it has no values."""
+        return self._min.copy()
+
+    @property
+    def max(self):
+        """numpy.array: The maximum for each element, NaN if it has no values."""
+        return self._max.copy()
+
+    @property
+    def samples(self):
+        """numpy.array: The raw readings in the ring buffer, oldest first, with
+        one row per reading; None if no buffer is kept.
+        """
+        if self._buffer is None:
+            return None
+        if self._n_readings < self.buffer_size:
+            return self._buffer[: self._n_readings].copy()
+        start = self._n_readings % self.buffer_size
+        return numpy.roll(self._buffer, -start, axis=0)
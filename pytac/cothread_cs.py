@@ -1,22 +1,432 @@
+import functools
 import logging
+import random
+import time
 
-from cothread.catools import caget, caput, ca_nothing
+from cothread import Sleep, Spawn, Timedout
+from cothread.catools import caget, camonitor, caput, ca_nothing, connect
 
 from pytac.cs import ControlSystem
 from pytac.exceptions import ControlSystemException
 
 
+class CothreadSubscription(object):
+    """The camonitor subscriptions for a group of PVs.
+
+    .. Private Attributes:
+           _subscriptions (list): The cothread subscription for each PV.
+    """
+
+    def __init__(self, subscriptions):
+        """
+        Args:
+            subscriptions (list): The cothread subscription for each PV.
+
+        **Methods:**
+        """
+        self._subscriptions = subscriptions
+
+    def close(self):
+        """Close the subscriptions for all the PVs."""
+        for subscription in self._subscriptions:
+            subscription.close()
+
+
+class CothreadConnection(object):
+    """The connection of a group of PVs, made by a cothread task.
+
+    .. Private Attributes:
+           _done (bool): Whether the connections have completed.
+           _task (cothread.Spawn): The task making the connections.
+    """
+
+    def __init__(self, function, *args):
+        """Start a cothread task making the connections.
+
+        Args:
+            function (function): Makes the connections and returns the list
+                                  of PVs that could not be connected.
+            *args: The arguments to the function.
+
+        **Methods:**
+        """
+        self._done = False
+        self._task = Spawn(self._run, function, args, raise_on_wait=True)
+
+    def _run(self, function, args):
+        try:
+            return function(*args)
+        finally:
+            self._done = True
+
+    def done(self):
+        """Returns:
+        bool: whether the connections have completed.
+        """
+        return self._done
+
+    def result(self, timeout=None):
+        """Wait for the connections to complete.
+
+        Args:
+            timeout (float): How long to wait in seconds; no limit if None.
+
+        Returns:
+            list: the PVs that could not be connected.
+
+        Raises:
+            ControlSystemException: if the connections do not complete in
+                                     time.
+        """
+        try:
+            return self._task.Wait(timeout)
+        except Timedout:
+            raise ControlSystemException(
+                "Connections not complete after {0} seconds.".format(timeout)
+            )
+
+
+class AdaptiveTimeout(object):
+    """Timeouts for each PV adapted to the latencies observed for it.
+
+    The timeout of a PV is a smoothed estimate of its latency plus a multiple
+    of the smoothed deviation of its latency, as in TCP's retransmission
+    timer, which bounds a high percentile of the latency distribution. It is
+    kept between the user limits, and PVs with no observations use the
+    initial timeout, which is the timeout of the control system using it
+    unless given. The timeout of a batch call is the largest timeout of
+    its PVs. In a batch call the latency of each PV is not known, so every PV
+    that succeeds is taken to have the latency of the whole call, unless some
+    PVs of the call failed: the call then lasts until the timeout and says
+    nothing about the PVs that succeeded.
+
+    **Attributes:**
+
+    Attributes:
+        min_timeout (float): The shortest timeout in seconds.
+        max_timeout (float): The longest timeout in seconds.
+        initial (float): The timeout in seconds of PVs with no observations.
+        alpha (float): The weight of a new latency in the smoothed latency.
+        beta (float): The weight of a new deviation in the smoothed deviation.
+        k (float): The number of deviations added to the smoothed latency.
+
+    .. Private Attributes:
+           _estimates (dict): The [smoothed latency, smoothed deviation] of
+                               each PV.
+    """
+
+    def __init__(
+        self,
+        min_timeout=0.05,
+        max_timeout=5.0,
+        initial=None,
+        alpha=0.125,
+        beta=0.25,
+        k=4.0,
+    ):
+        """
+        Args:
+            min_timeout (float): The shortest timeout in seconds.
+            max_timeout (float): The longest timeout in seconds.
+            initial (float): The timeout in seconds of PVs with no
+                              observations; the timeout of the
+                              CothreadControlSystem it is given to if None.
+            alpha (float): The weight of a new latency in the smoothed
+                            latency.
+            beta (float): The weight of a new deviation in the smoothed
+                           deviation.
+            k (float): The number of deviations added to the smoothed latency.
+
+        Raises:
+            ValueError: if min_timeout is greater than max_timeout.
+
+        **Methods:**
+        """
+        if min_timeout > max_timeout:
+            raise ValueError(
+                "Minimum timeout ({0}) must not be greater than the maximum "
+                "timeout ({1}).".format(min_timeout, max_timeout)
+            )
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.initial = initial
+        self.alpha = alpha
+        self.beta = beta
+        self.k = k
+        self._estimates = {}
+
+    def observe(self, pvs, latency):
+        """Update the estimates of PVs that responded after a given latency.
+
+        Args:
+            pvs (sequence): PVs that responded.
+            latency (float): The time the call took in seconds.
+        """
+        for pv in pvs:
+            estimate = self._estimates.get(pv)
+            if estimate is None:
+                self._estimates[pv] = [latency, latency / 2.0]
+            else:
+                mean, deviation = estimate
+                estimate[1] = (1 - self.beta) * deviation + self.beta * abs(
+                    latency - mean
+                )
+                estimate[0] = (1 - self.alpha) * mean + self.alpha * latency
+
+    def observe_failure(self, pvs, timeout):
+        """Update the estimates of PVs that did not respond within a timeout.
+
+        The smoothed latency is raised to twice the timeout, so the next
+        timeout is at least doubled in case the PV is slow rather than
+        disconnected.
+
+        Args:
+            pvs (sequence): PVs that failed.
+            timeout (float): The timeout of the call in seconds.
+        """
+        for pv in pvs:
+            estimate = self._estimates.setdefault(pv, [timeout, 0.0])
+            estimate[0] = max(estimate[0], 2.0 * timeout)
+
+    def get_timeout(self, pvs):
+        """Get the timeout of a call to the given PVs.
+
+        Args:
+            pvs (sequence): PVs called.
+
+        Returns:
+            float: the largest timeout of the PVs in seconds.
+        """
+        # Without a control system to take the timeout from, wait the longest.
+        initial = self.max_timeout if self.initial is None else self.initial
+        timeout = None
+        for pv in pvs:
+            estimate = self._estimates.get(pv)
+            if estimate is None:
+                pv_timeout = initial
+            else:
+                pv_timeout = estimate[0] + self.k * estimate[1]
+            if timeout is None or pv_timeout > timeout:
+                timeout = pv_timeout
+        if timeout is None:
+            timeout = initial
+        return min(max(timeout, self.min_timeout), self.max_timeout)
+
+
+class RetryPolicy(object):
+    """How to retry PVs that fail.
+
+    The delay before each retry grows exponentially from the initial backoff,
+    with random jitter so that clients retrying at the same time spread out.
+
+    **Attributes:**
+
+    Attributes:
+        attempts (int): The maximum number of attempts of each call,
+                         including the first.
+        backoff (float): The delay in seconds before the first retry.
+        multiplier (float): The factor by which the delay grows each retry.
+        jitter (float): The largest random change of each delay, as a
+                         fraction of the delay.
+
+    .. Private Attributes:
+           _random (random.Random): The source of the jitter.
+    """
+
+    def __init__(self, attempts=3, backoff=0.05, multiplier=2.0, jitter=0.1, seed=None):
+        """
+        Args:
+            attempts (int): The maximum number of attempts of each call,
+                             including the first.
+            backoff (float): The delay in seconds before the first retry.
+            multiplier (float): The factor by which the delay grows each
+                                 retry.
+            jitter (float): The largest random change of each delay, as a
+                             fraction of the delay.
+            seed (int): The seed for the jitter, for repeatability.
+
+        Raises:
+            ValueError: if attempts is less than 1 or jitter is not between 0
+                         and 1.
+
+        **Methods:**
+        """
+        if attempts < 1:
+            raise ValueError("Attempts must be at least 1 ({0}).".format(attempts))
+        if not 0 <= jitter <= 1:
+            raise ValueError("Jitter must be between 0 and 1 ({0}).".format(jitter))
+        self.attempts = attempts
+        self.backoff = backoff
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self._random = random.Random(seed)
+
+    def get_delay(self, retry):
+        """Get the delay before a retry.
+
+        Args:
+            retry (int): The number of the retry, starting at 1.
+
+        Returns:
+            float: the delay in seconds.
+        """
+        delay = self.backoff * self.multiplier ** (retry - 1)
+        return delay * (1 + self.jitter * self._random.uniform(-1, 1))
+
+
 class CothreadControlSystem(ControlSystem):
     """A control system using cothread to communicate with EPICS.
 
     N.B. this is the default control system. It is used to communicate over
     channel access with the hardware in the ring.
 
+    Fast failing is off by default, so every call waits for its timeout. With
+    fast_fail set, the connection health of each PV is tracked: a PV that
+    fails is considered dead, and calls to dead PVs fail immediately rather
+    than waiting for the timeout. A camonitor probe is kept on each dead PV
+    and the PV is considered alive again as soon as the probe receives a
+    value, which happens straight away if the PV is still connected.
+
+    PVs that fail are retried according to the retry policy, if one is given;
+    only the PVs of a batch that failed are retried, and their results are
+    merged back in order. PVs are considered dead only once their retries
+    have failed.
+
+    The timeout of each call is fixed unless an AdaptiveTimeout is given, in
+    which case it is adapted to the latencies observed for the PVs called.
+
     **Methods:**
+
+    .. Private Attributes:
+           _timeout (float): The timeout in seconds of each call.
+           _fast_fail (bool): Whether calls to dead PVs fail immediately.
+           _adaptive_timeout (AdaptiveTimeout): The per-PV timeouts, or None.
+           _retry_policy (RetryPolicy): How to retry failed PVs, or None.
+           _probes (dict): The camonitor probe subscription of each dead PV.
     """
 
-    def __init__(self, timeout=1.0):
+    def __init__(
+        self, timeout=1.0, fast_fail=False, adaptive_timeout=None, retry_policy=None
+    ):
+        """
+        Args:
+            timeout (float): The timeout in seconds of each call, unless
+                              adaptive_timeout is given, and of connections.
+            fast_fail (bool): Whether calls to dead PVs fail immediately until
+                               they reconnect; off by default.
+            adaptive_timeout (AdaptiveTimeout): Adapts the timeout of each
+                                                 call to the PVs called; its
+                                                 initial timeout is timeout
+                                                 if not set.
+            retry_policy (RetryPolicy): How to retry the PVs that fail; they
+                                         are not retried if None.
+        """
         self._timeout = timeout
+        self._fast_fail = fast_fail
+        if adaptive_timeout is not None and adaptive_timeout.initial is None:
+            adaptive_timeout.initial = timeout
+        self._adaptive_timeout = adaptive_timeout
+        self._retry_policy = retry_policy
+        self._probes = {}
+
+    def _get_timeout(self, pvs):
+        """Get the timeout of a call to the given PVs.
+
+        Args:
+            pvs (sequence): PVs called.
+
+        Returns:
+            float: the timeout in seconds.
+        """
+        if self._adaptive_timeout is None:
+            return self._timeout
+        return self._adaptive_timeout.get_timeout(pvs)
+
+    def _observe(self, pvs, failed_pvs, start, timeout):
+        """Update the adaptive timeouts after a call.
+
+        The latency of the call is only recorded for its PVs if none failed,
+        as a call with failures lasts until the timeout.
+
+        Args:
+            pvs (sequence): PVs called.
+            failed_pvs (sequence): PVs that failed.
+            start (float): The time the call started.
+            timeout (float): The timeout of the call in seconds.
+        """
+        if self._adaptive_timeout is None:
+            return
+        if failed_pvs:
+            self._adaptive_timeout.observe_failure(failed_pvs, timeout)
+        else:
+            self._adaptive_timeout.observe(pvs, time.time() - start)
+
+    def _get_attempts(self):
+        """Returns:
+        int: the number of times a call is attempted.
+        """
+        if self._retry_policy is None:
+            return 1
+        return self._retry_policy.attempts
+
+    def _wait_to_retry(self, retry):
+        """Wait before retrying a call, without blocking other cothreads.
+
+        Args:
+            retry (int): The number of the retry, starting at 1.
+        """
+        Sleep(self._retry_policy.get_delay(retry))
+
+    @property
+    def dead_pvs(self):
+        """set: The PVs currently considered dead."""
+        return set(self._probes)
+
+    def _mark_dead(self, pv):
+        """Consider a PV dead, and probe it until it reconnects.
+
+        Args:
+            pv (str): The PV that failed.
+        """
+        if not self._fast_fail or pv in self._probes:
+            return
+        self._probes[pv] = None
+        probe = camonitor(
+            pv, functools.partial(self._on_probe, pv), notify_disconnect=True
+        )
+        if pv in self._probes:
+            self._probes[pv] = probe
+        else:
+            # The probe saw the PV before camonitor returned.
+            probe.close()
+
+    def _on_probe(self, pv, value):
+        """Consider a PV alive again once any value is received from it.
+
+        Args:
+            pv (str): The PV probed.
+            value (object): The value received, or ca_nothing on disconnection.
+        """
+        if not isinstance(value, ca_nothing) and pv in self._probes:
+            probe = self._probes.pop(pv)
+            if probe is not None:
+                probe.close()
+
+    def _split_dead(self, pvs):
+        """Split the positions of the PVs into those to call and those that
+        are dead.
+
+        Args:
+            pvs (sequence): PVs to check.
+
+        Returns:
+            tuple: (live, dead) lists of positions in pvs.
+        """
+        live = []
+        dead = []
+        for i, pv in enumerate(pvs):
+            (dead if pv in self._probes else live).append(i)
+        return live, dead
 
     def get_single(self, pv, throw=True):
         """Get the value of a given PV.
@@ -33,19 +443,32 @@ class CothreadControlSystem(ControlSystem):
         Raises:
             ControlSystemException: if it cannot connect to the specified PV.
         """
-        try:
-            return caget(pv, timeout=self._timeout, throw=True)
-        except ca_nothing:
-            error_msg = "Cannot connect to {}.".format(pv)
-            if throw:
-                raise ControlSystemException(error_msg)
-            else:
-                logging.warning(error_msg)
-                return None
+        if pv not in self._probes:
+            for attempt in range(self._get_attempts()):
+                if attempt:
+                    self._wait_to_retry(attempt)
+                timeout = self._get_timeout([pv])
+                start = time.time()
+                try:
+                    value = caget(pv, timeout=timeout, throw=True)
+                    self._observe([pv], [], start, timeout)
+                    return value
+                except ca_nothing:
+                    self._observe([pv], [pv], start, timeout)
+            self._mark_dead(pv)
+        error_msg = "Cannot connect to {}.".format(pv)
+        if throw:
+            raise ControlSystemException(error_msg)
+        else:
+            logging.warning(error_msg)
+            return None
 
     def get_multiple(self, pvs, throw=True):
         """Get the value for given PVs.
 
+        If a retry policy is set, the PVs that fail are got again until they
+        succeed or the attempts run out.
+
         Args:
             pvs (sequence): PVs to get values of.
             throw (bool): On failure: if True, raise ControlSystemException; if
@@ -58,18 +481,32 @@ class CothreadControlSystem(ControlSystem):
         Raises:
             ControlSystemException: if it cannot connect to one or more PVs.
         """
-        results = caget(pvs, timeout=self._timeout, throw=False)
-        return_values = []
-        failures = []
-        for result in results:
-            if isinstance(result, ca_nothing):
-                logging.warning("Cannot connect to {}.".format(result.name))
-                if throw:
-                    failures.append(result)
+        live, dead = self._split_dead(pvs)
+        return_values = [None] * len(pvs)
+        pending = live
+        failed = []
+        for attempt in range(self._get_attempts()):
+            if not pending:
+                break
+            if attempt:
+                self._wait_to_retry(attempt)
+            pending_pvs = [pvs[i] for i in pending]
+            timeout = self._get_timeout(pending_pvs)
+            start = time.time()
+            results = caget(pending_pvs, timeout=timeout, throw=False)
+            failed = []
+            for i, result in zip(pending, results):
+                if isinstance(result, ca_nothing):
+                    failed.append((i, result.name))
                 else:
-                    return_values.append(None)
-            else:
-                return_values.append(result)
+                    return_values[i] = result
+            self._observe(pending_pvs, [pv for _, pv in failed], start, timeout)
+            pending = [i for i, _ in failed]
+        for _, pv in failed:
+            self._mark_dead(pv)
+        failures = sorted(failed + [(i, pvs[i]) for i in dead])
+        for _, pv in failures:
+            logging.warning("Cannot connect to {}.".format(pv))
         if throw and failures:
             error_msg = "{} caget calls failed.".format(len(failures))
             raise ControlSystemException(error_msg)
@@ -90,20 +527,32 @@ class CothreadControlSystem(ControlSystem):
         Raises:
             ControlSystemException: if it cannot connect to the specified PV.
         """
-        try:
-            caput(pv, value, timeout=self._timeout, throw=True)
-            return True
-        except ca_nothing:
-            error_msg = "Cannot connect to {}.".format(pv)
-            if throw:
-                raise ControlSystemException(error_msg)
-            else:
-                logging.warning(error_msg)
-                return False
+        if pv not in self._probes:
+            for attempt in range(self._get_attempts()):
+                if attempt:
+                    self._wait_to_retry(attempt)
+                timeout = self._get_timeout([pv])
+                start = time.time()
+                try:
+                    caput(pv, value, timeout=timeout, throw=True)
+                    self._observe([pv], [], start, timeout)
+                    return True
+                except ca_nothing:
+                    self._observe([pv], [pv], start, timeout)
+            self._mark_dead(pv)
+        error_msg = "Cannot connect to {}.".format(pv)
+        if throw:
+            raise ControlSystemException(error_msg)
+        else:
+            logging.warning(error_msg)
+            return False
 
     def set_multiple(self, pvs, values, throw=True):
         """Set the values for given PVs.
 
+        If a retry policy is set, the PVs that fail are set again until they
+        succeed or the attempts run out.
+
         Args:
             pvs (sequence): PVs to set the values of.
             values (sequence): values to set to the PVs.
@@ -122,19 +571,94 @@ class CothreadControlSystem(ControlSystem):
         """
         if len(pvs) != len(values):
             raise ValueError("Please enter the same number of values as PVs.")
-        status = caput(pvs, values, timeout=self._timeout, throw=False)
-        return_values = []
-        failures = []
-        for stat in status:
-            if not stat.ok:
-                return_values.append(False)
-                failures.append(stat)
-                logging.warning("Cannot connect to {}.".format(stat.name))
-            else:
-                return_values.append(True)
-        if failures:
+        live, dead = self._split_dead(pvs)
+        return_values = [True] * len(pvs)
+        pending = live
+        failed = []
+        for attempt in range(self._get_attempts()):
+            if not pending:
+                break
+            if attempt:
+                self._wait_to_retry(attempt)
+            pending_pvs = [pvs[i] for i in pending]
+            timeout = self._get_timeout(pending_pvs)
+            start = time.time()
+            status = caput(
+                pending_pvs, [values[i] for i in pending], timeout=timeout, throw=False
+            )
+            failed = [(i, stat.name) for i, stat in zip(pending, status) if not stat.ok]
+            self._observe(pending_pvs, [pv for _, pv in failed], start, timeout)
+            pending = [i for i, _ in failed]
+        for _, pv in failed:
+            self._mark_dead(pv)
+        for i, pv in sorted(failed + [(i, pvs[i]) for i in dead]):
+            return_values[i] = False
+            logging.warning("Cannot connect to {}.".format(pv))
+        if not all(return_values):
             if throw:
-                error_msg = "{} caput calls failed.".format(len(failures))
+                error_msg = "{} caput calls failed.".format(return_values.count(False))
                 raise ControlSystemException(error_msg)
             else:
                 return return_values
+
+    def monitor_multiple(self, pvs, callback):
+        """Subscribe to updates of the given PVs.
+
+        Args:
+            pvs (sequence): PVs to monitor.
+            callback (function): called as callback(value, index) whenever the
+                                  PV at position index in pvs updates; value
+                                  is None if the PV disconnects.
+
+        Disconnections and reconnections seen by the subscription also update
+        the connection health of the PVs.
+
+        Returns:
+            CothreadSubscription: the subscription, which has a close() method
+                                   to stop the updates.
+        """
+
+        def on_update(value, index):
+            if isinstance(value, ca_nothing):
+                logging.warning("Cannot connect to {}.".format(value.name))
+                self._mark_dead(value.name)
+                value = None
+            else:
+                self._on_probe(pvs[index], value)
+            callback(value, index)
+
+        subscriptions = camonitor(list(pvs), on_update, notify_disconnect=True)
+        return CothreadSubscription(subscriptions)
+
+    def connect_multiple(self, pvs, timeout=None):
+        """Start connecting to the given PVs in parallel, in a cothread task.
+
+        PVs that cannot be connected are considered dead.
+
+        Args:
+            pvs (sequence): PVs to connect to.
+            timeout (float): How long to wait for the connections in seconds;
+                              the timeout of this control system if None.
+
+        Returns:
+            CothreadConnection: the future of the connections.
+        """
+        if timeout is None:
+            timeout = self._timeout
+        return CothreadConnection(self._connect, list(pvs), timeout)
+
+    def _connect(self, pvs, timeout):
+        """Connect to the given PVs and wait for the connections.
+
+        Args:
+            pvs (list): PVs to connect to.
+            timeout (float): How long to wait for the connections in seconds.
+
+        Returns:
+            list: the PVs that could not be connected.
+        """
+        results = connect(pvs, wait=True, timeout=timeout, throw=False)
+        unreachable = [pv for pv, result in zip(pvs, results) if not result.ok]
+        for pv in unreachable:
+            self._mark_dead(pv)
+        return unreachable
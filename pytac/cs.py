@@ -75,3 +75,36 @@ class ControlSystem(object):
             ControlSystemException: if it cannot connect to one or more PVs.
         """
         raise NotImplementedError()
+
+    def monitor_multiple(self, pvs, callback):
+        """Subscribe to updates of the given PVs.
+
+        Args:
+            pvs (sequence): PVs to monitor.
+            callback (function): called as callback(value, index) whenever the
+                                  PV at position index in pvs updates; value
+                                  is None if the PV disconnects.
+
+        Returns:
+            object: the subscription, which has a close() method to stop the
+                     updates.
+
+        Raises:
+            ControlSystemException: if it cannot subscribe to the PVs.
+        """
+        raise NotImplementedError()
+
+    def connect_multiple(self, pvs, timeout):
+        """Start connecting to the given PVs in parallel, in the background.
+
+        Args:
+            pvs (sequence): PVs to connect to.
+            timeout (float): How long to wait for the connections in seconds;
+                              the control system's default if None.
+
+        Returns:
+            object: a future with a done() method, and a result(timeout=None)
+                     method that waits for the connections and returns the
+                     list of PVs that could not be connected.
+        """
+        raise NotImplementedError()
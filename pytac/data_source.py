@@ -1,5 +1,6 @@
 """Module containing pytac data source classes."""
 import pytac
+from pytac import instrument
 from pytac.exceptions import DataSourceException, FieldException, HandleException
 
 
@@ -182,6 +183,14 @@ class DataSourceManager(object):
         """
         self._uc[field] = uc
 
+    def get_unitconvs(self):
+        """Get the unit conversion objects of all fields on the manager.
+
+        Returns:
+            dict: The unit conversion object of each field.
+        """
+        return dict(self._uc)
+
     def get_value(
         self,
         field,
@@ -213,6 +222,26 @@ class DataSourceManager(object):
             DataSourceException: if there is no data source on the given field.
             FieldException: if the manager does not have the specified field.
         """
+        timing_recorder = instrument.recorder
+        if timing_recorder is None:
+            return self._get_value(field, handle, units, data_source, throw)
+        with timing_recorder.time("DataSourceManager.get_value"):
+            return self._get_value(field, handle, units, data_source, throw)
+
+    def _get_value(self, field, handle, units, data_source, throw):
+        """Get the value for a field, without instrumentation.
+
+        Args:
+            field (str): The requested field.
+            handle (str): pytac.SP or pytac.RB.
+            units (str): pytac.ENG or pytac.PHYS returned.
+            data_source (str): pytac.LIVE or pytac.SIM.
+            throw (bool): On failure: if True, raise ControlSystemException; if
+                           False, return None and log a warning.
+
+        Returns:
+            float: The value of the requested field
+        """
         if units == pytac.DEFAULT:
             units = self.default_units
         if data_source == pytac.DEFAULT:
@@ -220,6 +249,9 @@ class DataSourceManager(object):
         try:
             data_source = self._data_sources[data_source]
             value = data_source.get_value(field, handle, throw)
+            if value is None:
+                # A failed read is passed through unconverted.
+                return None
             return self._uc[field].convert(
                 value, origin=data_source.units, target=units
             )
@@ -253,11 +285,35 @@ class DataSourceManager(object):
             throw (bool): On failure: if True, raise ControlSystemException: if
                            False, log a warning.
 
+        Returns:
+            bool: False if the data source failed to set the value.
+
         Raises:
             HandleException: if the specified handle is not pytac.SP.
             DataSourceException: if arguments are incorrect.
             FieldException: if the manager does not have the specified field.
         """
+        timing_recorder = instrument.recorder
+        if timing_recorder is None:
+            return self._set_value(field, value, handle, units, data_source, throw)
+        with timing_recorder.time("DataSourceManager.set_value"):
+            return self._set_value(field, value, handle, units, data_source, throw)
+
+    def _set_value(self, field, value, handle, units, data_source, throw):
+        """Set the value for a field, without instrumentation.
+
+        Args:
+            field (str): The requested field.
+            value (float): The value to set.
+            handle (str): pytac.SP or pytac.RB.
+            units (str): pytac.ENG or pytac.PHYS.
+            data_source (str): pytac.LIVE or pytac.SIM.
+            throw (bool): On failure: if True, raise ControlSystemException: if
+                           False, log a warning.
+
+        Returns:
+            bool: False if the data source failed to set the value.
+        """
         if units == pytac.DEFAULT:
             units = self.default_units
         if data_source == pytac.DEFAULT:
@@ -274,7 +330,7 @@ class DataSourceManager(object):
             value = self._uc[field].convert(
                 value, origin=units, target=data_source.units
             )
-            data_source.set_value(field, value, throw)
+            return data_source.set_value(field, value, throw)
         except KeyError:
             raise FieldException("No field {0} on manager {1}.".format(field, self))
         except FieldException:
@@ -364,10 +420,13 @@ class DeviceDataSource(DataSource):
             throw (bool): On failure: if True, raise ControlSystemException: if
                            False, log a warning.
 
+        Returns:
+            bool: False if the device failed to set the value.
+
         Raises:
             FieldException: if the device does not have the specified field.
         """
         try:
-            self._devices[field].set_value(value, throw)
+            return self._devices[field].set_value(value, throw)
         except KeyError:
             raise FieldException("No field {0} on data source {1}.".format(field, self))
@@ -158,6 +158,13 @@ class EpicsDevice(Device):
         """
         return bool(self._enabled)
 
+    @property
+    def enabler_pv(self):
+        """str: The PV that enables the device, or None if the device is not
+        enabled by a PvEnabler.
+        """
+        return getattr(self._enabled, "pv", None)
+
     def get_value(self, handle, throw=True):
         """Read the value of a readback or setpoint PV.
 
@@ -187,13 +194,16 @@ class EpicsDevice(Device):
             throw (bool): On failure: if True, raise ControlSystemException: if
                            False, log a warning.
 
+        Returns:
+            bool: True for success, False for failure.
+
         Raises:
             HandleException: if no setpoint PV exists.
         """
         if self.sp_pv is None:
             raise HandleException("Device {0} has no setpoint PV.".format(self.name))
         else:
-            self._cs.set_single(self.sp_pv, value, throw)
+            return self._cs.set_single(self.sp_pv, value, throw)
 
     def get_pv_name(self, handle):
         """Get the PV name for the specified handle.
@@ -242,6 +252,11 @@ class PvEnabler(object):
         self._enabled_value = str(int(float(enabled_value)))
         self._cs = cs
 
+    @property
+    def pv(self):
+        """str: The PV name."""
+        return self._pv
+
     def __nonzero__(self):
         """Used to override the 'if object' clause.
 
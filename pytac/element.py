@@ -35,11 +35,12 @@ class Element(object):
 
         **Methods:**
         """
-        self.name = name
+        self._lattice = lattice
+        # Set directly, as a new element has no entries in the lattice caches.
+        self._name = name
         self.type_ = element_type
-        self.length = length
+        self._length = length
         self.families = set()
-        self._lattice = lattice
         self._data_source_manager = DataSourceManager()
 
     @property
@@ -49,7 +50,7 @@ class Element(object):
         if self._lattice is None:
             return None
         else:
-            return self._lattice._elements.index(self) + 1
+            return self._lattice._get_index(self) + 1
 
     @property
     def s(self):
@@ -58,7 +59,29 @@ class Element(object):
         if self._lattice is None:
             return None
         else:
-            return sum([el.length for el in self._lattice[: self.index - 1]])
+            return float(self._lattice._get_s_positions()[self.index - 1])
+
+    @property
+    def name(self):
+        """str: The name identifying the element."""
+        return self._name
+
+    @name.setter
+    def name(self, name):
+        self._name = name
+        if self._lattice is not None:
+            self._lattice._clear_cache("names")
+
+    @property
+    def length(self):
+        """float: The length of the element in metres."""
+        return self._length
+
+    @length.setter
+    def length(self, length):
+        self._length = length
+        if self._lattice is not None:
+            self._lattice._clear_cache("s", "length", "family_s", "cells")
 
     @property
     def cell(self):
@@ -72,7 +95,7 @@ class Element(object):
         elif self._lattice.cell_length is None:
             return None
         else:
-            return int(self.s / self._lattice.cell_length) + 1
+            return int(self._lattice._get_cells()[self.index - 1])
 
     def __str__(self):
         """Return a representation of an element, as a string.
@@ -102,6 +125,8 @@ class Element(object):
                                      pytac.LIVE or pytac.SIM.
         """
         self._data_source_manager.set_data_source(data_source, data_source_type)
+        if self._lattice is not None:
+            self._lattice._clear_cache("fields", "devices", "pvs")
 
     def get_fields(self):
         """Get the all fields defined on an element.
@@ -137,6 +162,8 @@ class Element(object):
                 "No device data source for field {0} on "
                 "element {1}.".format(field, self)
             )
+        if self._lattice is not None:
+            self._lattice._clear_cache("fields", "devices", "pvs")
 
     def get_device(self, field):
         """Get the device for the given field.
@@ -191,6 +218,14 @@ class Element(object):
         """
         self._data_source_manager.set_unitconv(field, uc)
 
+    def get_unitconvs(self):
+        """Get the unit conversion objects of all fields on the element.
+
+        Returns:
+            dict: The unit conversion object of each field.
+        """
+        return self._data_source_manager.get_unitconvs()
+
     def add_to_family(self, family):
         """Add the element to the specified family.
 
@@ -198,6 +233,23 @@ class Element(object):
             family (str): Represents the name of the family.
         """
         self.families.add(family)
+        if self._lattice is not None:
+            self._lattice._clear_cache("families", "family_s", "fields", "devices")
+
+    def remove_from_family(self, family):
+        """Remove the element from the specified family.
+
+        Args:
+            family (str): Represents the name of the family.
+
+        Raises:
+            ValueError: if the element is not in the family.
+        """
+        if family not in self.families:
+            raise ValueError("Element {0} is not in family {1}.".format(self, family))
+        self.families.discard(family)
+        if self._lattice is not None:
+            self._lattice._clear_cache("families", "family_s", "fields", "devices")
 
     def get_value(
         self,
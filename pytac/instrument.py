@@ -0,0 +1,387 @@
+"""Opt-in timing instrumentation of pytac's hot paths.
+
+When enabled, the time spent in control system calls, data source get and
+set calls, unit conversions and lattice bulk operations is recorded per
+operation and per family. Calls made while a lattice bulk operation is in
+progress are attributed to the family being operated on. When disabled, which
+is the default, the only cost is one check of the module-level recorder.
+
+Example:
+    >>> recorder = pytac.instrument.enable()
+    >>> lattice.get_element_values("BPM", "x", units=pytac.PHYS)
+    >>> print(recorder.format_report())
+    >>> pytac.instrument.disable()
+"""
+import bisect
+import contextlib
+import threading
+from timeit import default_timer
+
+from pytac.cs import ControlSystem
+
+
+# The upper bounds of the latency histogram buckets, in seconds; a final
+# bucket holds anything slower.
+BUCKET_BOUNDS = [1e-6, 3e-6, 1e-5, 3e-5, 1e-4, 3e-4, 1e-3, 3e-3, 1e-2, 3e-2]
+BUCKET_BOUNDS += [1e-1, 3e-1, 1.0, 3.0, 10.0]
+# The recorder in use, or None if instrumentation is disabled.
+recorder = None
+
+
+class OperationStats(object):
+    """Timing statistics of one operation on one family.
+
+    **Attributes:**
+
+    Attributes:
+        calls (int): The number of calls.
+        pvs (int): The total number of PVs or values handled by the calls.
+        total (float): The total time of the calls in seconds.
+        min (float): The shortest call in seconds.
+        max (float): The longest call in seconds.
+        histogram (list): The number of calls in each bucket of
+                           BUCKET_BOUNDS, plus one for slower calls.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.pvs = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.histogram = [0] * (len(BUCKET_BOUNDS) + 1)
+
+    def add(self, duration, n_pvs=1):
+        """Add one call to the statistics.
+
+        Args:
+            duration (float): The time of the call in seconds.
+            n_pvs (int): The number of PVs or values handled by the call.
+        """
+        self.calls += 1
+        self.pvs += n_pvs
+        self.total += duration
+        if self.min is None or duration < self.min:
+            self.min = duration
+        if self.max is None or duration > self.max:
+            self.max = duration
+        self.histogram[bisect.bisect_left(BUCKET_BOUNDS, duration)] += 1
+
+    @property
+    def mean(self):
+        """float: The mean time of a call in seconds."""
+        return self.total / self.calls if self.calls else None
+
+    def copy(self):
+        """Returns:
+        OperationStats: a copy of these statistics.
+        """
+        stats = OperationStats()
+        stats.__dict__.update(self.__dict__)
+        stats.histogram = list(self.histogram)
+        return stats
+
+
+class TimingRecorder(object):
+    """Records the timing of operations, per operation and per family.
+
+    .. Private Attributes:
+           _stats (dict): The OperationStats for each (operation, family).
+           _lock (threading.Lock): Protects the statistics.
+           _local (threading.local): Holds the current family of each thread.
+    """
+
+    def __init__(self):
+        """
+        **Methods:**
+        """
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def current_family(self):
+        """str: The family that operations are currently attributed to."""
+        return getattr(self._local, "family", None)
+
+    @contextlib.contextmanager
+    def family(self, family):
+        """Attribute the operations made within the context to a family.
+
+        Args:
+            family (str): The family being operated on.
+        """
+        previous = self.current_family
+        self._local.family = family
+        try:
+            yield
+        finally:
+            self._local.family = previous
+
+    @contextlib.contextmanager
+    def time(self, operation, n_pvs=1):
+        """Record the time taken by the code within the context.
+
+        Args:
+            operation (str): The name of the operation.
+            n_pvs (int): The number of PVs or values handled.
+        """
+        start = default_timer()
+        try:
+            yield
+        finally:
+            self.add(operation, default_timer() - start, n_pvs)
+
+    def add(self, operation, duration, n_pvs=1, family=None):
+        """Record one call of an operation.
+
+        Args:
+            operation (str): The name of the operation.
+            duration (float): The time of the call in seconds.
+            n_pvs (int): The number of PVs or values handled by the call.
+            family (str): The family operated on; the current family if None.
+        """
+        if family is None:
+            family = self.current_family
+        key = (operation, family)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = OperationStats()
+            stats.add(duration, n_pvs)
+
+    def reset(self):
+        """Discard all recorded statistics."""
+        with self._lock:
+            self._stats = {}
+
+    def get_report(self):
+        """Get the recorded statistics.
+
+        Returns:
+            dict: a copy of the OperationStats for each (operation, family),
+                   where family is None for operations outside a lattice bulk
+                   operation.
+        """
+        with self._lock:
+            return {key: stats.copy() for key, stats in self._stats.items()}
+
+    def format_report(self, histograms=False):
+        """Format the recorded statistics as a plain-text table.
+
+        Args:
+            histograms (bool): Whether to include the latency histogram of
+                                each operation.
+
+        Returns:
+            str: the table, one line per operation and family.
+        """
+        header = "{0:<36} {1:<12} {2:>8} {3:>8} {4:>12} {5:>12} {6:>12}".format(
+            "operation", "family", "calls", "pvs", "total (ms)", "mean (us)", "max (us)"
+        )
+        lines = [header, "-" * len(header)]
+        report = self.get_report()
+        for (operation, family), stats in sorted(
+            report.items(), key=lambda item: (item[0][0], str(item[0][1]))
+        ):
+            lines.append(
+                "{0:<36} {1:<12} {2:>8} {3:>8} {4:>12.3f} {5:>12.1f} {6:>12.1f}".format(
+                    operation,
+                    "-" if family is None else family,
+                    stats.calls,
+                    stats.pvs,
+                    stats.total * 1e3,
+                    stats.mean * 1e6,
+                    stats.max * 1e6,
+                )
+            )
+            if histograms:
+                bounds = ["<={0:g}s".format(b) for b in BUCKET_BOUNDS] + [">10s"]
+                lines.append(
+                    "    "
+                    + " ".join(
+                        "{0}:{1}".format(bound, count)
+                        for bound, count in zip(bounds, stats.histogram)
+                        if count
+                    )
+                )
+        return "\n".join(lines)
+
+
+def enable(timing_recorder=None):
+    """Enable instrumentation.
+
+    Args:
+        timing_recorder (TimingRecorder): The recorder to use; a new one is
+                                           created if None.
+
+    Returns:
+        TimingRecorder: the recorder in use.
+    """
+    global recorder
+    recorder = TimingRecorder() if timing_recorder is None else timing_recorder
+    return recorder
+
+
+def disable():
+    """Disable instrumentation.
+
+    Returns:
+        TimingRecorder: the recorder that was in use, or None.
+    """
+    global recorder
+    previous, recorder = recorder, None
+    return previous
+
+
+class InstrumentedControlSystem(ControlSystem):
+    """A control system that records the time of every call made to another
+    control system.
+
+    Calls are recorded to the given recorder, or to the module-level recorder
+    if instrumentation is enabled; otherwise they are passed straight through.
+
+    **Methods:**
+
+    .. Private Attributes:
+           _cs (ControlSystem): The control system the calls are passed to.
+           _recorder (TimingRecorder): The recorder to use, or None to use the
+                                        module-level recorder.
+    """
+
+    def __init__(self, control_system, timing_recorder=None):
+        """
+        Args:
+            control_system (ControlSystem): The control system to time.
+            timing_recorder (TimingRecorder): The recorder to use, or None to
+                                               use the module-level recorder.
+        """
+        self._cs = control_system
+        self._recorder = timing_recorder
+
+    def _call(self, operation, n_pvs, method, *args):
+        """Call a method of the wrapped control system, recording its time.
+
+        Args:
+            operation (str): The name of the operation.
+            n_pvs (int): The number of PVs handled by the call.
+            method (function): The method to call.
+            *args: The arguments to the method.
+
+        Returns:
+            object: the result of the call.
+        """
+        timing_recorder = self._recorder or recorder
+        if timing_recorder is None:
+            return method(*args)
+        with timing_recorder.time(operation, n_pvs):
+            return method(*args)
+
+    def get_single(self, pv, throw=True):
+        """Get the value of a given PV.
+
+        Args:
+            pv (string): PV to get the value of.
+            throw (bool): On failure: if True, raise ControlSystemException; if
+                           False, return None and log a warning.
+
+        Returns:
+            object: the current value of the given PV.
+        """
+        return self._call("ControlSystem.get_single", 1, self._cs.get_single, pv, throw)
+
+    def get_multiple(self, pvs, throw=True):
+        """Get the value for given PVs.
+
+        Args:
+            pvs (sequence): PVs to get values of.
+            throw (bool): On failure: if True, raise ControlSystemException; if
+                           False, None will be returned for any PV that fails
+                           and a warning will be logged.
+
+        Returns:
+            list(object): the current values of the PVs.
+        """
+        return self._call(
+            "ControlSystem.get_multiple", len(pvs), self._cs.get_multiple, pvs, throw
+        )
+
+    def set_single(self, pv, value, throw=True):
+        """Set the value of a given PV.
+
+        Args:
+            pv (string): The PV to set the value of.
+            value (object): The value to set the PV to.
+            throw (bool): On failure: if True, raise ControlSystemException: if
+                           False, log a warning.
+
+        Returns:
+            bool: True for success, False for failure.
+        """
+        return self._call(
+            "ControlSystem.set_single", 1, self._cs.set_single, pv, value, throw
+        )
+
+    def set_multiple(self, pvs, values, throw=True):
+        """Set the values for given PVs.
+
+        Args:
+            pvs (sequence): PVs to set the values of.
+            values (sequence): values to set to the PVs.
+            throw (bool): On failure, if True raise ControlSystemException, if
+                           False return a list of True and False values
+                           corresponding to successes and failures and log a
+                           warning for each PV that fails.
+
+        Returns:
+            list(bool): True for success, False for failure; only returned if
+                         throw is false and a failure occurs.
+        """
+        return self._call(
+            "ControlSystem.set_multiple",
+            len(pvs),
+            self._cs.set_multiple,
+            pvs,
+            values,
+            throw,
+        )
+
+    def monitor_multiple(self, pvs, callback):
+        """Subscribe to updates of the given PVs on the wrapped control system.
+
+        Args:
+            pvs (sequence): PVs to monitor.
+            callback (function): called as callback(value, index) whenever the
+                                  PV at position index in pvs updates.
+
+        Returns:
+            object: the subscription, which has a close() method.
+        """
+        return self._call(
+            "ControlSystem.monitor_multiple",
+            len(pvs),
+            self._cs.monitor_multiple,
+            pvs,
+            callback,
+        )
+
+    def connect_multiple(self, pvs, timeout=None):
+        """Start connecting to the given PVs on the wrapped control system.
+
+        Only the time taken to start connecting is recorded.
+
+        Args:
+            pvs (sequence): PVs to connect to.
+            timeout (float): How long to wait for the connections in seconds;
+                              the wrapped control system's default if None.
+
+        Returns:
+            object: the future of the connections.
+        """
+        return self._call(
+            "ControlSystem.connect_multiple",
+            len(pvs),
+            self._cs.connect_multiple,
+            pvs,
+            timeout,
+        )
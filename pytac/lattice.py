@@ -1,11 +1,19 @@
 """Representation of a lattice object which contains all the elements of the
     machine.
 """
+import bisect
+import collections
+import difflib
 import logging
+import os
+import time
+from timeit import default_timer
 
 import numpy
 
 import pytac
+from pytac import instrument
+from pytac.acquisition import RunningStatistics
 from pytac.data_source import DataSourceManager
 from pytac.exceptions import (
     DataSourceException,
@@ -13,6 +21,214 @@ from pytac.exceptions import (
     UnitsException,
     HandleException,
 )
+from pytac.stream import DROP_OLDEST, FamilyStream, MonitorStream
+from pytac.units import PchipUnitConv, PolyUnitConv
+
+
+def _mask_failures(values, dtype):
+    """Make a masked array of values in which the values that failed are
+    masked.
+
+    Args:
+        values (sequence): The values, None for those that failed.
+        dtype (numpy.dtype): The type of the array.
+
+    Returns:
+        numpy.ma.MaskedArray: the values.
+    """
+    mask = numpy.fromiter((value is None for value in values), bool, len(values))
+    data = [0 if failed else value for value, failed in zip(values, mask)]
+    return numpy.ma.masked_array(data, mask=mask, dtype=dtype)
+
+
+# The parts of an element compared by Lattice.diff().
+ELEMENT_PARTS = ("type", "length", "name", "families", "devices", "unitconvs")
+
+
+def _describe_unitconv(uc):
+    """Describe what a unit conversion does, for Lattice.diff().
+
+    The name of a unit conversion is left out, as it is only the id of its
+    table in the files it was loaded from.
+
+    Args:
+        uc (UnitConv): The unit conversion to describe.
+
+    Returns:
+        tuple: the hashable type, table, units and limits of the conversion,
+                where the table is the coefficients of a polynomial
+                conversion, the points of a pchip conversion, or None.
+    """
+    if isinstance(uc, PolyUnitConv):
+        table = tuple(float(c) for c in uc.p.coeffs)
+    elif isinstance(uc, PchipUnitConv):
+        table = (tuple(float(x) for x in uc.x), tuple(float(y) for y in uc.y))
+    else:
+        table = None
+    return (
+        type(uc).__name__,
+        table,
+        uc.eng_units,
+        uc.phys_units,
+        uc.lower_limit,
+        uc.upper_limit,
+    )
+
+
+def _describe(item):
+    """Describe an element, or the lattice itself, for Lattice.diff().
+
+    Args:
+        item (Element or Lattice): The element or lattice to describe.
+
+    Returns:
+        tuple: the hashable values of ELEMENT_PARTS, where devices and
+                unitconvs are sorted (field, description) pairs; the lattice
+                has no type, length, name or families.
+    """
+    devices = []
+    for field in item.get_fields().get(pytac.LIVE, []):
+        d = item.get_device(field)
+        devices.append(
+            (
+                field,
+                (
+                    type(d).__name__,
+                    getattr(d, "rb_pv", None),
+                    getattr(d, "sp_pv", None),
+                ),
+            )
+        )
+    unitconvs = [
+        (field, _describe_unitconv(uc)) for field, uc in item.get_unitconvs().items()
+    ]
+    if isinstance(item, Lattice):
+        parts = (None, None, None, None)
+    else:
+        parts = (item.type_, item.length, item.name, frozenset(item.families))
+    return parts + (tuple(sorted(devices)), tuple(sorted(unitconvs)))
+
+
+def _compare(description, other_description):
+    """Find the differences between two descriptions made by _describe().
+
+    Args:
+        description (tuple): The old description.
+        other_description (tuple): The new description.
+
+    Returns:
+        dict: (old, new) for each differing part of ELEMENT_PARTS, except for
+               devices and unitconvs where it is a dict of (old, new) for each
+               differing field, None for a field that is not present.
+    """
+    differences = {}
+    for part, old, new in zip(ELEMENT_PARTS, description, other_description):
+        if old == new:
+            continue
+        if part in ("devices", "unitconvs"):
+            old, new = dict(old), dict(new)
+            differences[part] = {
+                field: (old.get(field), new.get(field))
+                for field in set(old) | set(new)
+                if old.get(field) != new.get(field)
+            }
+        else:
+            differences[part] = (old, new)
+    return differences
+
+
+def _unique_anchors(keys, other_keys, i1, i2, j1, j2):
+    """Find the keys that occur exactly once in both ranges of two sequences,
+    keeping the longest run of them that is in the same order in both.
+
+    Args:
+        keys (list): The first sequence.
+        other_keys (list): The second sequence.
+        i1, i2 (int): The range of the first sequence to search.
+        j1, j2 (int): The range of the second sequence to search.
+
+    Returns:
+        list: the (i, j) positions of the anchors, in increasing order.
+    """
+    counts = collections.Counter(keys[i1:i2])
+    other_counts = collections.Counter(other_keys[j1:j2])
+    positions = {
+        key: j
+        for j, key in enumerate(other_keys[j1:j2], j1)
+        if other_counts[key] == 1 and counts[key] == 1
+    }
+    pairs = [
+        (i, positions[key]) for i, key in enumerate(keys[i1:i2], i1) if key in positions
+    ]
+    # Patience sorting: the longest increasing subsequence of the j's.
+    tails = []
+    tail_pairs = []
+    previous = {}
+    for pair in pairs:
+        k = bisect.bisect_left(tails, pair[1])
+        previous[pair] = tail_pairs[k - 1] if k else None
+        if k == len(tails):
+            tails.append(pair[1])
+            tail_pairs.append(pair)
+        else:
+            tails[k] = pair[1]
+            tail_pairs[k] = pair
+    anchors = []
+    pair = tail_pairs[-1] if tail_pairs else None
+    while pair is not None:
+        anchors.append(pair)
+        pair = previous[pair]
+    return anchors[::-1]
+
+
+def _align(keys, other_keys, descriptions, other_descriptions):
+    """Align two sequences of elements.
+
+    Common ends are matched first, then keys that are unique in both ranges
+    are used as anchors, falling back to full descriptions that are unique,
+    and the gaps between anchors are aligned in the same way. Only a gap with
+    no anchors at all is aligned by difflib, whose cost is quadratic in the
+    size of the gap.
+
+    Args:
+        keys (list): The keys to align the first sequence by.
+        other_keys (list): The keys to align the second sequence by.
+        descriptions (list): The full descriptions of the first sequence.
+        other_descriptions (list): The full descriptions of the second
+                                    sequence.
+
+    Returns:
+        list: the (i, j) positions of the aligned elements, in increasing
+               order.
+    """
+    matches = []
+    ranges = [(0, len(keys), 0, len(other_keys))]
+    while ranges:
+        i1, i2, j1, j2 = ranges.pop()
+        while i1 < i2 and j1 < j2 and keys[i1] == other_keys[j1]:
+            matches.append((i1, j1))
+            i1, j1 = i1 + 1, j1 + 1
+        while i1 < i2 and j1 < j2 and keys[i2 - 1] == other_keys[j2 - 1]:
+            i2, j2 = i2 - 1, j2 - 1
+            matches.append((i2, j2))
+        if i1 == i2 or j1 == j2:
+            continue
+        anchors = _unique_anchors(keys, other_keys, i1, i2, j1, j2)
+        if not anchors:
+            anchors = _unique_anchors(descriptions, other_descriptions, i1, i2, j1, j2)
+        if anchors:
+            matches.extend(anchors)
+            starts = [(i1, j1)] + [(i + 1, j + 1) for i, j in anchors]
+            ends = anchors + [(i2, j2)]
+            for (start_i, start_j), (end_i, end_j) in zip(starts, ends):
+                ranges.append((start_i, end_i, start_j, end_j))
+        else:
+            matcher = difflib.SequenceMatcher(
+                None, keys[i1:i2], other_keys[j1:j2], autojunk=False
+            )
+            for i, j, size in matcher.get_matching_blocks():
+                matches.extend((i1 + i + k, j1 + j + k) for k in range(size))
+    return sorted(matches)
 
 
 class Lattice(object):
@@ -26,12 +242,19 @@ class Lattice(object):
     Attributes:
         name (str): The name of the lattice.
         symmetry (int): The symmetry of the lattice (the number of cells).
+        rigidity (Rigidity): The rigidity shared by the unit conversions of
+                              the magnets, updated whenever the energy field
+                              is set; None if no conversions use it.
 
     .. Private Attributes:
            _elements (list): The list of all the element objects in the lattice
            _data_source_manager (DataSourceManager): A class that manages the
                                                       data sources associated
                                                       with this lattice.
+           _streams (dict): The open live streams, by stream key.
+           _cache (dict): The positions and indexes of the elements, computed
+                           when first needed and cleared by every change to
+                           the elements.
     """
 
     def __init__(self, name, symmetry=None):
@@ -43,8 +266,11 @@ class Lattice(object):
         """
         self.name = name
         self.symmetry = symmetry
+        self.rigidity = None
         self._elements = []
         self._data_source_manager = DataSourceManager()
+        self._streams = {}
+        self._clear_cache()
 
     @property
     def cell_length(self):
@@ -70,15 +296,15 @@ class Lattice(object):
         """
         if (self.symmetry is None) or (len(self._elements) == 0):
             return None
+        elif self.cell_length is None:
+            return [1, len(self._elements)]
         else:
-            bounds = [1]
-            for cell in range(2, self.symmetry + 1, 1):
-                for elem in self._elements[bounds[-1] :]:
-                    if elem.cell == cell:
-                        bounds.append(elem.index)
-                        break
-            bounds.append(len(self._elements))
-            return bounds
+            cells = self._get_cells()
+            cell_numbers = numpy.arange(2, self.symmetry + 1)
+            starts = numpy.searchsorted(cells, cell_numbers)
+            # A cell in which no element begins has no bound.
+            begins = cells[numpy.minimum(starts, len(cells) - 1)] == cell_numbers
+            return [1] + (starts[begins] + 1).tolist() + [len(self._elements)]
 
     def __getitem__(self, n):
         """Get the (n + 1)th element of the lattice.
@@ -110,6 +336,7 @@ class Lattice(object):
                                      pytac.LIVE or pytac.SIM.
         """
         self._data_source_manager.set_data_source(data_source, data_source_type)
+        self._clear_cache("pvs")
 
     def get_fields(self):
         """Get the fields defined on the lattice.
@@ -144,6 +371,7 @@ class Lattice(object):
             raise DataSourceException(
                 "No device data source on lattice {0}.".format(self)
             )
+        self._clear_cache("pvs")
 
     def get_device(self, field):
         """Get the device for the given field.
@@ -197,6 +425,14 @@ class Lattice(object):
         """
         self._data_source_manager.set_unitconv(field, uc)
 
+    def get_unitconvs(self):
+        """Get the unit conversion objects of all fields on the lattice.
+
+        Returns:
+            dict: The unit conversion object of each field.
+        """
+        return self._data_source_manager.get_unitconvs()
+
     def get_value(
         self,
         field,
@@ -252,7 +488,9 @@ class Lattice(object):
     ):
         """Set the value for a field.
 
-        This value can be set on the machine or the simulation.
+        This value can be set on the machine or the simulation. Setting the
+        energy field also updates the rigidity of the lattice, if it has one
+        and the value was set.
 
         Args:
             field (str): The requested field.
@@ -268,7 +506,7 @@ class Lattice(object):
             FieldException: if the lattice does not have the specified field.
         """
         try:
-            self._data_source_manager.set_value(
+            status = self._data_source_manager.set_value(
                 field, value, handle, units, data_source, throw
             )
         except DataSourceException:
@@ -280,6 +518,86 @@ class Lattice(object):
                 "Lattice {0} does not have field {1} on data "
                 "source {2}".format(self, field, data_source)
             )
+        # A failed write only returns False when throw is False.
+        if field == "energy" and self.rigidity is not None and status is not False:
+            if units == pytac.DEFAULT:
+                units = self.get_default_units()
+            if units == pytac.ENG:
+                value = self.get_unitconv(field).eng_to_phys(value)
+            self.rigidity.set_energy(value)
+
+    def save(self, directory, format="csv", mode=None):
+        """Save the lattice so that it can be loaded again.
+
+        With the csv format, the files load_csv.load() reads are written to
+        a directory named after the mode; with the npz format, a compact file
+        named after the mode is written for load_npz.load(). Identical unit
+        conversion tables are only saved once. See
+        load_csv.get_lattice_tables() for what is saved.
+
+        Args:
+            directory (str): The directory to save the lattice in.
+            format (str): "csv" or "npz".
+            mode (str): The name of the mode; the name of the lattice if None.
+
+        Raises:
+            ValueError: if the format is not supported.
+            UnitsException: if a unit conversion is not null, polynomial or
+                             pchip.
+        """
+        mode = mode or self.name
+        if format == "csv":
+            pytac.load_csv.save(self, directory, mode)
+        elif format == "npz":
+            filename = os.path.join(directory, "{0}.npz".format(mode))
+            pytac.load_npz.save(self, filename, mode)
+        else:
+            raise ValueError("Unsupported lattice format {0}.".format(format))
+
+    def diff(self, other):
+        """Find the structural differences between this lattice and another.
+
+        Each element is described by its type, length, name, families, the
+        PVs of its live devices and the tables, units and limits of its unit
+        conversions. The elements are aligned by their types and names,
+        anchored on the elements that are unique in both lattices, so the cost
+        grows roughly linearly with the number of elements when the lattices
+        are similar. Aligned elements that differ in other parts are changed,
+        and the elements that cannot be aligned are removed or inserted.
+
+        Args:
+            other (Lattice): The lattice to compare with.
+
+        Returns:
+            LatticeDiff: The differences from this lattice to the other.
+        """
+        descriptions = [_describe(e) for e in self]
+        other_descriptions = [_describe(e) for e in other]
+        result = LatticeDiff(_compare(_describe(self), _describe(other)))
+        # Align the elements by type and name, then compare the other parts
+        # of the aligned elements.
+        matches = _align(
+            [(d[0], d[2]) for d in descriptions],
+            [(d[0], d[2]) for d in other_descriptions],
+            descriptions,
+            other_descriptions,
+        )
+        i = j = 0
+        for match_i, match_j in matches + [(len(self), len(other))]:
+            result.removed.extend(self[i:match_i])
+            result.inserted.extend(other[j:match_j])
+            if match_i < len(self) and (
+                descriptions[match_i] != other_descriptions[match_j]
+            ):
+                result.changed.append(
+                    (
+                        self[match_i],
+                        other[match_j],
+                        _compare(descriptions[match_i], other_descriptions[match_j]),
+                    )
+                )
+            i, j = match_i + 1, match_j + 1
+        return result
 
     def get_length(self):
         """Returns the length of the lattice, in meters.
@@ -287,10 +605,8 @@ class Lattice(object):
         Returns:
             float: The length of the lattice (m).
         """
-        total_length = 0.0
-        for e in self._elements:
-            total_length += e.length
-        return total_length
+        self._get_s_positions()
+        return self._cache["length"]
 
     def add_element(self, element):
         """Append an element to the lattice and update its lattice reference.
@@ -300,6 +616,100 @@ class Lattice(object):
         """
         element.set_lattice(self)
         self._elements.append(element)
+        self._clear_cache()
+
+    def _clear_cache(self, *keys):
+        """Discard the cached positions and indexes of the elements.
+
+        Everything is discarded when an element is added; a change to an
+        element only discards the entries that depend on what changed.
+
+        Args:
+            keys (str): the entries to discard; all of them if none are given.
+        """
+        if keys:
+            for key in keys:
+                self._cache.pop(key, None)
+        else:
+            self._cache = {}
+
+    def _get_cache(self):
+        """Returns:
+        dict: the cached positions and indexes of the elements.
+        """
+        return self._cache
+
+    def _get_index(self, element):
+        """Get the index of an element, where index 0 is the first element in
+        the lattice.
+
+        Args:
+            element (Element): The element to find.
+
+        Returns:
+            int: the index of the first occurrence of the element.
+
+        Raises:
+            ValueError: if the element is not in the lattice.
+        """
+        cache = self._get_cache()
+        if "index" not in cache:
+            cache["index"] = {}
+            for index in range(len(self._elements) - 1, -1, -1):
+                cache["index"][id(self._elements[index])] = index
+        index = cache["index"].get(id(element))
+        if index is None or self._elements[index] is not element:
+            return self._elements.index(element)
+        return index
+
+    def _get_family_indexes(self, family=None):
+        """Get the indexes of the elements of a family.
+
+        Args:
+            family (str): requested family; all elements if None.
+
+        Returns:
+            numpy.array: the index of each element, where index 0 is the first
+                          element in the lattice.
+
+        Raises:
+            ValueError: if there are no elements in the specified family.
+        """
+        families = self._get_cache().setdefault("families", {})
+        if family not in families:
+            if family is None:
+                families[family] = numpy.arange(len(self._elements))
+            else:
+                families[family] = numpy.array(
+                    [i for i, e in enumerate(self._elements) if family in e.families],
+                    dtype=int,
+                )
+        indexes = families[family]
+        if len(indexes) == 0:
+            if family is None:
+                raise ValueError("No elements in lattice {0}.".format(self))
+            raise ValueError("No elements in family {0}.".format(family))
+        return indexes
+
+    def _get_family_positions(self, family=None):
+        """Get the indexes and start positions of the elements of a family.
+
+        Args:
+            family (str): requested family; all elements if None.
+
+        Returns:
+            tuple: (indexes, positions) numpy arrays of the index of each
+                    element, where index 0 is the first element in the
+                    lattice, and of its start position in metres.
+
+        Raises:
+            ValueError: if there are no elements in the specified family.
+        """
+        indexes = self._get_family_indexes(family)
+        positions = self._get_cache().setdefault("family_s", {})
+        if family not in positions:
+            positions[family] = self._get_s_positions()[indexes]
+        return indexes, positions[family]
 
     def get_elements(self, family=None, cell=None):
         """Get the elements of a family from the lattice.
@@ -323,15 +733,246 @@ class Lattice(object):
             if len(elements) == 0:
                 raise ValueError("No elements in lattice {0}.".format(self))
         else:
-            elements = [e for e in self._elements if family in e.families]
-            if len(elements) == 0:
-                raise ValueError("No elements in family {0}.".format(family))
+            indexes = self._get_family_indexes(family)
+            elements = [self._elements[i] for i in indexes.tolist()]
         if cell is not None:
             elements = [e for e in elements if e.cell == cell]
             if len(elements) == 0:
                 raise ValueError("No elements in cell {0}.".format(cell))
         return elements
 
+    def _get_field_index(self):
+        """Returns:
+        dict: the (element, device) pairs of the elements with a live device
+               for each field, by the id of the element, in the order they
+               exist in the ring.
+        """
+        cache = self._get_cache()
+        if "fields" not in cache:
+            index = {}
+            for element in self._elements:
+                for field in element.get_fields().get(pytac.LIVE, []):
+                    devices = index.setdefault(field, collections.OrderedDict())
+                    devices[id(element)] = (element, element.get_device(field))
+            cache["fields"] = index
+        return cache["fields"]
+
+    def get_element_fields(self):
+        """Get all fields with a live device on any element in the lattice.
+
+        Returns:
+            set: all fields of the elements.
+        """
+        return set(self._get_field_index())
+
+    def get_elements_with_field(self, field, family=None):
+        """Get the elements with a live device for the given field, whatever
+        their family.
+
+        Elements are returned in the order they exist in the ring.
+
+        Args:
+            field (str): requested field.
+            family (str): restrict elements to those in the specified family.
+
+        Returns:
+            list: the elements with a device for the field.
+
+        Raises:
+            ValueError: if no elements have the field.
+        """
+        devices = self._get_field_index().get(field, {})
+        elements = [
+            element
+            for element, _ in devices.values()
+            if family is None or family in element.families
+        ]
+        if len(elements) == 0:
+            raise ValueError("No elements with field {0}.".format(field))
+        return elements
+
+    def view(self, key=None, cell=None, s_range=None):
+        """Get a view of some of the elements of the lattice, without copying
+        them.
+
+        Exactly one of key, cell and s_range must be given. The elements of a
+        view are in the order of key, otherwise in the order they exist in the
+        ring.
+
+        Args:
+            key (slice or sequence): the indexes of the elements, where index
+                                      0 is the first element in the lattice.
+            cell (int): view the elements in the specified cell.
+            s_range (tuple): (start, end) view the elements whose start
+                              position is in the range [start, end) metres.
+
+        Returns:
+            LatticeView: the view of the elements.
+
+        Raises:
+            ValueError: if not exactly one of key, cell and s_range is given,
+                         or a cell is given and the lattice has no symmetry.
+        """
+        if [key, cell, s_range].count(None) != 2:
+            raise ValueError("Exactly one of key, cell and s_range must be given.")
+        if key is not None:
+            if not isinstance(key, slice):
+                key = numpy.asarray(key, dtype=int)
+            return LatticeView(self, key)
+        if cell is not None:
+            if self.cell_length is None:
+                raise ValueError("Lattice {0} has no cells.".format(self))
+            start, end = numpy.searchsorted(self._get_cells(), [cell, cell + 1])
+        else:
+            start, end = numpy.searchsorted(self._get_s_positions(), s_range)
+        return LatticeView(self, slice(int(start), int(end)))
+
+    def _get_s_positions(self):
+        """Returns:
+        numpy.array: the start position of each element within the lattice in
+                      metres.
+        """
+        cache = self._get_cache()
+        if "s" not in cache:
+            lengths = numpy.array([e.length for e in self._elements], dtype=float)
+            positions = numpy.concatenate(([0.0], numpy.cumsum(lengths)))
+            cache["s"] = positions[: len(lengths)]
+            cache["length"] = float(positions[-1])
+        return cache["s"]
+
+    def _get_cells(self):
+        """Get the cell each element begins in, as given by Element.cell.
+
+        The cells are cached for each symmetry, so they follow changes to the
+        symmetry as well as to the elements.
+
+        Returns:
+            numpy.array: the cell of each element, starting at 1.
+        """
+        cells = self._get_cache().setdefault("cells", {})
+        if self.symmetry not in cells:
+            positions = self._get_s_positions()
+            cells[self.symmetry] = (positions / self.cell_length).astype(int) + 1
+        return cells[self.symmetry]
+
+    def elements_between(self, s_start, s_end, family=None):
+        """Get the elements whose start position is in the range
+        [s_start, s_end) metres.
+
+        Elements are returned in the order they exist in the ring. Many ranges
+        can be looked up at once by giving sequences of starts and ends.
+
+        Args:
+            s_start (float or sequence): the start of the range in metres.
+            s_end (float or sequence): the end of the range in metres.
+            family (str): requested family; all elements if None.
+
+        Returns:
+            list: the elements in the range, or a list of them for each range
+                   if sequences are given.
+
+        Raises:
+            ValueError: if there are no elements in the specified family.
+        """
+        indexes, positions = self._get_family_positions(family)
+        starts = numpy.searchsorted(positions, s_start)
+        ends = numpy.searchsorted(positions, s_end)
+        if numpy.ndim(starts) == 0:
+            return [self._elements[i] for i in indexes[starts:ends].tolist()]
+        return [
+            [self._elements[i] for i in indexes[start:end].tolist()]
+            for start, end in numpy.broadcast(starts, ends)
+        ]
+
+    def nearest(self, s, family=None):
+        """Get the element whose start position is nearest to the given
+        position.
+
+        If two elements are equally near, the first is returned. Many
+        positions can be looked up at once by giving a sequence.
+
+        Args:
+            s (float or sequence): the position in metres.
+            family (str): requested family; all elements if None.
+
+        Returns:
+            Element or list: the nearest element, or a list of the nearest
+                              element to each position if a sequence is
+                              given.
+
+        Raises:
+            ValueError: if there are no elements in the specified family.
+        """
+        indexes, positions = self._get_family_positions(family)
+        s = numpy.asarray(s, dtype=float)
+        after = numpy.minimum(numpy.searchsorted(positions, s), len(positions) - 1)
+        before = numpy.maximum(after - 1, 0)
+        nearest = numpy.where(
+            s - positions[before] <= numpy.abs(positions[after] - s), before, after
+        )
+        if nearest.ndim == 0:
+            return self._elements[indexes[nearest]]
+        return [self._elements[i] for i in indexes[nearest].tolist()]
+
+    def _get_names(self):
+        """Returns:
+        dict: the elements with each name, in the order they exist in the
+               ring; unnamed elements are not included.
+        """
+        cache = self._get_cache()
+        if "names" not in cache:
+            names = {}
+            for element in self._elements:
+                if element.name is not None:
+                    names.setdefault(element.name, []).append(element)
+            cache["names"] = names
+        return cache["names"]
+
+    def get_element(self, name):
+        """Get the element with the given name.
+
+        Args:
+            name (str): the name of the element.
+
+        Returns:
+            Element: the element with the name.
+
+        Raises:
+            ValueError: if no element, or more than one element, has the name.
+        """
+        elements = self._get_names().get(name, [])
+        if len(elements) == 0:
+            raise ValueError("No element named {0} in {1}.".format(name, self))
+        elif len(elements) > 1:
+            raise ValueError(
+                "{0} elements named {1} in {2}, use "
+                "get_elements_by_name().".format(len(elements), name, self)
+            )
+        return elements[0]
+
+    def get_elements_by_name(self, names):
+        """Get the elements with the given names.
+
+        Elements are returned in the order of the names; the elements sharing
+        a name are returned in the order they exist in the ring.
+
+        Args:
+            names (sequence): the names of the elements.
+
+        Returns:
+            list: the elements with each of the names.
+
+        Raises:
+            ValueError: if no element has one of the names.
+        """
+        index = self._get_names()
+        elements = []
+        for name in names:
+            if name not in index:
+                raise ValueError("No element named {0} in {1}.".format(name, self))
+            elements.extend(index[name])
+        return elements
+
     def get_all_families(self):
         """Get all families of elements in the lattice.
 
@@ -351,12 +992,11 @@ class Lattice(object):
 
         Returns:
             list: list of s positions for each element.
+
+        Raises:
+            ValueError: if there are no elements in the specified family.
         """
-        elements = self.get_elements(family)
-        s_positions = []
-        for element in elements:
-            s_positions.append(element.s)
-        return s_positions
+        return self._get_family_positions(family)[1].tolist()
 
     def get_element_devices(self, family, field):
         """Get devices for a specific field for elements in the specfied
@@ -373,9 +1013,23 @@ class Lattice(object):
         Returns:
             list: devices for specified family and field.
         """
+        cache = self._get_cache().setdefault("devices", {})
+        if (family, field) in cache:
+            return [device for _, device in cache[(family, field)].values()]
         elements = self.get_elements(family)
+        field_devices = self._get_field_index().get(field, {})
+        family_devices = collections.OrderedDict(
+            (id(e), field_devices[id(e)]) for e in elements if id(e) in field_devices
+        )
+        if len(family_devices) == len(elements):
+            cache[(family, field)] = family_devices
+            return [device for _, device in family_devices.values()]
         devices = []
         for element in elements:
+            entry = field_devices.get(id(element))
+            if entry is not None:
+                devices.append(entry[1])
+                continue
             try:
                 devices.append(element.get_device(field))
             except DataSourceException:
@@ -411,6 +1065,7 @@ class Lattice(object):
         data_source=pytac.DEFAULT,
         throw=True,
         dtype=None,
+        masked=False,
     ):
         """Get the value of the given field for all elements in the given
         family in the lattice.
@@ -426,11 +1081,90 @@ class Lattice(object):
                            and a warning will be logged.
             dtype (numpy.dtype): if None, return a list. If not None, return a
                                   numpy array of the specified type.
+            masked (bool): if True, return a numpy masked array of type dtype,
+                            or float if dtype is None, in which the values that
+                            failed are masked.
+
+        Returns:
+            list or numpy.array: The requested values.
+        """
+        return self._get_values(
+            family,
+            self.get_elements(family),
+            field,
+            handle,
+            units,
+            data_source,
+            throw,
+            dtype,
+            masked,
+        )
+
+    def _get_values(
+        self, family, elements, field, handle, units, data_source, throw, dtype, masked
+    ):
+        """Get the value of the given field for the given elements of a
+        family, recording the time taken if instrumentation is enabled.
+
+        Args:
+            family (str): family of the elements, which the time is recorded
+                           against.
+            elements (list): elements to request the values of.
+            field (str): field to request values for.
+            handle (str): pytac.RB or pytac.SP.
+            units (str): pytac.ENG or pytac.PHYS.
+            data_source (str): pytac.LIVE or pytac.SIM.
+            throw (bool): On failure: if True, raise ControlSystemException; if
+                           False, None will be returned for any PV that fails
+                           and a warning will be logged.
+            dtype (numpy.dtype): if None, return a list. If not None, return a
+                                  numpy array of the specified type.
+            masked (bool): if True, return a numpy masked array in which the
+                            values that failed are masked.
+
+        Returns:
+            list or numpy.array: The requested values.
+        """
+        array_dtype = None if masked else dtype
+        timing_recorder = instrument.recorder
+        if timing_recorder is None:
+            values = self._get_element_values(
+                elements, field, handle, units, data_source, throw, array_dtype
+            )
+        else:
+            with timing_recorder.family(family):
+                start = default_timer()
+                values = self._get_element_values(
+                    elements, field, handle, units, data_source, throw, array_dtype
+                )
+                timing_recorder.add(
+                    "Lattice.get_element_values", default_timer() - start, len(values)
+                )
+        if masked:
+            values = _mask_failures(values, float if dtype is None else dtype)
+        return values
+
+    def _get_element_values(
+        self, elements, field, handle, units, data_source, throw, dtype
+    ):
+        """Get the value of the given field for the given elements, without
+        instrumentation.
+
+        Args:
+            elements (list): elements to request the values of.
+            field (str): field to request values for.
+            handle (str): pytac.RB or pytac.SP.
+            units (str): pytac.ENG or pytac.PHYS.
+            data_source (str): pytac.LIVE or pytac.SIM.
+            throw (bool): On failure: if True, raise ControlSystemException; if
+                           False, None will be returned for any PV that fails
+                           and a warning will be logged.
+            dtype (numpy.dtype): if None, return a list. If not None, return a
+                                  numpy array of the specified type.
 
         Returns:
             list or numpy.array: The requested values.
         """
-        elements = self.get_elements(family)
         values = [
             element.get_value(field, handle, units, data_source, throw)
             for element in elements
@@ -468,9 +1202,70 @@ class Lattice(object):
             IndexError: if the given list of values doesn't match the number of
                          elements in the family.
         """
+        return self._set_values(
+            family,
+            self.get_elements(family),
+            field,
+            values,
+            handle,
+            units,
+            data_source,
+            throw,
+        )
+
+    def _set_values(
+        self, family, elements, field, values, handle, units, data_source, throw
+    ):
+        """Set the value of the given field for the given elements of a family
+        to the given values, recording the time taken if instrumentation is
+        enabled.
+
+        Args:
+            family (str): family of the elements, which the time is recorded
+                           against.
+            elements (list): elements on which to set values.
+            field (str):  field to set values for.
+            values (sequence): A list of values to assign.
+            handle (str): pytac.SP or pytac.RB.
+            units (str): pytac.ENG or pytac.PHYS.
+            data_source (str): pytac.LIVE or pytac.SIM.
+            throw (bool): On failure, if True raise ControlSystemException, if
+                           False return a list of True and False values
+                           corresponding to successes and failures and log a
+                           warning for each PV that fails.
+        """
+        timing_recorder = instrument.recorder
+        if timing_recorder is None:
+            return self._set_element_values(
+                elements, field, values, handle, units, data_source, throw
+            )
+        with timing_recorder.family(family), timing_recorder.time(
+            "Lattice.set_element_values", len(values)
+        ):
+            return self._set_element_values(
+                elements, field, values, handle, units, data_source, throw
+            )
+
+    def _set_element_values(
+        self, elements, field, values, handle, units, data_source, throw
+    ):
+        """Set the value of the given field for the given elements to the
+        given values, without instrumentation.
+
+        Args:
+            elements (list): elements on which to set values.
+            field (str):  field to set values for.
+            values (sequence): A list of values to assign.
+            handle (str): pytac.SP or pytac.RB.
+            units (str): pytac.ENG or pytac.PHYS.
+            data_source (str): pytac.LIVE or pytac.SIM.
+            throw (bool): On failure, if True raise ControlSystemException, if
+                           False return a list of True and False values
+                           corresponding to successes and failures and log a
+                           warning for each PV that fails.
+        """
         if handle != pytac.SP:
             raise HandleException("Must write using {0}.".format(pytac.SP))
-        elements = self.get_elements(family)
         if len(elements) != len(values):
             raise IndexError(
                 "Number of elements in given array({0}) must be "
@@ -489,24 +1284,170 @@ class Lattice(object):
             if status is not None:
                 return status
 
-    def set_default_units(self, default_units):
-        """Sets the default unit type for the lattice and all its elements.
+    def acquire_element_values(
+        self,
+        family,
+        field,
+        n_readings,
+        interval=0.0,
+        handle=pytac.RB,
+        units=pytac.DEFAULT,
+        data_source=pytac.DEFAULT,
+        throw=True,
+        buffer_size=0,
+    ):
+        """Repeatedly read the given field for all elements in the given family
+        and accumulate statistics of the readings.
+
+        Only running statistics are kept, so memory use does not grow with
+        n_readings unless raw readings are requested through buffer_size.
 
         Args:
-            default_units (str): The default unit type to be set across the
-                                  entire lattice, pytac.ENG or pytac.PHYS.
+            family (str): family of elements to request the values of.
+            field (str): field to request values for.
+            n_readings (int): the number of readings to take.
+            interval (float): the time to wait between readings in seconds.
+            handle (str): pytac.RB or pytac.SP.
+            units (str): pytac.ENG or pytac.PHYS.
+            data_source (str): pytac.LIVE or pytac.SIM.
+            throw (bool): On failure: if True, raise ControlSystemException; if
+                           False, a failed value is left out of the statistics
+                           for that element and a warning will be logged.
+            buffer_size (int): the number of most recent raw readings to keep,
+                                0 to keep none.
+
+        Returns:
+            RunningStatistics: the statistics of the readings.
 
         Raises:
-            UnitsException: if specified default unit type is not a valid unit
-                             type.
+            ValueError: if n_readings is less than 1.
         """
-        if default_units == pytac.ENG or default_units == pytac.PHYS:
-            self._data_source_manager.default_units = default_units
-            elems = self.get_elements()
-            for elem in elems:
-                elem._data_source_manager.default_units = default_units
-        elif default_units is not None:
-            raise UnitsException(
+        if n_readings < 1:
+            raise ValueError(
+                "At least one reading must be taken ({0}).".format(n_readings)
+            )
+        stats = None
+        for i in range(n_readings):
+            if i > 0 and interval > 0:
+                time.sleep(interval)
+            values = self.get_element_values(
+                family, field, handle, units, data_source, throw, dtype=float
+            )
+            if stats is None:
+                stats = RunningStatistics(len(values), buffer_size)
+            stats.add(values)
+        return stats
+
+    def stream(
+        self,
+        family,
+        field,
+        rate=None,
+        handle=pytac.RB,
+        units=pytac.DEFAULT,
+        data_source=pytac.DEFAULT,
+        throw=True,
+        monitor=False,
+        maxlen=1,
+        policy=DROP_OLDEST,
+        sleep=time.sleep,
+    ):
+        """Stream the values of the given field for all elements in the given
+        family.
+
+        Consumers of the same family, field, handle, units, data source, rate,
+        monitor option and wait function share one upstream stream, so the
+        values are only read once for all of them. Each consumer has its own
+        queue of at most maxlen readings; when it is full a reading is
+        discarded according to policy.
+
+        Args:
+            family (str): family of elements to request the values of.
+            field (str): field to request values for.
+            rate (float): the maximum number of readings per second, None for
+                           no limit.
+            handle (str): pytac.RB or pytac.SP.
+            units (str): pytac.ENG or pytac.PHYS.
+            data_source (str): pytac.LIVE or pytac.SIM.
+            throw (bool): On failure: if True, raise ControlSystemException; if
+                           False, NaN will be streamed for any PV that fails
+                           and a warning will be logged.
+            monitor (bool): if True, use a monitor subscription rather than
+                             polling.
+            maxlen (int): the maximum number of readings queued for this
+                           consumer.
+            policy (str): pytac.stream.DROP_OLDEST or DROP_NEWEST.
+            sleep (function): the function used to wait; for example
+                               cothread.Sleep when using cothread.
+
+        Returns:
+            StreamSubscriber: an iterator of (timestamp, numpy.array) readings;
+                               close it to stop consuming the stream.
+
+        Raises:
+            DataSourceException: if monitor is True and the values cannot be
+                                  monitored.
+        """
+        if data_source == pytac.DEFAULT:
+            data_source = self.get_default_data_source()
+        if units == pytac.DEFAULT:
+            units = self.get_default_units()
+        key = (family, field, handle, units, data_source, throw, rate, monitor, sleep)
+        family_stream = self._streams.get(key)
+        if family_stream is None:
+            family_stream = self._create_stream(key, rate, monitor, sleep)
+            self._streams[key] = family_stream
+        return family_stream.subscribe(maxlen, policy)
+
+    def _create_stream(self, key, rate, monitor, sleep):
+        """Create the upstream stream for the given key.
+
+        Args:
+            key (tuple): the key identifying the stream.
+            rate (float): the maximum number of readings per second.
+            monitor (bool): whether to use a monitor subscription.
+            sleep (function): the function used to wait.
+
+        Returns:
+            FamilyStream: the new stream.
+
+        Raises:
+            DataSourceException: if monitor is True.
+        """
+        if monitor:
+            raise DataSourceException(
+                "Lattice {0} has no control system to monitor.".format(self)
+            )
+        return FamilyStream(self, key, rate, sleep, self._remove_stream)
+
+    def _remove_stream(self, family_stream):
+        """Forget a stream once it has closed, so that the next consumer of
+        its key starts a new one.
+
+        Args:
+            family_stream (FamilyStream): the closed stream.
+        """
+        if self._streams.get(family_stream.key) is family_stream:
+            del self._streams[family_stream.key]
+
+    def set_default_units(self, default_units):
+        """Sets the default unit type for the lattice and all its elements.
+
+        Args:
+            default_units (str): The default unit type to be set across the
+                                  entire lattice, pytac.ENG or pytac.PHYS.
+
+        Raises:
+            UnitsException: if specified default unit type is not a valid unit
+                             type.
+        """
+        if default_units == pytac.ENG or default_units == pytac.PHYS:
+            self._data_source_manager.default_units = default_units
+            elems = self.get_elements()
+            for elem in elems:
+                elem._data_source_manager.default_units = default_units
+        elif default_units is not None:
+            raise UnitsException(
                 "{0} is not a unit type. Please enter {1} or "
                 "{2}.".format(default_units, pytac.ENG, pytac.PHYS)
             )
@@ -557,11 +1498,28 @@ class Lattice(object):
         Args:
             family (str): the family of elements which the values belong to.
             field (str): the field on the elements which the values are from.
-            values (sequence): values to be converted.
+            values (sequence): values to be converted; None values, which
+                                are failed reads, are not converted.
+            origin (str): pytac.ENG or pytac.PHYS.
+            target (str): pytac.ENG or pytac.PHYS.
+        """
+        return self._convert_values(
+            self.get_elements(family), field, values, origin, target
+        )
+
+    def _convert_values(self, elements, field, values, origin, target):
+        """Convert the given values according to the given origin and target
+        units, using the unit conversion objects for the given field on the
+        given elements.
+
+        Args:
+            elements (list): the elements which the values belong to.
+            field (str): the field on the elements which the values are from.
+            values (sequence): values to be converted; None values, which
+                                are failed reads, are not converted.
             origin (str): pytac.ENG or pytac.PHYS.
             target (str): pytac.ENG or pytac.PHYS.
         """
-        elements = self.get_elements(family)
         if len(elements) != len(values):
             raise IndexError(
                 "Number of elements in given sequence({0}) must "
@@ -570,11 +1528,315 @@ class Lattice(object):
             )
         converted_values = []
         for elem, value in zip(elements, values):
-            uc = elem.get_unitconv(field)
-            converted_values.append(uc.convert(value, origin, target))
+            if value is None:
+                # A failed read is passed through unconverted.
+                converted_values.append(None)
+            else:
+                uc = elem.get_unitconv(field)
+                converted_values.append(uc.convert(value, origin, target))
         return converted_values
 
 
+class LatticeDiff(object):
+    """The structural differences between two lattices.
+
+    A LatticeDiff is true if there are any differences.
+
+    **Attributes:**
+
+    Attributes:
+        removed (list): The elements of the first lattice that are not in the
+                         second.
+        inserted (list): The elements of the second lattice that are not in
+                          the first.
+        changed (list): (element, other_element, differences) for each pair
+                         of elements with the same type and name that differ
+                         in other parts, where differences is in the form
+                         given by lattice_differences.
+        lattice_differences (dict): The differences between the devices and
+                                     unit conversions of the lattices
+                                     themselves; a dict of (old, new) pairs
+                                     for each differing field under "devices"
+                                     and "unitconvs", where None means the
+                                     field is not present.
+    """
+
+    def __init__(self, lattice_differences):
+        """
+        Args:
+            lattice_differences (dict): The differences between the devices
+                                         and unit conversions of the lattices
+                                         themselves.
+
+        **Methods:**
+        """
+        self.removed = []
+        self.inserted = []
+        self.changed = []
+        self.lattice_differences = lattice_differences
+
+    def __bool__(self):
+        """Returns:
+        bool: whether there are any differences.
+        """
+        return bool(
+            self.removed or self.inserted or self.changed or self.lattice_differences
+        )
+
+    __nonzero__ = __bool__
+
+
+class LatticeView(object):
+    """A view of some of the elements of a lattice.
+
+    The view refers to the elements of its lattice by index rather than
+    copying them, and its bulk operations act only on its own elements while
+    using the batch control system calls of the lattice.
+
+    **Attributes:**
+
+    Attributes:
+        lattice (Lattice): The lattice the elements belong to.
+
+    .. Private Attributes:
+           _key (slice or numpy.array): The indexes of the elements in the
+                                         lattice, where index 0 is the first
+                                         element.
+    """
+
+    def __init__(self, lattice, key):
+        """
+        Args:
+            lattice (Lattice): The lattice the elements belong to.
+            key (slice or numpy.array): The indexes of the elements in the
+                                         lattice.
+
+        **Methods:**
+        """
+        self.lattice = lattice
+        self._key = key
+
+    def _get_indexes(self):
+        """Returns:
+        sequence: the index in the lattice of each element of the view.
+        """
+        if isinstance(self._key, slice):
+            return range(*self._key.indices(len(self.lattice)))
+        return self._key
+
+    def __getitem__(self, n):
+        """Get the (n + 1)th element of the view, or a view of some of its
+        elements.
+
+        Args:
+            n (int or slice): index.
+
+        Returns:
+            Element or LatticeView: indexed element, or a view of the sliced
+                                     elements.
+        """
+        if isinstance(n, slice):
+            return LatticeView(self.lattice, numpy.asarray(self._get_indexes())[n])
+        return self.lattice[self._get_indexes()[n]]
+
+    def __iter__(self):
+        """Iterate over the elements of the view, in order."""
+        elements = self.lattice._elements
+        for index in self._get_indexes():
+            yield elements[index]
+
+    def __len__(self):
+        """The number of elements in the view.
+
+        Returns:
+            int: The number of elements in the view.
+        """
+        return len(self._get_indexes())
+
+    def get_elements(self, family=None, cell=None):
+        """Get the elements of a family from the view.
+
+        If no family is specified it returns all elements of the view.
+
+        Args:
+            family (str): requested family.
+            cell (int): restrict elements to those in the specified cell.
+
+        Returns:
+            list: list containing all elements of the specified family.
+
+        Raises:
+            ValueError: if there are no elements in the specified cell or
+                         family.
+        """
+        if family is None:
+            elements = list(self)
+            if len(elements) == 0:
+                raise ValueError("No elements in view of {0}.".format(self.lattice))
+        else:
+            elements = [e for e in self if family in e.families]
+            if len(elements) == 0:
+                raise ValueError("No elements in family {0}.".format(family))
+        if cell is not None:
+            elements = [e for e in elements if e.cell == cell]
+            if len(elements) == 0:
+                raise ValueError("No elements in cell {0}.".format(cell))
+        return elements
+
+    def get_all_families(self):
+        """Get all families of elements in the view.
+
+        Returns:
+            set: all defined families.
+        """
+        families = set()
+        for element in self:
+            families.update(element.families)
+        return families
+
+    def get_family_s(self, family):
+        """Get s positions for all elements of the view from the same family.
+
+        Args:
+            family (str): requested family.
+
+        Returns:
+            list: list of s positions for each element.
+
+        Raises:
+            ValueError: if there are no elements in the specified family.
+        """
+        elements = self.lattice._elements
+        positions = self.lattice._get_s_positions()
+        s_positions = [
+            float(positions[index])
+            for index in self._get_indexes()
+            if family in elements[index].families
+        ]
+        if len(s_positions) == 0:
+            raise ValueError("No elements in family {0}.".format(family))
+        return s_positions
+
+    def get_element_values(
+        self,
+        family,
+        field,
+        handle=pytac.RB,
+        units=pytac.DEFAULT,
+        data_source=pytac.DEFAULT,
+        throw=True,
+        dtype=None,
+        masked=False,
+    ):
+        """Get the value of the given field for all elements of the view in
+        the given family.
+
+        See Lattice.get_element_values() for the arguments.
+
+        Returns:
+            list or numpy.array: The requested values.
+        """
+        return self.lattice._get_values(
+            family,
+            self.get_elements(family),
+            field,
+            handle,
+            units,
+            data_source,
+            throw,
+            dtype,
+            masked,
+        )
+
+    def set_element_values(
+        self,
+        family,
+        field,
+        values,
+        handle=pytac.SP,
+        units=pytac.DEFAULT,
+        data_source=pytac.DEFAULT,
+        throw=True,
+    ):
+        """Set the value of the given field for all elements of the view in
+        the given family to the given values.
+
+        See Lattice.set_element_values() for the arguments.
+
+        Raises:
+            IndexError: if the given list of values doesn't match the number of
+                         elements of the family in the view.
+        """
+        return self.lattice._set_values(
+            family,
+            self.get_elements(family),
+            field,
+            values,
+            handle,
+            units,
+            data_source,
+            throw,
+        )
+
+
+class LatticeConnection(object):
+    """The readiness future of connecting to the PVs of a lattice.
+
+    **Attributes:**
+
+    Attributes:
+        pvs (list): The PVs being connected to.
+
+    .. Private Attributes:
+           _future (object): The future of the control system connections.
+           _users (dict): The (element, field) pairs that use each PV; element
+                           is the lattice itself for lattice fields.
+    """
+
+    def __init__(self, future, users):
+        """
+        Args:
+            future (object): The future returned by the control system's
+                              connect_multiple().
+            users (dict): The (element, field) pairs that use each PV.
+
+        **Methods:**
+        """
+        self.pvs = list(users)
+        self._future = future
+        self._users = users
+
+    def done(self):
+        """Returns:
+        bool: whether the connections have completed.
+        """
+        return self._future.done()
+
+    def result(self, timeout=None):
+        """Wait for the connections to complete.
+
+        Args:
+            timeout (float): How long to wait in seconds; no limit if None.
+
+        Returns:
+            list: the PVs that could not be connected.
+        """
+        return self._future.result(timeout)
+
+    def report(self, timeout=None):
+        """Wait for the connections to complete and describe the PVs that
+        could not be connected.
+
+        Args:
+            timeout (float): How long to wait in seconds; no limit if None.
+
+        Returns:
+            dict: the list of (element, field) pairs that use each PV that
+                   could not be connected.
+        """
+        return {pv: self._users[pv] for pv in self.result(timeout)}
+
+
 class EpicsLattice(Lattice):
     """EPICS-aware lattice class.
 
@@ -586,6 +1848,8 @@ class EpicsLattice(Lattice):
     Attributes:
         name (str): The name of the lattice.
         symmetry (int): The symmetry of the lattice (the number of cells).
+        connection (LatticeConnection): The future of the last call to
+                                         connect(), or None.
 
     .. Private Attributes:
            _elements (list): The list of all the element objects in the lattice
@@ -608,6 +1872,7 @@ class EpicsLattice(Lattice):
         """
         super(EpicsLattice, self).__init__(name, symmetry)
         self._cs = epics_cs
+        self.connection = None
 
     def get_pv_name(self, field, handle):
         """Get the PV name for a specific field, and handle on this lattice.
@@ -651,27 +1916,127 @@ class EpicsLattice(Lattice):
         Returns:
             list: A list of PV names, strings.
         """
-        elements = self.get_elements(family)
+        return self._get_pv_names(self.get_elements(family), field, handle)
+
+    def _get_pv_names(self, elements, field, handle):
+        """Get the PV names for the given field, and handle, on the given
+        elements.
+
+        Args:
+            elements (list): The elements, which must be EpicsElements.
+            field (str): The requested field.
+            handle (str): pytac.RB or pytac.SP.
+
+        Returns:
+            list: A list of PV names, strings.
+        """
+        field_devices = self._get_field_index().get(field, {})
         pv_names = []
         for element in elements:
-            pv_names.append(element.get_pv_name(field, handle))
+            entry = field_devices.get(id(element))
+            if entry is None or not hasattr(entry[1], "get_pv_name"):
+                # Raise the exception the element gives for the field.
+                pv_names.append(element.get_pv_name(field, handle))
+            else:
+                pv_names.append(entry[1].get_pv_name(handle))
         return pv_names
 
-    def get_element_values(
-        self,
-        family,
-        field,
-        handle=pytac.RB,
-        units=pytac.DEFAULT,
-        data_source=pytac.DEFAULT,
-        throw=True,
-        dtype=None,
+    def _get_pv_index(self):
+        """Returns:
+        dict: the (element, field, handle) users of each PV, where element is
+               the lattice itself for lattice fields, and handle is pytac.RB
+               or pytac.SP, or None for a PV that enables the device.
+        """
+        cache = self._get_cache()
+        if "pvs" not in cache:
+            index = {}
+            for owner in [self] + self._elements:
+                for field in owner.get_fields().get(pytac.LIVE, []):
+                    device = owner.get_device(field)
+                    for pv, handle in (
+                        (getattr(device, "rb_pv", None), pytac.RB),
+                        (getattr(device, "sp_pv", None), pytac.SP),
+                        (getattr(device, "enabler_pv", None), None),
+                    ):
+                        if pv is not None:
+                            index.setdefault(pv, []).append((owner, field, handle))
+            cache["pvs"] = index
+        return cache["pvs"]
+
+    def lookup_pv(self, pv_name):
+        """Find the elements and fields that use a PV.
+
+        The readback, setpoint and enabler PVs of every live device on the
+        lattice and its elements are looked up.
+
+        Args:
+            pv_name (str): The PV to look up.
+
+        Returns:
+            list: the (element, field, handle) users of the PV, where element
+                   is the lattice itself for lattice fields, and handle is
+                   pytac.RB or pytac.SP, or None if the PV enables the
+                   device; empty if no device uses the PV.
+        """
+        return list(self._get_pv_index().get(pv_name, []))
+
+    def lookup_pvs(self, pv_names):
+        """Find the elements and fields that use each of the given PVs.
+
+        Args:
+            pv_names (sequence): The PVs to look up.
+
+        Returns:
+            list: the users of each PV, in the form lookup_pv() returns.
+        """
+        index = self._get_pv_index()
+        return [list(index.get(pv_name, [])) for pv_name in pv_names]
+
+    def connect(self, families=None, timeout=None):
+        """Start connecting to the PVs of the given families in parallel, in
+        the background.
+
+        The readback and setpoint PVs of every live device on the elements are
+        connected to; the PVs of the lattice's own devices are included if no
+        families are given.
+
+        Args:
+            families (sequence): The families whose PVs to connect to; all
+                                  elements if None.
+            timeout (float): How long to wait for the connections in seconds;
+                              the control system's default if None.
+
+        Returns:
+            LatticeConnection: the readiness future of the connections, which
+                                is also kept as the connection attribute.
+        """
+        if families is None:
+            owners = [self] + self._elements
+        else:
+            families = set(families)
+            owners = [e for e in self._elements if not families.isdisjoint(e.families)]
+        users = collections.OrderedDict()
+        for owner in owners:
+            for field in owner.get_fields().get(pytac.LIVE, []):
+                device = owner.get_device(field)
+                for pv in (
+                    getattr(device, "rb_pv", None),
+                    getattr(device, "sp_pv", None),
+                ):
+                    if pv is not None:
+                        users.setdefault(pv, []).append((owner, field))
+        future = self._cs.connect_multiple(list(users), timeout)
+        self.connection = LatticeConnection(future, users)
+        return self.connection
+
+    def _get_element_values(
+        self, elements, field, handle, units, data_source, throw, dtype
     ):
-        """Get the value of the given field for all elements in the given
-        family in the lattice.
+        """Get the value of the given field for the given elements, reading
+        live values with one batch call to the control system.
 
         Args:
-            family (str): family of elements to request the values of.
+            elements (list): elements to request the values of.
             field (str): field to request values for.
             handle (str): pytac.RB or pytac.SP.
             units (str): pytac.ENG or pytac.PHYS.
@@ -690,35 +2055,29 @@ class EpicsLattice(Lattice):
         if units == pytac.DEFAULT:
             units = self.get_default_units()
         if data_source == pytac.LIVE:
-            pv_names = self.get_element_pv_names(family, field, handle)
+            pv_names = self._get_pv_names(elements, field, handle)
             values = self._cs.get_multiple(pv_names, throw)
             if units == pytac.PHYS:
-                values = self.convert_family_values(
-                    family, field, values, pytac.ENG, pytac.PHYS
+                values = self._convert_values(
+                    elements, field, values, pytac.ENG, pytac.PHYS
                 )
         else:
-            values = super(EpicsLattice, self).get_element_values(
-                family, field, handle, units, data_source, throw
+            values = super(EpicsLattice, self)._get_element_values(
+                elements, field, handle, units, data_source, throw, None
             )
         if dtype is not None:
             values = numpy.array(values, dtype=dtype)
         return values
 
-    def set_element_values(
-        self,
-        family,
-        field,
-        values,
-        handle=pytac.SP,
-        units=pytac.DEFAULT,
-        data_source=pytac.DEFAULT,
-        throw=True,
+    def _set_element_values(
+        self, elements, field, values, handle, units, data_source, throw
     ):
-        """Set the value of the given field for all elements in the given
-        family in the lattice to the given values.
+        """Set the value of the given field for the given elements to the
+        given values, writing live values with one batch call to the control
+        system.
 
         Args:
-            family (str): family of elements on which to set values.
+            elements (list): elements on which to set values.
             field (str):  field to set values for.
             values (sequence): A list of values to assign.
             handle (str): pytac.SP or pytac.RB.
@@ -739,10 +2098,10 @@ class EpicsLattice(Lattice):
             raise HandleException("Must write using {0}.".format(pytac.SP))
         if data_source == pytac.LIVE:
             if units == pytac.PHYS:
-                values = self.convert_family_values(
-                    family, field, values, pytac.PHYS, pytac.ENG
+                values = self._convert_values(
+                    elements, field, values, pytac.PHYS, pytac.ENG
                 )
-            pv_names = self.get_element_pv_names(family, field, pytac.SP)
+            pv_names = self._get_pv_names(elements, field, pytac.SP)
             if len(pv_names) != len(values):
                 raise IndexError(
                     "Number of elements in given sequence({0}) "
@@ -751,6 +2110,37 @@ class EpicsLattice(Lattice):
                 )
             self._cs.set_multiple(pv_names, values, throw)
         else:
-            super(EpicsLattice, self).set_element_values(
-                family, field, values, pytac.SP, units, data_source, throw
+            super(EpicsLattice, self)._set_element_values(
+                elements, field, values, pytac.SP, units, data_source, throw
+            )
+
+    def _create_stream(self, key, rate, monitor, sleep):
+        """Create the upstream stream for the given key, monitoring the PVs if
+        requested.
+
+        Args:
+            key (tuple): the key identifying the stream.
+            rate (float): the maximum number of readings per second.
+            monitor (bool): whether to use a monitor subscription.
+            sleep (function): the function used to wait.
+
+        Returns:
+            FamilyStream: the new stream.
+
+        Raises:
+            DataSourceException: if monitor is True and the data source is not
+                                  pytac.LIVE.
+        """
+        family, field, handle, _, data_source = key[:5]
+        if not monitor:
+            return super(EpicsLattice, self)._create_stream(key, rate, monitor, sleep)
+        if data_source != pytac.LIVE:
+            raise DataSourceException(
+                "Cannot monitor data source {0} on lattice {1}.".format(
+                    data_source, self
+                )
             )
+        pv_names = self.get_element_pv_names(family, field, handle)
+        return MonitorStream(
+            self, key, self._cs, pv_names, rate, sleep, self._remove_stream
+        )
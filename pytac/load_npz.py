@@ -0,0 +1,450 @@
+"""Module to load the elements of the machine from a single compact file.
+
+The file is a numpy .npz archive holding the same information as the csv
+files read by load_csv, stored column by column:
+
+ * Every string (names, fields, PVs, units and families) is stored once, and
+   string columns hold indices into the strings. The strings are stored as
+   a single block of UTF-8 text, separated by null characters.
+ * The families of the elements are stored as (element, family) index pairs.
+ * The unit conversion tables are stored already grouped by id, so the
+   coefficients or points of table i are found between its bounds.
+ * Columns of the same type are joined into one array, as each array of the
+   archive is slow to read; 'sizes' holds the length of each column.
+
+The file for a DLS mode is about a seventh of the size of its csv files.
+Loading it is about 2 to 2.5 times faster than load_csv.load(): about 20ms
+rather than 48ms for each of the VMX, VMXSP and DIAD modes, at best over 30
+runs, of which about 2.5ms is reading the file. Identical conversion tables
+are created only once, but most of the time is spent creating the elements,
+devices and unit conversions, which both loaders do alike.
+
+Element ids are the same as in the csv files: 0 for the lattice itself and n
+for the n-th element. A file is made from a directory of csv files with
+convert_csv(), or from a lattice with save(), and loaded with load().
+"""
+import os
+
+import numpy
+
+import pytac
+from pytac import data_source, device, element, lattice, units
+from pytac.load_csv import (
+    COLUMN_TYPES,
+    COLUMNS,
+    DEFAULT_UC,
+    DEVICES_FILENAME,
+    ELEMENTS_FILENAME,
+    FAMILIES_FILENAME,
+    PCHIP_FILENAME,
+    POLY_FILENAME,
+    RIGIDITY_FAMILIES,
+    UNITCONV_FILENAME,
+    _create_unitconv,
+    _get_control_system,
+    _group_by_id,
+    _to_columns,
+    get_lattice_tables,
+    read_columns,
+)
+
+
+FORMAT_VERSION = 2
+STRING_COLUMNS = [
+    "mode",
+    "element_name",
+    "element_type",
+    "device_name",
+    "device_field",
+    "device_get_pv",
+    "device_set_pv",
+    "family_name",
+    "uc_field",
+    "uc_type",
+    "uc_phys_units",
+    "uc_eng_units",
+]
+INT_COLUMNS = STRING_COLUMNS + [
+    "device_el_id",
+    "family_el_id",
+    "uc_el_id",
+    "uc_id",
+    "poly_id",
+    "poly_bounds",
+    "pchip_id",
+    "pchip_bounds",
+]
+FLOAT_COLUMNS = [
+    "element_length",
+    "uc_lower",
+    "uc_upper",
+    "poly_coeff",
+    "pchip_eng",
+    "pchip_phy",
+]
+
+
+def _intern(columns):
+    """Store each distinct string once.
+
+    Args:
+        columns (dict): A sequence of strings for each column name.
+
+    Returns:
+        tuple: (strings, indices) where strings is a list of the distinct
+                strings and indices holds an array for each column of the
+                positions of its strings in strings.
+    """
+    names = list(columns)
+    lengths = [len(columns[name]) for name in names]
+    joined = [value for name in names for value in columns[name]]
+    strings, inverse = numpy.unique(numpy.array(joined, dtype=str), return_inverse=True)
+    ends = numpy.cumsum(lengths)
+    indices = dict(zip(names, numpy.split(inverse.astype(numpy.int32), ends[:-1])))
+    return strings.tolist(), indices
+
+
+def _pack(columns, names, dtype):
+    """Join columns of the same type into a single array.
+
+    Args:
+        columns (dict): The columns, by name.
+        names (list): The names of the columns to join, in order.
+        dtype (numpy.dtype): The type of the joined array.
+
+    Returns:
+        tuple: (values, sizes) where values is the joined array and sizes the
+                length of each column.
+    """
+    sizes = [len(columns[name]) for name in names]
+    values = numpy.concatenate([numpy.asarray(columns[name]) for name in names])
+    return values.astype(dtype), sizes
+
+
+def _unpack(values, names, sizes):
+    """Split an array joined by _pack() into its columns.
+
+    Args:
+        values (numpy.array): The joined array.
+        names (list): The names of the columns, in order.
+        sizes (list): The length of each column.
+
+    Returns:
+        dict: The columns, by name.
+    """
+    return dict(zip(names, numpy.split(values, numpy.cumsum(sizes)[:-1])))
+
+
+def _to_limits(values):
+    """Convert csv limits to floats.
+
+    Args:
+        values (sequence): The limits as strings, empty for no limit.
+
+    Returns:
+        numpy.array: the limits, NaN for no limit.
+    """
+    return numpy.array([float(v) if v != "" else numpy.nan for v in values])
+
+
+def _write(filename, mode, tables):
+    """Write the tables describing a mode to a compact file.
+
+    Args:
+        filename (str): The path of the .npz file to write.
+        mode (str): The name of the mode.
+        tables (dict): The columns of each csv file, by file name, in the form
+                        read_columns() returns.
+    """
+    elements = tables[ELEMENTS_FILENAME]
+    devices = tables[DEVICES_FILENAME]
+    families = tables[FAMILIES_FILENAME]
+    unitconv = tables[UNITCONV_FILENAME]
+    poly = tables[POLY_FILENAME]
+    pchip = tables[PCHIP_FILENAME]
+    columns = {
+        "element_length": elements["length"],
+        "device_el_id": devices["el_id"],
+        "family_el_id": families["el_id"],
+        "uc_el_id": unitconv["el_id"],
+        "uc_id": unitconv["uc_id"],
+        "uc_lower": _to_limits(unitconv["lower_lim"]),
+        "uc_upper": _to_limits(unitconv["upper_lim"]),
+    }
+    # Highest order coefficient first.
+    order, uc_ids, bounds = _group_by_id(poly["uc_id"], -poly["coeff"])
+    columns.update(poly_id=uc_ids, poly_bounds=bounds, poly_coeff=poly["val"][order])
+    order, uc_ids, bounds = _group_by_id(pchip["uc_id"], pchip["eng"], pchip["phy"])
+    columns.update(
+        pchip_id=uc_ids,
+        pchip_bounds=bounds,
+        pchip_eng=pchip["eng"][order],
+        pchip_phy=pchip["phy"][order],
+    )
+    strings, indices = _intern(
+        {
+            "mode": [mode],
+            "element_name": elements["name"],
+            "element_type": elements["type"],
+            "device_name": devices["name"],
+            "device_field": devices["field"],
+            "device_get_pv": devices["get_pv"],
+            "device_set_pv": devices["set_pv"],
+            "family_name": families["family"],
+            "uc_field": unitconv["field"],
+            "uc_type": unitconv["uc_type"],
+            "uc_phys_units": unitconv["phys_units"],
+            "uc_eng_units": unitconv["eng_units"],
+        }
+    )
+    columns.update(indices)
+    ints, int_sizes = _pack(columns, INT_COLUMNS, numpy.int32)
+    floats, float_sizes = _pack(columns, FLOAT_COLUMNS, numpy.float64)
+    blob = "\0".join(strings).encode("utf-8")
+    arrays = {
+        "version": numpy.array(FORMAT_VERSION),
+        "strings": numpy.frombuffer(blob, dtype=numpy.uint8),
+        "ints": ints,
+        "floats": floats,
+        "sizes": numpy.array(int_sizes + float_sizes),
+    }
+    numpy.savez_compressed(filename, **arrays)
+
+
+def convert_csv(mode, filename, directory=None):
+    """Convert the csv files of a mode to a single compact file.
+
+    Args:
+        mode (str): The name of the mode to be converted.
+        filename (str): The path of the .npz file to write.
+        directory (str): Directory where to load the csv files from. If no
+                          directory is given the data directory at the root of
+                          the repository is used.
+    """
+    if directory is None:
+        directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+    path = os.path.join(directory, mode)
+    # As in load_csv.load(), the unit conversion files are optional.
+    unitconv_files = (UNITCONV_FILENAME, POLY_FILENAME, PCHIP_FILENAME)
+    has_unitconvs = os.path.exists(os.path.join(path, UNITCONV_FILENAME))
+    tables = {}
+    for name in COLUMNS:
+        if name in unitconv_files and not has_unitconvs:
+            tables[name] = _to_columns(COLUMNS[name], [], COLUMN_TYPES[name])
+        else:
+            tables[name] = read_columns(os.path.join(path, name), COLUMN_TYPES[name])
+    _write(filename, mode, tables)
+
+
+def save(lattice, filename, mode=None):
+    """Save a lattice to a compact file.
+
+    See load_csv.get_lattice_tables() for what is saved.
+
+    Args:
+        lattice (Lattice): The lattice to save.
+        filename (str): The path of the .npz file to write.
+        mode (str): The name of the mode; the name of the lattice if None.
+
+    Raises:
+        UnitsException: if a unit conversion is not null, polynomial or pchip.
+    """
+    _write(filename, mode or lattice.name, get_lattice_tables(lattice))
+
+
+def _read(data):
+    """Read the columns stored in a compact file.
+
+    Args:
+        data (numpy.lib.npyio.NpzFile): The contents of the file.
+
+    Returns:
+        dict: The columns, by name; the string columns hold the strings
+               themselves rather than their indices.
+    """
+    sizes = data["sizes"].tolist()
+    n_ints = len(INT_COLUMNS)
+    columns = _unpack(data["ints"], INT_COLUMNS, sizes[:n_ints])
+    columns.update(_unpack(data["floats"], FLOAT_COLUMNS, sizes[n_ints:]))
+    strings = data["strings"].tobytes().decode("utf-8").split("\0")
+    strings = numpy.array(strings, dtype=object)
+    for name in STRING_COLUMNS:
+        columns[name] = strings[columns[name]].tolist()
+    return columns
+
+
+def _load_tables(columns):
+    """Create the unit conversion tables stored in a compact file.
+
+    Tables with the same points are only created once.
+
+    Args:
+        columns (dict): The columns read from the file.
+
+    Returns:
+        dict: The unit conversion of each table, by id.
+    """
+    unitconvs = {}
+    created = {}
+    coeffs = columns["poly_coeff"].tolist()
+    bounds = columns["poly_bounds"].tolist()
+    for uc_id, start, end in zip(columns["poly_id"].tolist(), bounds[:-1], bounds[1:]):
+        key = ("poly", tuple(coeffs[start:end]))
+        if key not in created:
+            created[key] = units.PolyUnitConv(coeffs[start:end])
+        unitconvs[uc_id] = created[key]
+    eng = columns["pchip_eng"].tolist()
+    phy = columns["pchip_phy"].tolist()
+    bounds = columns["pchip_bounds"].tolist()
+    for uc_id, start, end in zip(
+        columns["pchip_id"].tolist(), bounds[:-1], bounds[1:]
+    ):
+        key = ("pchip", tuple(eng[start:end]), tuple(phy[start:end]))
+        if key not in created:
+            created[key] = units.PchipUnitConv(eng[start:end], phy[start:end])
+        unitconvs[uc_id] = created[key]
+    return unitconvs
+
+
+def _group_rows(el_ids, n_elements):
+    """Find the rows of a table that belong to each element.
+
+    Args:
+        el_ids (numpy.array): The element id of each row.
+        n_elements (int): The number of elements.
+
+    Returns:
+        list: The rows of each element id, from 0 for the lattice itself to
+               n_elements, each in the order of the table.
+    """
+    order = numpy.argsort(el_ids, kind="stable")
+    bounds = numpy.searchsorted(el_ids[order], numpy.arange(n_elements + 2))
+    order = order.tolist()
+    bounds = bounds.tolist()
+    return [order[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def _create_lattice(columns, control_system, symmetry):
+    """Create the lattice described by the columns read from a compact file.
+
+    Args:
+        columns (dict): The columns read from the file.
+        control_system (ControlSystem): The control system to be used.
+        symmetry (int): The symmetry of the lattice (the number of cells).
+
+    Returns:
+        Lattice: The lattice containing all elements.
+    """
+    lat = lattice.EpicsLattice(columns["mode"][0], control_system, symmetry)
+    lat.set_data_source(data_source.DeviceDataSource(), pytac.LIVE)
+    lengths = columns["element_length"]
+    n_elements = len(lengths)
+    device_rows = _group_rows(columns["device_el_id"], n_elements)
+    family_rows = _group_rows(columns["family_el_id"], n_elements)
+    uc_rows = _group_rows(columns["uc_el_id"], n_elements)
+    devices = [
+        device.EpicsDevice(name, control_system, True, get_pv or None, set_pv or None)
+        for name, get_pv, set_pv in zip(
+            columns["device_name"], columns["device_get_pv"], columns["device_set_pv"]
+        )
+    ]
+    device_fields = columns["device_field"]
+    family_names = columns["family_name"]
+    # The arguments of the unit conversion of each row, and whether it is on
+    # a magnet, which also converts by the rigidity.
+    magnets = numpy.zeros(n_elements + 1, dtype=bool)
+    magnets[1:] = [family in RIGIDITY_FAMILIES for family in columns["element_type"]]
+    in_magnet_family = numpy.array(
+        [family in RIGIDITY_FAMILIES for family in family_names], dtype=bool
+    )
+    magnets[columns["family_el_id"][in_magnet_family]] = True
+    limits = [
+        numpy.where(numpy.isnan(columns[name]), None, columns[name]).tolist()
+        for name in ("uc_lower", "uc_upper")
+    ]
+    uc_args = list(
+        zip(
+            columns["uc_type"],
+            columns["uc_id"].tolist(),
+            columns["uc_phys_units"],
+            columns["uc_eng_units"],
+            limits[0],
+            limits[1],
+            magnets[columns["uc_el_id"]].tolist(),
+        )
+    )
+    uc_fields = columns["uc_field"]
+    tables = _load_tables(columns)
+    # Devices on index 0 are attached to the lattice not elements.
+    for row in device_rows[0]:
+        lat.add_device(device_fields[row], devices[row], DEFAULT_UC)
+    # Add basic devices to the lattice.
+    positions = numpy.concatenate(([0.0], numpy.cumsum(lengths)))[:n_elements]
+    lat.add_device("s_position", device.BasicDevice(positions.tolist()), DEFAULT_UC)
+    lat.add_device("energy", device.BasicDevice(3.0e09), DEFAULT_UC)
+    # The conversions of the lattice come first, as the rigidity of the
+    # magnets is calculated from the energy of the lattice.
+    for row in uc_rows[0]:
+        uc = _create_unitconv(lat, tables, *uc_args[row])
+        lat.set_unitconv(uc_fields[row], uc)
+    # Each element is created complete, with all its families, devices and
+    # unit conversions, before it is added to the lattice.
+    for name, family, length, el_families, el_devices, el_unitconvs in zip(
+        columns["element_name"],
+        columns["element_type"],
+        lengths.tolist(),
+        family_rows[1:],
+        device_rows[1:],
+        uc_rows[1:],
+    ):
+        e = element.EpicsElement(length, family, name or None)
+        e.add_to_family(family)
+        for row in el_families:
+            e.add_to_family(family_names[row])
+        e.set_data_source(data_source.DeviceDataSource(), pytac.LIVE)
+        for row in el_devices:
+            e.add_device(device_fields[row], devices[row], DEFAULT_UC)
+        for row in el_unitconvs:
+            uc = _create_unitconv(lat, tables, *uc_args[row])
+            e.set_unitconv(uc_fields[row], uc)
+        lat.add_element(e)
+    return lat
+
+
+def load(filename, control_system=None, symmetry=None, connect=None):
+    """Load the elements of a lattice from a compact file.
+
+    The lattice is the same as the one load_csv.load() creates from the csv
+    files the file was converted from.
+
+    Args:
+        filename (str): The path of the .npz file to load.
+        control_system (ControlSystem): The control system to be used. If none
+                                         is provided an EpicsControlSystem will
+                                         be created.
+        symmetry (int): The symmetry of the lattice (the number of cells).
+        connect (sequence or bool): The families whose PVs to start connecting
+                                     to in the background once the lattice is
+                                     loaded, or True for all PVs.
+
+    Returns:
+        Lattice: The lattice containing all elements.
+
+    Raises:
+        ValueError: if the file is not in a supported format version.
+        ControlSystemException: if the default control system, cothread, is not
+                                 installed.
+    """
+    control_system = _get_control_system(control_system)
+    with numpy.load(filename) as data:
+        if "version" not in data.files or int(data["version"]) != FORMAT_VERSION:
+            raise ValueError(
+                "{0} is not a version {1} lattice file.".format(
+                    filename, FORMAT_VERSION
+                )
+            )
+        columns = _read(data)
+    lat = _create_lattice(columns, control_system, symmetry)
+    if connect:
+        lat.connect(None if connect is True else connect)
+    return lat
@@ -0,0 +1,407 @@
+"""A control system that keeps PV values in memory, for testing and
+benchmarking without an IOC.
+"""
+import csv
+import logging
+import os
+import threading
+import time
+
+from pytac.cs import ControlSystem
+from pytac.exceptions import ControlSystemException
+from pytac.load_csv import DEVICES_FILENAME
+
+
+class InMemorySubscription(object):
+    """The monitors of a group of PVs on an InMemoryControlSystem.
+
+    .. Private Attributes:
+           _cs (InMemoryControlSystem): The control system monitored.
+           _monitors (list): The (pv, callback, index) monitors.
+    """
+
+    def __init__(self, control_system, monitors):
+        """
+        Args:
+            control_system (InMemoryControlSystem): The control system
+                                                     monitored.
+            monitors (list): The (pv, callback, index) monitors.
+
+        **Methods:**
+        """
+        self._cs = control_system
+        self._monitors = monitors
+
+    def close(self):
+        """Stop the updates for all the PVs."""
+        self._cs._remove_monitors(self._monitors)
+
+
+class InMemoryConnection(object):
+    """The completed connection of a group of PVs on an InMemoryControlSystem.
+
+    .. Private Attributes:
+           _unreachable (list): The PVs that could not be connected.
+    """
+
+    def __init__(self, unreachable):
+        """
+        Args:
+            unreachable (list): The PVs that could not be connected.
+
+        **Methods:**
+        """
+        self._unreachable = unreachable
+
+    def done(self):
+        """Returns:
+        bool: True, as the connections are made straight away.
+        """
+        return True
+
+    def result(self, timeout=None):
+        """Get the PVs that could not be connected.
+
+        Args:
+            timeout (float): Ignored, as the connections are made straight
+                              away.
+
+        Returns:
+            list: the PVs that could not be connected.
+        """
+        return list(self._unreachable)
+
+
+class InMemoryControlSystem(ControlSystem):
+    """A control system that stores PV values in a dictionary.
+
+    Calls can be slowed down by a fixed latency per call plus a latency per PV;
+    the PVs in a batch call are treated as being accessed in parallel, so a
+    batch waits for its slowest PV. Failures can be injected for any PV so
+    that the behaviour of the throw argument can be exercised. All methods
+    may be called from several threads at once.
+
+    **Attributes:**
+
+    Attributes:
+        latency (float): The time in seconds that every call takes.
+        pv_latency (dict): The additional time in seconds that accessing each
+                            PV takes.
+
+    .. Private Attributes:
+           _values (dict): The value of each PV.
+           _readbacks (dict): The readback PV updated by each setpoint PV.
+           _failing (set): The PVs that currently fail.
+           _monitors (dict): The (callback, index) monitors of each PV.
+           _sleep (function): The function used to wait.
+           _lock (threading.Lock): Protects the values and monitors.
+    """
+
+    def __init__(
+        self, values=None, readbacks=None, latency=0.0, pv_latency=None, sleep=None
+    ):
+        """
+        Args:
+            values (dict): The initial value of each PV.
+            readbacks (dict): The readback PV that is updated whenever each
+                               setpoint PV is set.
+            latency (float): The time in seconds that every call takes.
+            pv_latency (dict): The additional time in seconds that accessing
+                                each PV takes.
+            sleep (function): The function used to wait, time.sleep if None.
+
+        **Methods:**
+        """
+        self.latency = latency
+        self.pv_latency = dict(pv_latency or {})
+        self._values = dict(values or {})
+        self._readbacks = dict(readbacks or {})
+        self._failing = set()
+        self._monitors = {}
+        self._sleep = time.sleep if sleep is None else sleep
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_csv(cls, mode, directory=None, value=0.0, **kwargs):
+        """Create a control system holding every PV of a mode's devices.csv.
+
+        Setting a device's setpoint PV also updates its readback PV.
+
+        Args:
+            mode (str): The name of the mode to be loaded.
+            directory (str): Directory where to load the files from. If no
+                              directory is given the data directory at the
+                              root of the repository is used.
+            value (object): The initial value of every PV.
+            **kwargs: Other arguments to the InMemoryControlSystem constructor.
+
+        Returns:
+            InMemoryControlSystem: the new control system.
+        """
+        if directory is None:
+            directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+        values = {}
+        readbacks = {}
+        with open(os.path.join(directory, mode, DEVICES_FILENAME)) as devices:
+            csv_reader = csv.DictReader(devices)
+            for item in csv_reader:
+                for pv in (item["get_pv"], item["set_pv"]):
+                    if pv:
+                        values[pv] = value
+                if item["get_pv"] and item["set_pv"]:
+                    readbacks[item["set_pv"]] = item["get_pv"]
+        return cls(values, readbacks, **kwargs)
+
+    def get_values(self):
+        """Get a copy of the values of all PVs.
+
+        Returns:
+            dict: the value of each PV.
+        """
+        with self._lock:
+            return dict(self._values)
+
+    def fail(self, pvs):
+        """Make the given PVs fail until they are restored.
+
+        Args:
+            pvs (sequence): PVs to fail.
+        """
+        with self._lock:
+            self._failing.update(pvs)
+
+    def restore(self, pvs=None):
+        """Stop the given PVs from failing.
+
+        Args:
+            pvs (sequence): PVs to restore, or None to restore all PVs.
+        """
+        with self._lock:
+            if pvs is None:
+                self._failing.clear()
+            else:
+                self._failing.difference_update(pvs)
+
+    def _wait(self, pvs):
+        """Wait for the latency of a call accessing the given PVs.
+
+        Args:
+            pvs (sequence): PVs accessed by the call.
+        """
+        delay = self.latency
+        if self.pv_latency:
+            delay += max([0.0] + [self.pv_latency.get(pv, 0.0) for pv in pvs])
+        if delay > 0:
+            self._sleep(delay)
+
+    def _get(self, pv):
+        """Get the value of a PV; the lock must be held.
+
+        Args:
+            pv (str): PV to get the value of.
+
+        Returns:
+            tuple: (ok, value).
+        """
+        if pv in self._failing or pv not in self._values:
+            return False, None
+        return True, self._values[pv]
+
+    def _set(self, pv, value):
+        """Set the value of a PV and its readback; the lock must be held.
+
+        Args:
+            pv (str): PV to set the value of.
+            value (object): The value to set the PV to.
+
+        Returns:
+            list: (callback, value, index) monitor updates to deliver once the
+                   lock has been released, or None if the PV failed.
+        """
+        if pv in self._failing or pv not in self._values:
+            return None
+        updates = []
+        for updated_pv in (pv, self._readbacks.get(pv)):
+            if updated_pv is not None and updated_pv in self._values:
+                self._values[updated_pv] = value
+                for callback, index in self._monitors.get(updated_pv, []):
+                    updates.append((callback, value, index))
+        return updates
+
+    def get_single(self, pv, throw=True):
+        """Get the value of a given PV.
+
+        Args:
+            pv (string): The process variable given as a string. It can be a
+                         readback or a setpoint PV.
+            throw (bool): On failure: if True, raise ControlSystemException; if
+                           False, return None and log a warning.
+
+        Returns:
+            object: the current value of the given PV.
+
+        Raises:
+            ControlSystemException: if the PV fails or does not exist.
+        """
+        self._wait([pv])
+        with self._lock:
+            ok, value = self._get(pv)
+        if not ok:
+            error_msg = "Cannot connect to {}.".format(pv)
+            if throw:
+                raise ControlSystemException(error_msg)
+            logging.warning(error_msg)
+        return value
+
+    def get_multiple(self, pvs, throw=True):
+        """Get the value for given PVs.
+
+        Args:
+            pvs (sequence): PVs to get values of.
+            throw (bool): On failure: if True, raise ControlSystemException; if
+                           False, None will be returned for any PV that fails
+                           and a warning will be logged.
+
+        Returns:
+            list(object): the current values of the PVs.
+
+        Raises:
+            ControlSystemException: if one or more PVs fail or do not exist.
+        """
+        self._wait(pvs)
+        with self._lock:
+            results = [self._get(pv) for pv in pvs]
+        failures = 0
+        for pv, (ok, _) in zip(pvs, results):
+            if not ok:
+                logging.warning("Cannot connect to {}.".format(pv))
+                failures += 1
+        if throw and failures:
+            raise ControlSystemException("{} caget calls failed.".format(failures))
+        return [value for _, value in results]
+
+    def set_single(self, pv, value, throw=True):
+        """Set the value of a given PV.
+
+        Args:
+            pv (string): PV to set the value of.
+            value (object): The value to set the PV to.
+            throw (bool): On failure: if True, raise ControlSystemException: if
+                           False, log a warning.
+
+        Returns:
+            bool: True for success, False for failure
+
+        Raises:
+            ControlSystemException: if the PV fails or does not exist.
+        """
+        self._wait([pv])
+        with self._lock:
+            updates = self._set(pv, value)
+        if updates is None:
+            error_msg = "Cannot connect to {}.".format(pv)
+            if throw:
+                raise ControlSystemException(error_msg)
+            logging.warning(error_msg)
+            return False
+        self._deliver(updates)
+        return True
+
+    def set_multiple(self, pvs, values, throw=True):
+        """Set the values for given PVs.
+
+        Args:
+            pvs (sequence): PVs to set the values of.
+            values (sequence): values to set to the PVs.
+            throw (bool): On failure, if True raise ControlSystemException, if
+                           False return a list of True and False values
+                           corresponding to successes and failures and log a
+                           warning for each PV that fails.
+
+        Returns:
+            list(bool): True for success, False for failure; only returned if
+                         throw is false and a failure occurs.
+
+        Raises:
+            ValueError: if the lists of values and PVs are diffent lengths.
+            ControlSystemException: if one or more PVs fail or do not exist.
+        """
+        if len(pvs) != len(values):
+            raise ValueError("Please enter the same number of values as PVs.")
+        self._wait(pvs)
+        with self._lock:
+            results = [self._set(pv, value) for pv, value in zip(pvs, values)]
+        return_values = []
+        for pv, updates in zip(pvs, results):
+            if updates is None:
+                logging.warning("Cannot connect to {}.".format(pv))
+                return_values.append(False)
+            else:
+                self._deliver(updates)
+                return_values.append(True)
+        if not all(return_values):
+            if throw:
+                error_msg = "{} caput calls failed.".format(return_values.count(False))
+                raise ControlSystemException(error_msg)
+            else:
+                return return_values
+
+    def monitor_multiple(self, pvs, callback):
+        """Subscribe to updates of the given PVs.
+
+        The callback is called with the current value of each PV straight
+        away, and then whenever it is set.
+
+        Args:
+            pvs (sequence): PVs to monitor.
+            callback (function): called as callback(value, index) whenever the
+                                  PV at position index in pvs updates.
+
+        Returns:
+            InMemorySubscription: the subscription, which has a close() method
+                                   to stop the updates.
+        """
+        monitors = [(pv, callback, index) for index, pv in enumerate(pvs)]
+        with self._lock:
+            for pv, _, index in monitors:
+                self._monitors.setdefault(pv, []).append((callback, index))
+            initial = [(callback, self._get(pv)[1], i) for pv, _, i in monitors]
+        self._deliver(initial)
+        return InMemorySubscription(self, monitors)
+
+    def connect_multiple(self, pvs, timeout=None):
+        """Connect to the given PVs.
+
+        PVs that are failing or do not exist cannot be connected.
+
+        Args:
+            pvs (sequence): PVs to connect to.
+            timeout (float): Ignored, as the connections are made straight
+                              away.
+
+        Returns:
+            InMemoryConnection: the completed connections.
+        """
+        with self._lock:
+            unreachable = [pv for pv in pvs if not self._get(pv)[0]]
+        return InMemoryConnection(unreachable)
+
+    def _remove_monitors(self, monitors):
+        """Remove monitors added by monitor_multiple.
+
+        Args:
+            monitors (list): The (pv, callback, index) monitors to remove.
+        """
+        with self._lock:
+            for pv, callback, index in monitors:
+                if (callback, index) in self._monitors.get(pv, []):
+                    self._monitors[pv].remove((callback, index))
+
+    def _deliver(self, updates):
+        """Call monitor callbacks, outside the lock.
+
+        Args:
+            updates (list): (callback, value, index) updates.
+        """
+        for callback, value, index in updates:
+            callback(value, index)
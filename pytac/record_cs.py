@@ -0,0 +1,525 @@
+"""Control systems that record calls to another control system and replay them.
+
+A RecordingControlSystem wraps any control system, for example a
+CothreadControlSystem, and writes every get and set call, with its result and
+how long it took, to a gzip-compressed file. A ReplayControlSystem serves the
+recorded values back without any network access, optionally reproducing the
+recorded latencies.
+
+The file holds one JSON list per line: a header of the format name, version
+and start time, then one line per call. Being plain data, a record file can be
+read without running any code from it, unlike a pickle.
+"""
+import collections
+import gzip
+import json
+import logging
+import random
+import time
+
+import numpy
+
+from pytac.cs import ControlSystem
+from pytac.exceptions import ControlSystemException
+
+
+FORMAT_NAME = "pytac-cs-record"
+FORMAT_VERSION = 2
+# Record is (time since start, operation, pvs, values, results, duration, error).
+Record = collections.namedtuple(
+    "Record", ["time", "operation", "pvs", "values", "results", "duration", "error"]
+)
+
+
+def _plain(value):
+    """Convert a value returned by a control system to a plain Python or numpy
+    type, so that it can be loaded without the control system installed.
+
+    Args:
+        value (object): the value to convert.
+
+    Returns:
+        object: the converted value.
+    """
+    if value is None or type(value) in (bool, int, float, str):
+        return value
+    if isinstance(value, numpy.ndarray):
+        return numpy.asarray(value).copy()
+    if isinstance(value, numpy.generic):
+        return value.item()
+    for plain_type in (bool, int, float, str):
+        if isinstance(value, plain_type):
+            return plain_type(value)
+    return value
+
+
+def _encode(value):
+    """Encode a value json cannot write by itself; used as json's default.
+
+    Args:
+        value (object): the value to encode.
+
+    Returns:
+        dict: the elements and dtype of a numpy array.
+
+    Raises:
+        TypeError: if the value is not a numpy array.
+    """
+    if isinstance(value, numpy.ndarray):
+        return {"array": value.tolist(), "dtype": value.dtype.str}
+    raise TypeError("{0!r} cannot be recorded.".format(value))
+
+
+def _decode(obj):
+    """Decode a value written by _encode(); used as json's object_hook.
+
+    Args:
+        obj (dict): the encoded value.
+
+    Returns:
+        numpy.array: the array.
+    """
+    return numpy.array(obj["array"], dtype=obj["dtype"])
+
+
+def _dump(data, f):
+    """Write data as one JSON line.
+
+    Args:
+        data (list): the data to write.
+        f (file): the file, opened in binary mode.
+    """
+    f.write((json.dumps(data, default=_encode) + "\n").encode("utf-8"))
+
+
+class RecordingControlSystem(ControlSystem):
+    """A control system that records every call made to another control system.
+
+    **Methods:**
+
+    .. Private Attributes:
+           _cs (ControlSystem): The control system the calls are passed to.
+           _file (file): The open record file.
+           _start (float): The time the recording started.
+    """
+
+    def __init__(self, control_system, filename):
+        """
+        Args:
+            control_system (ControlSystem): The control system to record.
+            filename (str): The path of the record file to write.
+        """
+        self._cs = control_system
+        self._file = gzip.open(filename, "wb")
+        self._start = time.time()
+        _dump([FORMAT_NAME, FORMAT_VERSION, self._start], self._file)
+
+    def _call(self, operation, pvs, values, method, args):
+        """Make a call on the wrapped control system and record it.
+
+        Args:
+            operation (str): the name of the method called.
+            pvs (list): the PVs of the call.
+            values (list): the values set, or None for a get.
+            method (function): the method to call.
+            args (tuple): the arguments to the method.
+
+        Returns:
+            object: the result of the call.
+        """
+        start = time.time()
+        try:
+            result = method(*args)
+        except ControlSystemException as e:
+            # A failed set is recorded as a failure of each of its PVs so that
+            # it is replayed as one; a failed get has no values to record.
+            results = [False] * len(pvs) if values is not None else None
+            self._write(operation, pvs, values, results, start, str(e))
+            raise
+        if not operation.endswith("_multiple"):
+            results = [_plain(result)]
+        elif result is None:
+            # A set_multiple that fully succeeds returns None.
+            results = [True] * len(pvs)
+        else:
+            results = [_plain(r) for r in result]
+        self._write(operation, pvs, values, results, start, None)
+        return result
+
+    def _write(self, operation, pvs, values, results, start, error):
+        """Write one call to the record file.
+
+        Args:
+            operation (str): the name of the method called.
+            pvs (list): the PVs of the call.
+            values (list): the values set, or None for a get.
+            results (list): the result for each PV, or None if a get raised.
+            start (float): the time the call started.
+            error (str): the error raised by the call, or None.
+        """
+        record = Record(
+            start - self._start,
+            operation,
+            pvs,
+            values,
+            results,
+            time.time() - start,
+            error,
+        )
+        _dump(list(record), self._file)
+
+    def get_single(self, pv, throw=True):
+        """Get the value of a given PV, recording the call.
+
+        Args:
+            pv (string): PV to get the value of.
+            throw (bool): On failure: if True, raise ControlSystemException; if
+                           False, return None and log a warning.
+
+        Returns:
+            object: the current value of the given PV.
+        """
+        return self._call("get_single", [pv], None, self._cs.get_single, (pv, throw))
+
+    def get_multiple(self, pvs, throw=True):
+        """Get the value for given PVs, recording the call.
+
+        Args:
+            pvs (sequence): PVs to get values of.
+            throw (bool): On failure: if True, raise ControlSystemException; if
+                           False, None will be returned for any PV that fails
+                           and a warning will be logged.
+
+        Returns:
+            list(object): the current values of the PVs.
+        """
+        return self._call(
+            "get_multiple", list(pvs), None, self._cs.get_multiple, (pvs, throw)
+        )
+
+    def set_single(self, pv, value, throw=True):
+        """Set the value of a given PV, recording the call.
+
+        Args:
+            pv (string): The PV to set the value of.
+            value (object): The value to set the PV to.
+            throw (bool): On failure: if True, raise ControlSystemException: if
+                           False, log a warning.
+
+        Returns:
+            bool: True for success, False for failure.
+        """
+        return self._call(
+            "set_single", [pv], [_plain(value)], self._cs.set_single, (pv, value, throw)
+        )
+
+    def set_multiple(self, pvs, values, throw=True):
+        """Set the values for given PVs, recording the call.
+
+        Args:
+            pvs (sequence): PVs to set the values of.
+            values (sequence): values to set to the PVs.
+            throw (bool): On failure, if True raise ControlSystemException, if
+                           False return a list of True and False values
+                           corresponding to successes and failures and log a
+                           warning for each PV that fails.
+
+        Returns:
+            list(bool): True for success, False for failure; only returned if
+                         throw is false and a failure occurs.
+        """
+        return self._call(
+            "set_multiple",
+            list(pvs),
+            [_plain(v) for v in values],
+            self._cs.set_multiple,
+            (pvs, values, throw),
+        )
+
+    def monitor_multiple(self, pvs, callback):
+        """Subscribe to updates of the given PVs on the wrapped control system.
+
+        Monitor updates are not recorded.
+
+        Args:
+            pvs (sequence): PVs to monitor.
+            callback (function): called as callback(value, index) whenever the
+                                  PV at position index in pvs updates.
+
+        Returns:
+            object: the subscription, which has a close() method.
+        """
+        return self._cs.monitor_multiple(pvs, callback)
+
+    def connect_multiple(self, pvs, timeout=None):
+        """Start connecting to the given PVs on the wrapped control system.
+
+        Connections are not recorded.
+
+        Args:
+            pvs (sequence): PVs to connect to.
+            timeout (float): How long to wait for the connections in seconds;
+                              the wrapped control system's default if None.
+
+        Returns:
+            object: the future of the connections.
+        """
+        return self._cs.connect_multiple(pvs, timeout)
+
+    def close(self):
+        """Finish writing the record file."""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_records(filename):
+    """Read the calls in a record file.
+
+    Args:
+        filename (str): The path of the record file.
+
+    Returns:
+        list(Record): the recorded calls in the order they were made.
+
+    Raises:
+        ValueError: if the file is not a control system record file.
+    """
+    with gzip.open(filename, "rb") as f:
+        try:
+            lines = f.read().decode("utf-8").splitlines()
+            header = json.loads(lines[0])
+        except Exception:
+            header = None
+        if not (
+            isinstance(header, list) and header[:2] == [FORMAT_NAME, FORMAT_VERSION]
+        ):
+            raise ValueError("{0} is not a control system record.".format(filename))
+    return [Record(*json.loads(line, object_hook=_decode)) for line in lines[1:]]
+
+
+class ReplayControlSystem(ControlSystem):
+    """A control system that serves the values of a recording.
+
+    Each PV returns its recorded values in the order they were recorded,
+    whether they were recorded through get_single or get_multiple. Set calls
+    return the recorded success or failure of each PV in the same way, or
+    success for PVs that were never set. When the recorded values or set
+    results of a PV run out they start again from the beginning if loop is
+    True, and are treated as failures if not. Optionally each call is delayed
+    by a latency drawn from the latencies recorded for that operation.
+
+    **Methods:**
+
+    .. Private Attributes:
+           _values (dict): The recorded values of each PV.
+           _positions (dict): The position of the next value of each PV.
+           _set_results (dict): The recorded set results of each PV.
+           _set_positions (dict): The position of the next set result of each
+                                   PV.
+           _latencies (dict): The recorded latencies of each operation.
+           _reproduce_latency (bool): Whether to delay each call.
+           _loop (bool): Whether to start again when values run out.
+           _random (random.Random): The source of the latencies chosen.
+           _sleep (function): The function used to wait.
+    """
+
+    def __init__(
+        self, filename, reproduce_latency=False, loop=True, seed=0, sleep=time.sleep
+    ):
+        """
+        Args:
+            filename (str): The path of the record file.
+            reproduce_latency (bool): Whether to delay each call by a latency
+                                       drawn from the recorded latencies.
+            loop (bool): Whether to start the values and set results of a PV
+                          again when they run out; if False they are treated
+                          as failures.
+            seed (int): The seed for drawing latencies, for repeatability.
+            sleep (function): The function used to wait.
+        """
+        self._values = collections.defaultdict(list)
+        self._positions = collections.defaultdict(int)
+        self._set_results = collections.defaultdict(list)
+        self._set_positions = collections.defaultdict(int)
+        self._latencies = collections.defaultdict(list)
+        self._reproduce_latency = reproduce_latency
+        self._loop = loop
+        self._random = random.Random(seed)
+        self._sleep = sleep
+        for record in read_records(filename):
+            self._latencies[record.operation].append(record.duration)
+            if record.operation.startswith("get"):
+                results = record.results or [None] * len(record.pvs)
+                for pv, result in zip(record.pvs, results):
+                    self._values[pv].append(result)
+            else:
+                for pv, result in zip(record.pvs, record.results):
+                    self._set_results[pv].append(bool(result))
+
+    def _delay(self, operation):
+        """Wait for a latency drawn from the recorded latencies of the given
+        operation, if latencies are being reproduced.
+
+        Args:
+            operation (str): the name of the method called.
+        """
+        if self._reproduce_latency and self._latencies[operation]:
+            self._sleep(self._random.choice(self._latencies[operation]))
+
+    def _next(self, recorded, positions, pv, default):
+        """Get the next recorded entry of a PV.
+
+        Args:
+            recorded (dict): the recorded entries of each PV.
+            positions (dict): the position of the next entry of each PV.
+            pv (str): the PV to get the entry of.
+            default (object): the entry if the PV was never recorded.
+
+        Returns:
+            object: the entry, or None if the entries have run out and loop
+                     is False.
+        """
+        entries = recorded.get(pv)
+        if not entries:
+            return default
+        position = positions[pv]
+        if position >= len(entries):
+            if not self._loop:
+                return None
+            position = 0
+        positions[pv] = position + 1
+        return entries[position]
+
+    def _next_value(self, pv):
+        """Get the next recorded value of a PV.
+
+        Args:
+            pv (str): the PV to get the value of.
+
+        Returns:
+            object: the value, or None if there is no recorded value.
+        """
+        return self._next(self._values, self._positions, pv, None)
+
+    def _next_set_result(self, pv):
+        """Get the next recorded set result of a PV.
+
+        Args:
+            pv (str): the PV being set.
+
+        Returns:
+            bool: the recorded result, True if the PV was never set and False
+                   if its results have run out and loop is False.
+        """
+        return bool(self._next(self._set_results, self._set_positions, pv, True))
+
+    def get_single(self, pv, throw=True):
+        """Get the next recorded value of a given PV.
+
+        Args:
+            pv (string): PV to get the value of.
+            throw (bool): On failure: if True, raise ControlSystemException; if
+                           False, return None and log a warning.
+
+        Returns:
+            object: the recorded value of the given PV.
+
+        Raises:
+            ControlSystemException: if there is no recorded value.
+        """
+        self._delay("get_single")
+        value = self._next_value(pv)
+        if value is None:
+            error_msg = "Cannot connect to {}.".format(pv)
+            if throw:
+                raise ControlSystemException(error_msg)
+            logging.warning(error_msg)
+        return value
+
+    def get_multiple(self, pvs, throw=True):
+        """Get the next recorded values for given PVs.
+
+        Args:
+            pvs (sequence): PVs to get values of.
+            throw (bool): On failure: if True, raise ControlSystemException; if
+                           False, None will be returned for any PV that fails
+                           and a warning will be logged.
+
+        Returns:
+            list(object): the recorded values of the PVs.
+
+        Raises:
+            ControlSystemException: if there is no recorded value for one or
+                                     more PVs.
+        """
+        self._delay("get_multiple")
+        values = [self._next_value(pv) for pv in pvs]
+        failures = [pv for pv, value in zip(pvs, values) if value is None]
+        for pv in failures:
+            logging.warning("Cannot connect to {}.".format(pv))
+        if throw and failures:
+            raise ControlSystemException("{} caget calls failed.".format(len(failures)))
+        return values
+
+    def set_single(self, pv, value, throw=True):
+        """Set the value of a given PV, returning its recorded result.
+
+        Args:
+            pv (string): PV to set the value of.
+            value (object): The value to set the PV to.
+            throw (bool): On failure: if True, raise ControlSystemException: if
+                           False, log a warning.
+
+        Returns:
+            bool: True for success, False for failure.
+
+        Raises:
+            ControlSystemException: if the recorded set failed.
+        """
+        self._delay("set_single")
+        if self._next_set_result(pv):
+            return True
+        error_msg = "Cannot connect to {}.".format(pv)
+        if throw:
+            raise ControlSystemException(error_msg)
+        logging.warning(error_msg)
+        return False
+
+    def set_multiple(self, pvs, values, throw=True):
+        """Set the values for given PVs, returning their recorded results.
+
+        Args:
+            pvs (sequence): PVs to set the values of.
+            values (sequence): values to set to the PVs.
+            throw (bool): On failure, if True raise ControlSystemException, if
+                           False return a list of True and False values
+                           corresponding to successes and failures and log a
+                           warning for each PV that fails.
+
+        Returns:
+            list(bool): True for success, False for failure; only returned if
+                         throw is false and a failure occurs.
+
+        Raises:
+            ValueError: if the lists of values and PVs are diffent lengths.
+            ControlSystemException: if the recorded set failed for one or more
+                                     PVs.
+        """
+        if len(pvs) != len(values):
+            raise ValueError("Please enter the same number of values as PVs.")
+        self._delay("set_multiple")
+        results = [self._next_set_result(pv) for pv in pvs]
+        failures = [pv for pv, result in zip(pvs, results) if not result]
+        for pv in failures:
+            logging.warning("Cannot connect to {}.".format(pv))
+        if failures:
+            if throw:
+                raise ControlSystemException(
+                    "{} caput calls failed.".format(len(failures))
+                )
+            return results
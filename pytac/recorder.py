@@ -0,0 +1,328 @@
+"""Module to record family readings to a fixed-size memory-mapped ring file.
+
+The file holds a header describing the recorded channels followed by a ring
+of float64 rows. Each row is a timestamp followed by the values of every
+channel, in the order given in the header. The file can be read by other
+processes while it is being written using read_flight_record().
+
+File layout:
+
+ * 8 bytes: the magic string MAGIC.
+ * 8 bytes: the length of the JSON header in bytes (little-endian uint64).
+ * The JSON header, padded with spaces to a multiple of 8 bytes.
+ * 8 bytes: the number of rows written so far (little-endian uint64).
+ * capacity + 1 rows of row_width little-endian float64 values. The extra
+   row is the one being written, so capacity complete rows can always be read.
+"""
+import json
+import struct
+import time
+
+import numpy
+
+import pytac
+from pytac.exceptions import FieldException
+
+
+MAGIC = b"PYTACFR1"
+_HEADER_PREFIX = struct.Struct("<8sQ")
+_COUNT_DTYPE = numpy.dtype("<u8")
+_ROW_DTYPE = numpy.dtype("<f8")
+
+
+def _layout(header_length, capacity, row_width):
+    """Get the offsets of the row count and the rows, and the file size.
+
+    Args:
+        header_length (int): The length of the padded JSON header.
+        capacity (int): The number of rows in the ring.
+        row_width (int): The number of values in each row.
+
+    Returns:
+        tuple: (count_offset, rows_offset, file_size).
+    """
+    count_offset = _HEADER_PREFIX.size + header_length
+    rows_offset = count_offset + _COUNT_DTYPE.itemsize
+    return (
+        count_offset,
+        rows_offset,
+        rows_offset + (capacity + 1) * row_width * _ROW_DTYPE.itemsize,
+    )
+
+
+class FlightRecorder(object):
+    """Record periodic readings of families to a memory-mapped ring file.
+
+    Once the ring is full the oldest rows are overwritten, so the file size
+    and the memory used stay fixed however long the recorder runs.
+
+    **Attributes:**
+
+    Attributes:
+        filename (str): The path of the ring file.
+        capacity (int): The number of rows in the ring.
+        header (dict): The description of the recorded channels.
+
+    .. Private Attributes:
+           _lattice (Lattice): The lattice the values are read from.
+           _channels (list): The (family, field) pairs recorded.
+           _handle (str): pytac.RB or pytac.SP.
+           _units (str): pytac.ENG or pytac.PHYS.
+           _data_source (str): pytac.LIVE or pytac.SIM.
+           _throw (bool): Whether failed reads raise an exception.
+           _slices (list): The columns of each channel within a row.
+           _count (numpy.memmap): The number of rows written so far.
+           _rows (numpy.memmap): The ring of rows.
+           _row (numpy.array): The row being assembled.
+    """
+
+    def __init__(
+        self,
+        lattice,
+        channels,
+        filename,
+        capacity,
+        handle=pytac.RB,
+        units=pytac.DEFAULT,
+        data_source=pytac.DEFAULT,
+        throw=False,
+    ):
+        """Create the ring file, replacing any existing file.
+
+        Args:
+            lattice (Lattice): The lattice the values are read from.
+            channels (sequence): (family, field) pairs to record.
+            filename (str): The path of the ring file.
+            capacity (int): The number of rows in the ring.
+            handle (str): pytac.RB or pytac.SP.
+            units (str): pytac.ENG or pytac.PHYS.
+            data_source (str): pytac.LIVE or pytac.SIM.
+            throw (bool): On failure: if True, raise ControlSystemException; if
+                           False, NaN will be recorded for any PV that fails
+                           and a warning will be logged.
+
+        Raises:
+            ValueError: if capacity is less than 1 or no channels are given.
+
+        **Methods:**
+        """
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1 ({0}).".format(capacity))
+        if len(channels) == 0:
+            raise ValueError("At least one channel must be recorded.")
+        if data_source == pytac.DEFAULT:
+            data_source = lattice.get_default_data_source()
+        if units == pytac.DEFAULT:
+            units = lattice.get_default_units()
+        self.filename = filename
+        self.capacity = capacity
+        self._lattice = lattice
+        self._channels = [tuple(channel) for channel in channels]
+        self._handle = handle
+        self._units = units
+        self._data_source = data_source
+        self._throw = throw
+        self.header = self._make_header()
+        self._slices = []
+        column = 1
+        for channel in self.header["channels"]:
+            self._slices.append(slice(column, column + channel["size"]))
+            column += channel["size"]
+        self._row = numpy.empty(self.header["row_width"], dtype=_ROW_DTYPE)
+        self._create_file()
+
+    def _make_header(self):
+        """Describe the recorded channels.
+
+        Returns:
+            dict: the header to store in the file.
+        """
+        channels = []
+        for family, field in self._channels:
+            elements = self._lattice.get_elements(family)
+            labels = []
+            for element in elements:
+                try:
+                    uc = element.get_unitconv(field)
+                    if self._units == pytac.PHYS:
+                        labels.append(uc.phys_units)
+                    else:
+                        labels.append(uc.eng_units)
+                except FieldException:
+                    labels.append("")
+            try:
+                pv_names = self._lattice.get_element_pv_names(
+                    family, field, self._handle
+                )
+            except AttributeError:
+                pv_names = [None] * len(elements)
+            channels.append(
+                {
+                    "family": family,
+                    "field": field,
+                    "size": len(elements),
+                    "pvs": pv_names,
+                    "units": labels,
+                }
+            )
+        return {
+            "lattice": self._lattice.name,
+            "handle": self._handle,
+            "units": self._units,
+            "data_source": self._data_source,
+            "capacity": self.capacity,
+            "row_width": 1 + sum(c["size"] for c in channels),
+            "channels": channels,
+        }
+
+    def _create_file(self):
+        """Write the header and map the row count and the ring of rows."""
+        header = json.dumps(self.header).encode("utf-8")
+        header += b" " * (-len(header) % 8)
+        count_offset, rows_offset, size = _layout(
+            len(header), self.capacity, self.header["row_width"]
+        )
+        with open(self.filename, "wb") as f:
+            f.write(_HEADER_PREFIX.pack(MAGIC, len(header)))
+            f.write(header)
+            f.truncate(size)
+        self._count = numpy.memmap(
+            self.filename, _COUNT_DTYPE, "r+", count_offset, (1,)
+        )
+        self._rows = numpy.memmap(
+            self.filename,
+            _ROW_DTYPE,
+            "r+",
+            rows_offset,
+            (self.capacity + 1, self.header["row_width"]),
+        )
+
+    @property
+    def n_rows(self):
+        """int: The number of rows written so far, including overwritten ones."""
+        return int(self._count[0])
+
+    def record(self, timestamp=None):
+        """Read all the channels once and append the row to the ring.
+
+        The row is written before the row count is increased, so a reader
+        never sees a partly written row as complete.
+
+        Args:
+            timestamp (float): The time of the reading, now if None.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        row = self._row
+        row[0] = timestamp
+        for (family, field), columns in zip(self._channels, self._slices):
+            row[columns] = self._lattice.get_element_values(
+                family,
+                field,
+                self._handle,
+                self._units,
+                self._data_source,
+                self._throw,
+                dtype=float,
+            )
+        n_rows = self.n_rows
+        self._rows[n_rows % (self.capacity + 1)] = row
+        self._count[0] = n_rows + 1
+
+    def run(self, rate, duration=None, sleep=time.sleep):
+        """Record rows at a fixed rate.
+
+        Args:
+            rate (float): The number of rows to record per second.
+            duration (float): How long to record for in seconds; None to record
+                               until interrupted.
+            sleep (function): The function used to wait; for example
+                               cothread.Sleep when using cothread.
+        """
+        period = 1.0 / rate
+        start = next_time = time.time()
+        while duration is None or next_time - start < duration:
+            self.record()
+            next_time += period
+            delay = next_time - time.time()
+            if delay > 0:
+                sleep(delay)
+            else:
+                # Fallen behind; skip the missed rows rather than catching up.
+                next_time = time.time()
+
+    def dump(self, filename):
+        """Save the rows currently in the ring to a numpy .npz file.
+
+        Args:
+            filename (str): The path of the file to write.
+        """
+        dump_flight_record(self.filename, filename)
+
+    def close(self):
+        """Flush the ring file and release the memory maps."""
+        self._rows.flush()
+        self._count.flush()
+        del self._rows
+        del self._count
+
+
+def read_flight_record(filename):
+    """Read the rows currently in a flight recorder ring file.
+
+    This can be used while the file is being written. Rows that are
+    overwritten while they are being copied are discarded.
+
+    Args:
+        filename (str): The path of the ring file.
+
+    Returns:
+        tuple: (header, timestamps, values) where header is the description of
+                the recorded channels, timestamps is a numpy array of the times
+                of the rows, oldest first, and values is a numpy array with
+                one row per timestamp and the channel values in header order.
+
+    Raises:
+        ValueError: if the file is not a flight recorder file.
+    """
+    with open(filename, "rb") as f:
+        prefix = f.read(_HEADER_PREFIX.size)
+        if len(prefix) == _HEADER_PREFIX.size:
+            magic, header_length = _HEADER_PREFIX.unpack(prefix)
+        if len(prefix) != _HEADER_PREFIX.size or magic != MAGIC:
+            raise ValueError("{0} is not a flight recorder file.".format(filename))
+        header = json.loads(f.read(header_length).decode("utf-8"))
+    capacity = header["capacity"]
+    row_width = header["row_width"]
+    count_offset, rows_offset, _ = _layout(header_length, capacity, row_width)
+    count = numpy.memmap(filename, _COUNT_DTYPE, "r", count_offset, (1,))
+    slots = capacity + 1
+    rows = numpy.memmap(filename, _ROW_DTYPE, "r", rows_offset, (slots, row_width))
+    before = int(count[0])
+    data = numpy.array(rows)
+    after = int(count[0])
+    # Rows before..after were (or are being) written while copying, and each
+    # overwrote the row in the same slot, so those older rows are discarded.
+    first = max(0, before - capacity, after + 1 - slots)
+    data = data[numpy.arange(first, before) % slots]
+    return header, data[:, 0], data[:, 1:]
+
+
+def dump_flight_record(filename, dump_filename):
+    """Save the rows currently in a flight recorder ring file to a numpy .npz
+    file.
+
+    The .npz file contains the arrays 'timestamps' and 'values' and the JSON
+    header as the string array 'header'.
+
+    Args:
+        filename (str): The path of the ring file.
+        dump_filename (str): The path of the file to write.
+    """
+    header, timestamps, values = read_flight_record(filename)
+    numpy.savez(
+        dump_filename,
+        header=numpy.array(json.dumps(header)),
+        timestamps=timestamps,
+        values=values,
+    )
@@ -0,0 +1,331 @@
+"""Live streams of the values of a field on a family of elements.
+
+A stream is shared between all of its consumers: each upstream reading, from
+either polling or a monitor subscription, is handed to every consumer's own
+bounded queue. A consumer that falls behind loses readings according to its
+queue policy rather than holding up the others.
+"""
+import collections
+import logging
+import threading
+import time
+
+import numpy
+
+import pytac
+
+
+# Queue policies for when a consumer's queue is full.
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+# How long to wait between checks for new monitor updates when no rate is set.
+IDLE_INTERVAL = 0.01
+
+
+class StreamSubscriber(object):
+    """A consumer of a FamilyStream.
+
+    Iterating over a subscriber yields (timestamp, values) tuples, where values
+    is a read-only numpy array shared with the other consumers of the stream.
+
+    **Attributes:**
+
+    Attributes:
+        maxlen (int): The maximum number of readings held in the queue.
+        policy (str): DROP_OLDEST to discard the oldest queued reading when the
+                       queue is full, DROP_NEWEST to discard the new reading.
+        dropped (int): The number of readings discarded so far.
+
+    .. Private Attributes:
+           _stream (FamilyStream): The stream this subscriber consumes.
+           _queue (collections.deque): The queued readings.
+           _closed (bool): Whether the subscriber has been closed.
+    """
+
+    def __init__(self, stream, maxlen=1, policy=DROP_OLDEST):
+        """
+        Args:
+            stream (FamilyStream): The stream to consume.
+            maxlen (int): The maximum number of readings held in the queue.
+            policy (str): DROP_OLDEST or DROP_NEWEST.
+
+        Raises:
+            ValueError: if maxlen is less than 1 or policy is not understood.
+
+        **Methods:**
+        """
+        if maxlen < 1:
+            raise ValueError("Queue length must be at least 1 ({0}).".format(maxlen))
+        if policy not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(
+                "{0} is not a queue policy. Please enter {1} or {2}.".format(
+                    policy, DROP_OLDEST, DROP_NEWEST
+                )
+            )
+        self.maxlen = maxlen
+        self.policy = policy
+        self.dropped = 0
+        self._stream = stream
+        self._queue = collections.deque()
+        self._closed = False
+
+    def put(self, reading):
+        """Queue a reading, discarding one if the queue is full.
+
+        Args:
+            reading (tuple): A (timestamp, values) tuple.
+        """
+        if len(self._queue) >= self.maxlen:
+            self.dropped += 1
+            if self.policy == DROP_NEWEST:
+                return
+            self._queue.popleft()
+        self._queue.append(reading)
+
+    def get(self):
+        """Wait for the next reading.
+
+        Returns:
+            tuple: A (timestamp, values) tuple.
+
+        Raises:
+            StopIteration: if the subscriber has been closed.
+        """
+        while not self._queue:
+            if self._closed:
+                raise StopIteration()
+            self._stream.wait()
+        return self._queue.popleft()
+
+    def close(self):
+        """Stop consuming the stream."""
+        if not self._closed:
+            self._closed = True
+            self._stream.unsubscribe(self)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.get()
+
+    next = __next__  # Support for Python 2.7.
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class FamilyStream(object):
+    """A stream of readings of a field on a family, obtained by polling.
+
+    Polling is driven by the consumers: when a consumer has no queued readings
+    and the polling period has elapsed the values are read once and the
+    reading is given to every consumer.
+
+    **Attributes:**
+
+    Attributes:
+        key (tuple): The key identifying the stream on its lattice.
+        period (float): The minimum time between readings in seconds.
+
+    .. Private Attributes:
+           _lattice (Lattice): The lattice the values are read from.
+           _sleep (function): The function used to wait.
+           _on_close (function): Called with the stream when it closes.
+           _subscribers (list): The current consumers of the stream.
+           _next_time (float): The earliest time of the next reading.
+           _lock (threading.Lock): Protects the list of consumers.
+    """
+
+    def __init__(self, lattice, key, rate=None, sleep=time.sleep, on_close=None):
+        """
+        Args:
+            lattice (Lattice): The lattice the values are read from.
+            key (tuple): (family, field, handle, units, data_source, throw,
+                          rate, monitor, sleep) identifying the stream.
+            rate (float): The maximum number of readings per second, None for
+                           no limit.
+            sleep (function): The function used to wait; for example
+                               cothread.Sleep when using cothread.
+            on_close (function): Called with the stream when it closes, for
+                                  example by the lattice to forget it.
+
+        **Methods:**
+        """
+        self.key = key
+        self.period = 0.0 if rate is None else 1.0 / rate
+        self._lattice = lattice
+        self._sleep = sleep
+        self._on_close = on_close
+        self._subscribers = []
+        self._next_time = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def family(self):
+        """str: The family of elements in the stream."""
+        return self.key[0]
+
+    @property
+    def field(self):
+        """str: The field of the values in the stream."""
+        return self.key[1]
+
+    def subscribe(self, maxlen=1, policy=DROP_OLDEST):
+        """Add a consumer to the stream.
+
+        Args:
+            maxlen (int): The maximum number of readings held in the queue.
+            policy (str): DROP_OLDEST or DROP_NEWEST.
+
+        Returns:
+            StreamSubscriber: the new consumer.
+        """
+        subscriber = StreamSubscriber(self, maxlen, policy)
+        with self._lock:
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """Remove a consumer, closing the stream if it was the last one.
+
+        Args:
+            subscriber (StreamSubscriber): The consumer to remove.
+        """
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+            last = not self._subscribers
+        if last:
+            self.close()
+
+    def publish(self, values, timestamp=None):
+        """Give a reading to every consumer.
+
+        Args:
+            values (sequence): The values read.
+            timestamp (float): The time of the reading, now if None.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        values = numpy.array(values, dtype=float)
+        values.flags.writeable = False
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.put((timestamp, values))
+
+    def wait(self):
+        """Wait for the next reading, taking it if it is due."""
+        now = time.time()
+        if now < self._next_time:
+            self._sleep(self._next_time - now)
+        else:
+            self._next_time = now + self.period
+            self.update()
+
+    def update(self):
+        """Take a reading and give it to every consumer."""
+        family, field, handle, units, data_source, throw = self.key[:6]
+        values = self._lattice.get_element_values(
+            family, field, handle, units, data_source, throw, dtype=float
+        )
+        self.publish(values)
+
+    def close(self):
+        """Stop the stream."""
+        if self._on_close is not None:
+            self._on_close(self)
+
+
+class MonitorStream(FamilyStream):
+    """A stream of readings of a field on a family, obtained from a monitor
+    subscription on the control system.
+
+    Without a rate every update of any PV gives a new reading; with a rate the
+    latest values are given at most once per period, and only if they have
+    changed.
+
+    .. Private Attributes:
+           _values (numpy.array): The latest engineering values of the PVs.
+           _changed (bool): Whether any PV has updated since the last reading.
+           _subscription (object): The control system subscription.
+    """
+
+    def __init__(
+        self,
+        lattice,
+        key,
+        control_system,
+        pvs,
+        rate=None,
+        sleep=time.sleep,
+        on_close=None,
+    ):
+        """
+        Args:
+            lattice (Lattice): The lattice the values belong to.
+            key (tuple): (family, field, handle, units, data_source, throw,
+                          rate, monitor, sleep) identifying the stream.
+            control_system (ControlSystem): The control system to monitor.
+            pvs (sequence): The PVs to monitor, one per element.
+            rate (float): The maximum number of readings per second, None for
+                           no limit.
+            sleep (function): The function used to wait; for example
+                               cothread.Sleep when using cothread.
+            on_close (function): Called with the stream when it closes.
+        """
+        super(MonitorStream, self).__init__(lattice, key, rate, sleep, on_close)
+        self._values = numpy.full(len(pvs), numpy.nan)
+        self._changed = False
+        self._subscription = control_system.monitor_multiple(pvs, self._on_update)
+
+    def _on_update(self, value, index):
+        """Control system callback for an update of one PV.
+
+        Args:
+            value (object): The new value, None if the PV disconnected.
+            index (int): The position of the PV in the family.
+        """
+        try:
+            self._values[index] = numpy.nan if value is None else value
+        except (TypeError, ValueError):
+            logging.warning("Cannot stream value {0} of {1}.".format(value, self.field))
+            return
+        if self.period == 0.0:
+            self._publish_latest()
+        else:
+            self._changed = True
+
+    def _publish_latest(self):
+        """Give the latest values to every consumer, in the requested units."""
+        family, field, _, units = self.key[:4]
+        values = self._values
+        if units == pytac.PHYS:
+            values = self._lattice.convert_family_values(
+                family, field, values, pytac.ENG, pytac.PHYS
+            )
+        self.publish(values)
+
+    def wait(self):
+        """Wait for the next reading, giving out the latest values if they are
+        due and have changed.
+        """
+        if self.period == 0.0:
+            self._sleep(IDLE_INTERVAL)
+        else:
+            super(MonitorStream, self).wait()
+
+    def update(self):
+        """Give the latest values to every consumer if any have changed."""
+        if self._changed:
+            self._changed = False
+            self._publish_latest()
+
+    def close(self):
+        """Close the monitor subscription and stop the stream."""
+        self._subscription.close()
+        super(MonitorStream, self).close()
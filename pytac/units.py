@@ -3,6 +3,7 @@ import numpy
 from scipy.interpolate import PchipInterpolator
 
 import pytac
+from pytac import instrument
 from pytac.exceptions import UnitsException
 
 
@@ -75,6 +76,12 @@ class UnitConv(object):
         self.lower_limit = None
         self.upper_limit = None
 
+    def __copy__(self):
+        # Faster than the generic copy, as loading a lattice makes many.
+        uc = self.__class__.__new__(self.__class__)
+        uc.__dict__ = self.__dict__.copy()
+        return uc
+
     def __str__(self):
         string_rep = self.__class__.__name__
         if self.name is not None:
@@ -223,6 +230,23 @@ class UnitConv(object):
             UnitsException: If the conversion is invalid; i.e. if there are no
                              solutions, or multiple, within conversion limits.
         """
+        timing_recorder = instrument.recorder
+        if timing_recorder is None:
+            return self._convert(value, origin, target)
+        with timing_recorder.time("UnitConv.convert"):
+            return self._convert(value, origin, target)
+
+    def _convert(self, value, origin, target):
+        """Convert between two different unit types, without instrumentation.
+
+        Args:
+            value (float): the value to be converted
+            origin (str): pytac.ENG or pytac.PHYS
+            target (str): pytac.ENG or pytac.PHYS
+
+        Returns:
+            float: The resulting value.
+        """
         if origin == target:
             return value
         elif origin == pytac.ENG and target == pytac.PHYS:
@@ -275,6 +299,42 @@ class UnitConv(object):
             )
 
 
+class _PolyTable(object):
+    """The coefficients of a polynomial conversion and their poly1d, which is
+    only built when it is first needed.
+
+    The table is shared by all the copies of a PolyUnitConv, so the poly1d is
+    built at most once per table.
+
+    **Attributes:**
+
+    Attributes:
+        coef (array-like): The coefficients, in decreasing powers.
+
+    .. Private Attributes:
+           _poly (poly1d): The polynomial, or None if it has not been built
+                            yet.
+    """
+
+    def __init__(self, coef):
+        """
+        Args:
+            coef (array-like): The coefficients, in decreasing powers.
+
+        **Methods:**
+        """
+        self.coef = coef
+        self._poly = None
+
+    @property
+    def poly(self):
+        """poly1d: The polynomial of the coefficients, built on first access.
+        """
+        if self._poly is None:
+            self._poly = numpy.poly1d(self.coef)
+        return self._poly
+
+
 class PolyUnitConv(UnitConv):
     """Linear interpolation for converting between physics and engineering
     units.
@@ -282,7 +342,9 @@ class PolyUnitConv(UnitConv):
     **Attributes:**
 
     Attributes:
-        p (poly1d): A one-dimensional polynomial of coefficients.
+        p (poly1d): A one-dimensional polynomial of coefficients, built when
+                     it is first used and shared by copies of the unit
+                     conversion.
         name (str): An identifier for the unit conversion object.
         eng_units (str): The unit type of the post conversion engineering
                           value.
@@ -293,6 +355,7 @@ class PolyUnitConv(UnitConv):
                                          initial conversion.
            _pre_phys_to_eng (function): Function to be applied before the
                                          initial conversion.
+           _table (_PolyTable): The coefficients and their polynomial.
     """
 
     def __init__(
@@ -320,7 +383,16 @@ class PolyUnitConv(UnitConv):
         super(self.__class__, self).__init__(
             post_eng_to_phys, pre_phys_to_eng, engineering_units, physics_units, name
         )
-        self.p = numpy.poly1d(coef)
+        self._table = _PolyTable(coef)
+
+    @property
+    def p(self):
+        """poly1d: The polynomial of the coefficients, built on first use."""
+        return self._table.poly
+
+    @p.setter
+    def p(self, p):
+        self._table = _PolyTable(p)
 
     def _raw_eng_to_phys(self, eng_value):
         """Convert between engineering and physics units.
@@ -354,6 +426,46 @@ class PolyUnitConv(UnitConv):
         return valid_roots
 
 
+class _PchipTable(object):
+    """The points of a pchip conversion table and their interpolator, which is
+    only built when it is first needed.
+
+    The table is shared by all the copies of a PchipUnitConv, so the
+    interpolator is built at most once per table.
+
+    **Attributes:**
+
+    Attributes:
+        x (list): The points on the x axis.
+        y (list): The points on the y axis.
+
+    .. Private Attributes:
+           _interpolator (PchipInterpolator): The interpolator, or None if it
+                                               has not been built yet.
+    """
+
+    def __init__(self, x, y):
+        """
+        Args:
+            x (list): The points on the x axis.
+            y (list): The points on the y axis.
+
+        **Methods:**
+        """
+        self.x = x
+        self.y = y
+        self._interpolator = None
+
+    @property
+    def interpolator(self):
+        """PchipInterpolator: The interpolation of the points, built on first
+        access.
+        """
+        if self._interpolator is None:
+            self._interpolator = PchipInterpolator(self.x, self.y)
+        return self._interpolator
+
+
 class PchipUnitConv(UnitConv):
     """Piecewise Cubic Hermite Interpolating Polynomial unit conversion.
 
@@ -366,7 +478,9 @@ class PchipUnitConv(UnitConv):
         y (list): A list of points on the y axis. These must be in increasing
                    or decreasing order. Otherwise, a ValueError is raised.
         pp (PchipInterpolator): A pchip one-dimensional monotonic cubic
-                                 interpolation of points on both x and y axes.
+                                 interpolation of points on both x and y axes,
+                                 built when it is first used and shared by
+                                 copies of the unit conversion.
 
         name (str): An identifier for the unit conversion object.
         eng_units (str): The unit type of the post conversion engineering
@@ -378,6 +492,7 @@ class PchipUnitConv(UnitConv):
                                          initial conversion.
            _pre_phys_to_eng (function): Function to be applied before the
                                          initial conversion.
+           _table (_PchipTable): The points and their interpolator.
     """
 
     def __init__(
@@ -405,27 +520,45 @@ class PchipUnitConv(UnitConv):
             name (str): An identifier for the unit conversion object.
 
         Raises:
-            ValueError: if coefficients are not appropriately monotonic.
+            ValueError: if x and y differ in length, or coefficients are not
+                         finite or not appropriately monotonic.
         """
         super(self.__class__, self).__init__(
             post_eng_to_phys, pre_phys_to_eng, engineering_units, physics_units, name
         )
+        # The interpolator is built lazily, so the points are checked here
+        # rather than by the PchipInterpolator constructor.
+        if len(x) != len(y):
+            raise ValueError(
+                "x and y must have the same number of points ({0} and "
+                "{1}).".format(len(x), len(y))
+            )
+        if not (numpy.isfinite(x).all() and numpy.isfinite(y).all()):
+            raise ValueError("x and y coefficients must be finite.")
         self.x = x
         self.y = y
-        self.pp = PchipInterpolator(x, y)
+        self._table = _PchipTable(x, y)
         # Set conversion limits to PChip bounds if they are not already set.
         if self.lower_limit is None:
             self.lower_limit = self.x[0]
         if self.upper_limit is None:
             self.upper_limit = self.x[-1]
-        # Note that the x coefficients are checked by the PchipInterpolator
-        # constructor.
-        y_diff = numpy.diff(y)
-        if not ((numpy.all(y_diff > 0)) or (numpy.all((y_diff < 0)))):
+        # Tables have few points, so they are compared without numpy.
+        if not all(a < b for a, b in zip(x[:-1], x[1:])):
+            raise ValueError("x coefficients must be strictly increasing.")
+        increasing = all(a < b for a, b in zip(y[:-1], y[1:]))
+        if not (increasing or all(a > b for a, b in zip(y[:-1], y[1:]))):
             raise ValueError(
                 "y coefficients must be monotonically " "increasing or decreasing."
             )
 
+    @property
+    def pp(self):
+        """PchipInterpolator: The interpolation of the points, built on first
+        use.
+        """
+        return self._table.interpolator
+
     def _raw_eng_to_phys(self, eng_value):
         """Convert between engineering and physics units.
 
@@ -53,3 +53,57 @@ def get_mult_rigidity(energy):
         return value * rigidity
 
     return mult_rigidity
+
+
+class Rigidity(object):
+    """The rigidity of the beam at the energy of a lattice.
+
+    One instance is shared by the unit conversions of all the magnets of a
+    lattice, so changing the energy updates every conversion at once. Unlike
+    the functions returned by get_div_rigidity and get_mult_rigidity, its
+    methods can be pickled, and they work element-wise on numpy arrays.
+
+    **Attributes:**
+
+    Attributes:
+        energy (float): The energy of the lattice.
+        value (float): The rigidity at that energy.
+    """
+
+    def __init__(self, energy):
+        """
+        Args:
+            energy (float): the energy of the lattice.
+
+        **Methods:**
+        """
+        self.set_energy(energy)
+
+    def set_energy(self, energy):
+        """Set the energy and recalculate the rigidity.
+
+        Args:
+            energy (float): the energy of the lattice.
+        """
+        self.value = get_rigidity(energy)
+        self.energy = energy
+
+    def div_rigidity(self, value):
+        """
+        Args:
+            value (float): the value to divide, or a numpy array of values.
+
+        Returns:
+            float: the value divided by the rigidity.
+        """
+        return value / self.value
+
+    def mult_rigidity(self, value):
+        """
+        Args:
+            value (float): the value to multiply, or a numpy array of values.
+
+        Returns:
+            float: the value multiplied by the rigidity.
+        """
+        return value * self.value
@@ -40,10 +40,19 @@ def pytest_sessionstart():
             self.ok = errorcode
             self.name = name
 
+    class Timedout(Exception):
+        """A minimal mock of the cothread Timedout exception class.
+        """
+
     cothread = types.ModuleType("cothread")
+    cothread.Sleep = mock.MagicMock()
+    cothread.Spawn = mock.MagicMock()
+    cothread.Timedout = Timedout
     catools = types.ModuleType("catools")
     catools.caget = mock.MagicMock()
     catools.caput = mock.MagicMock()
+    catools.camonitor = mock.MagicMock()
+    catools.connect = mock.MagicMock()
     catools.ca_nothing = ca_nothing
     cothread.catools = catools
 
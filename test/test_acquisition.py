@@ -0,0 +1,56 @@
+import numpy
+import pytest
+
+from pytac.acquisition import RunningStatistics
+
+
+def test_running_statistics_match_numpy():
+    readings = numpy.random.RandomState(0).normal(size=(50, 4))
+    stats = RunningStatistics(4)
+    for reading in readings:
+        stats.add(reading)
+    assert stats.n_readings == 50
+    numpy.testing.assert_equal(stats.count, [50, 50, 50, 50])
+    numpy.testing.assert_allclose(stats.mean, readings.mean(axis=0))
+    numpy.testing.assert_allclose(stats.variance, readings.var(axis=0, ddof=1))
+    numpy.testing.assert_allclose(stats.std, readings.std(axis=0, ddof=1))
+    numpy.testing.assert_equal(stats.min, readings.min(axis=0))
+    numpy.testing.assert_equal(stats.max, readings.max(axis=0))
+    assert stats.samples is None
+
+
+def test_running_statistics_ignore_missing_values():
+    stats = RunningStatistics(2)
+    stats.add([1.0, None])
+    stats.add([3.0, numpy.nan])
+    stats.add([5.0, 2.0])
+    numpy.testing.assert_equal(stats.count, [3, 1])
+    numpy.testing.assert_equal(stats.mean, [3.0, 2.0])
+    numpy.testing.assert_equal(stats.variance, [4.0, numpy.nan])
+    numpy.testing.assert_equal(stats.min, [1.0, 2.0])
+    numpy.testing.assert_equal(stats.max, [5.0, 2.0])
+
+
+def test_running_statistics_without_readings_are_nan():
+    stats = RunningStatistics(1)
+    assert numpy.isnan(stats.mean[0])
+    assert numpy.isnan(stats.variance[0])
+    assert numpy.isnan(stats.min[0])
+
+
+def test_running_statistics_ring_buffer_keeps_latest_readings():
+    stats = RunningStatistics(1, buffer_size=3)
+    stats.add([1])
+    stats.add([2])
+    numpy.testing.assert_equal(stats.samples, [[1], [2]])
+    for value in (3, 4, 5):
+        stats.add([value])
+    numpy.testing.assert_equal(stats.samples, [[3], [4], [5]])
+    assert stats.mean[0] == 3.0
+
+
+def test_running_statistics_raise_errors_correctly():
+    with pytest.raises(ValueError):
+        RunningStatistics(1, buffer_size=-1)
+    with pytest.raises(IndexError):
+        RunningStatistics(2).add([1.0])
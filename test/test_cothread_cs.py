@@ -4,13 +4,15 @@ This module depends on the cothread module being mocked.
 
 See pytest_sessionstart() in conftest.py for more.
 """
-from cothread.catools import caget, caput, ca_nothing
+from cothread import Sleep, Spawn, Timedout
+from cothread.catools import caget, camonitor, caput, ca_nothing, connect
+import mock
 import pytest
 from testfixtures import LogCapture
 
 from constants import RB_PV, SP_PV
 import pytac
-from pytac.cothread_cs import CothreadControlSystem
+from pytac.cothread_cs import AdaptiveTimeout, CothreadControlSystem, RetryPolicy
 
 
 @pytest.fixture
@@ -101,3 +103,196 @@ def test_set_multiple_raises_ValueError_on_input_length_mismatch(cs):
         cs.set_multiple([SP_PV], [42, 6])
     with pytest.raises(ValueError):
         cs.set_multiple([SP_PV, RB_PV], [42])
+
+
+def test_dead_pvs_fail_fast_until_probe_sees_them():
+    cs = CothreadControlSystem(fast_fail=True)
+    caget.side_effect = None
+    camonitor.reset_mock()
+    caget.return_value = [12, ca_nothing(SP_PV, False)]
+    with LogCapture():
+        assert cs.get_multiple([RB_PV, SP_PV], throw=False) == [12, None]
+    assert cs.dead_pvs == {SP_PV}
+    probe_pv, on_probe = camonitor.call_args[0]
+    assert probe_pv == SP_PV
+    caget.return_value = [13]
+    with LogCapture() as log:
+        assert cs.get_multiple([RB_PV, SP_PV], throw=False) == [13, None]
+        assert cs.get_single(SP_PV, throw=False) is None
+        with pytest.raises(pytac.exceptions.ControlSystemException):
+            cs.set_multiple([SP_PV], [1])
+    caget.assert_called_with([RB_PV], throw=False, timeout=1.0)
+    log.check(
+        ("root", "WARNING", "Cannot connect to prefix:sp."),
+        ("root", "WARNING", "Cannot connect to prefix:sp."),
+        ("root", "WARNING", "Cannot connect to prefix:sp."),
+    )
+    on_probe(ca_nothing(SP_PV, False))
+    assert cs.dead_pvs == {SP_PV}
+    on_probe(42)
+    assert cs.dead_pvs == set()
+    camonitor.return_value.close.assert_called_with()
+    caget.return_value = [14, 42]
+    assert cs.get_multiple([RB_PV, SP_PV]) == [14, 42]
+
+
+def test_monitor_disconnection_marks_pv_dead():
+    cs = CothreadControlSystem(fast_fail=True)
+    camonitor.reset_mock()
+    callback = mock.Mock()
+    cs.monitor_multiple([RB_PV, SP_PV], callback)
+    on_update = camonitor.call_args[0][1]
+    with LogCapture():
+        on_update(ca_nothing(SP_PV, False), 1)
+    callback.assert_called_with(None, 1)
+    assert cs.dead_pvs == {SP_PV}
+    on_update(3, 1)
+    callback.assert_called_with(3, 1)
+    assert cs.dead_pvs == set()
+
+
+def test_fast_fail_is_off_by_default(cs):
+    caput.side_effect = None
+    caput.return_value = [ca_nothing(SP_PV, False)]
+    with LogCapture():
+        assert cs.set_multiple([SP_PV], [1], throw=False) == [False]
+    assert cs.dead_pvs == set()
+    caput.return_value = [ca_nothing(SP_PV, True)]
+    assert cs.set_multiple([SP_PV], [1]) is None
+
+
+def test_connect_multiple_connects_in_a_cothread_task():
+    cs = CothreadControlSystem(fast_fail=True)
+    Spawn.reset_mock()
+    connection = cs.connect_multiple([RB_PV, SP_PV])
+    run, function, args = Spawn.call_args[0]
+    assert not connection.done()
+    connect.return_value = [ca_nothing(RB_PV, True), ca_nothing(SP_PV, False)]
+    assert run(function, args) == [SP_PV]
+    connect.assert_called_with([RB_PV, SP_PV], wait=True, timeout=1.0, throw=False)
+    assert connection.done()
+    assert cs.dead_pvs == {SP_PV}
+    Spawn.return_value.Wait.return_value = [SP_PV]
+    assert connection.result(5.0) == [SP_PV]
+    Spawn.return_value.Wait.assert_called_with(5.0)
+    Spawn.return_value.Wait.side_effect = Timedout()
+    with pytest.raises(pytac.exceptions.ControlSystemException):
+        connection.result(0.1)
+    Spawn.return_value.Wait.side_effect = None
+
+
+def test_adaptive_timeout_follows_latency():
+    timeouts = AdaptiveTimeout(min_timeout=0.1, max_timeout=2.0, initial=1.0)
+    assert timeouts.get_timeout(["fast", "slow"]) == 1.0
+    timeouts.observe(["fast"], 0.01)
+    assert timeouts.get_timeout(["fast"]) == 0.1
+    timeouts.observe(["slow"], 0.2)
+    assert timeouts.get_timeout(["slow"]) == pytest.approx(0.6)
+    timeouts.observe(["slow"], 0.2)
+    assert timeouts.get_timeout(["slow"]) == pytest.approx(0.5)
+    assert timeouts.get_timeout(["fast", "slow"]) == pytest.approx(0.5)
+    assert timeouts.get_timeout(["fast", "new"]) == 1.0
+    timeouts.observe_failure(["slow"], 0.5)
+    assert timeouts.get_timeout(["slow"]) == pytest.approx(1.3)
+    timeouts.observe_failure(["slow"], 1.3)
+    assert timeouts.get_timeout(["slow"]) == 2.0
+    assert timeouts.get_timeout([]) == 1.0
+    with pytest.raises(ValueError):
+        AdaptiveTimeout(min_timeout=1.0, max_timeout=0.5)
+
+
+def test_adaptive_timeout_is_used_for_calls():
+    timeouts = AdaptiveTimeout(min_timeout=0.1, max_timeout=2.0)
+    cs = CothreadControlSystem(adaptive_timeout=timeouts)
+    caget.side_effect = None
+    caget.return_value = [1, 2]
+    cs.get_multiple([RB_PV, SP_PV])
+    caget.assert_called_with([RB_PV, SP_PV], throw=False, timeout=1.0)
+    cs.get_multiple([RB_PV, SP_PV])
+    caget.assert_called_with([RB_PV, SP_PV], throw=False, timeout=0.1)
+    caput.side_effect = ca_nothing(SP_PV, False)
+    with LogCapture():
+        cs.set_single(SP_PV, 1, throw=False)
+    caput.side_effect = None
+    cs.set_single(SP_PV, 1)
+    assert caput.call_args[1]["timeout"] == pytest.approx(0.2, abs=0.01)
+
+
+def test_adaptive_timeout_starts_from_the_control_system_timeout():
+    cs = CothreadControlSystem(timeout=0.3, adaptive_timeout=AdaptiveTimeout())
+    caget.side_effect = None
+    caget.return_value = 1
+    cs.get_single(RB_PV)
+    caget.assert_called_with(RB_PV, throw=True, timeout=0.3)
+    timeouts = AdaptiveTimeout(initial=0.5)
+    CothreadControlSystem(timeout=0.3, adaptive_timeout=timeouts)
+    assert timeouts.get_timeout([SP_PV]) == 0.5
+    assert AdaptiveTimeout(max_timeout=2.0).get_timeout([SP_PV]) == 2.0
+
+
+def test_failures_in_a_batch_do_not_inflate_timeouts_of_live_pvs():
+    timeouts = AdaptiveTimeout(min_timeout=0.1, max_timeout=2.0)
+    cs = CothreadControlSystem(adaptive_timeout=timeouts)
+    caget.side_effect = None
+    caget.return_value = [1, 2]
+    cs.get_multiple([RB_PV, SP_PV])
+    caget.return_value = [1, ca_nothing(SP_PV, False)]
+    with mock.patch("pytac.cothread_cs.time") as mock_time, LogCapture():
+        mock_time.time.side_effect = [0.0, 2.0]
+        cs.get_multiple([RB_PV, SP_PV], throw=False)
+    assert timeouts.get_timeout([RB_PV]) == 0.1
+    assert timeouts.get_timeout([SP_PV]) == pytest.approx(0.2, abs=0.01)
+
+
+def test_retry_policy_delays():
+    policy = RetryPolicy(attempts=4, backoff=0.1, multiplier=2.0, jitter=0.0)
+    assert [policy.get_delay(retry) for retry in (1, 2, 3)] == [0.1, 0.2, 0.4]
+    policy = RetryPolicy(backoff=1.0, jitter=0.5, seed=1)
+    delays = [policy.get_delay(1) for _ in range(20)]
+    assert all(0.5 <= delay <= 1.5 for delay in delays)
+    assert len(set(delays)) == 20
+    with pytest.raises(ValueError):
+        RetryPolicy(attempts=0)
+    with pytest.raises(ValueError):
+        RetryPolicy(jitter=2.0)
+
+
+def test_only_failed_pvs_are_retried_and_merged_in_order():
+    policy = RetryPolicy(attempts=3, backoff=0.1, jitter=0.0)
+    cs = CothreadControlSystem(fast_fail=True, retry_policy=policy)
+    Sleep.reset_mock()
+    caget.side_effect = [
+        [ca_nothing("a", False), 2, ca_nothing("c", False)],
+        [1, ca_nothing("c", False)],
+        [3],
+    ]
+    assert cs.get_multiple(["a", "b", "c"]) == [1, 2, 3]
+    assert [c[0][0] for c in caget.call_args_list[-3:]] == [
+        ["a", "b", "c"],
+        ["a", "c"],
+        ["c"],
+    ]
+    assert [c[0][0] for c in Sleep.call_args_list] == [0.1, 0.2]
+    assert cs.dead_pvs == set()
+    caput.side_effect = [
+        [ca_nothing("a", True), ca_nothing("b", False)],
+        [ca_nothing("b", False)],
+        [ca_nothing("b", False)],
+    ]
+    with LogCapture() as log:
+        assert cs.set_multiple(["a", "b"], [1, 2], throw=False) == [True, False]
+    caput.assert_called_with(["b"], [2], throw=False, timeout=1.0)
+    caput.side_effect = None
+    log.check(("root", "WARNING", "Cannot connect to b."))
+    assert cs.dead_pvs == {"b"}
+
+
+def test_single_calls_are_retried():
+    cs = CothreadControlSystem(fast_fail=True, retry_policy=RetryPolicy(attempts=2))
+    caget.side_effect = [ca_nothing("a", False), 5]
+    assert cs.get_single("a") == 5
+    caget.side_effect = ca_nothing("a", False)
+    assert cs.get_single("a", throw=False) is None
+    assert caget.call_count >= 4
+    assert cs.dead_pvs == {"a"}
+    caget.side_effect = None
@@ -90,5 +90,7 @@ def test_device_is_enabled_returns_bool_value(device_creation_function):
 def test_PvEnabler(mock_cs):
     pve = PvEnabler("enable-pv", 40, mock_cs)
     assert pve
+    assert pve.pv == "enable-pv"
+    assert EpicsDevice("device", mock_cs, pve, RB_PV).enabler_pv == "enable-pv"
     mock_cs.get_single.return_value = 50
     assert not pve
@@ -1,9 +1,12 @@
 import mock
 import numpy
 import pytest
+from testfixtures import LogCapture
 
 from constants import DUMMY_ARRAY, RB_PV, SP_PV
 import pytac
+from pytac.device import EpicsDevice, PvEnabler
+from pytac.memory_cs import InMemoryControlSystem
 
 
 def test_get_values_live(simple_epics_lattice, mock_cs):
@@ -129,3 +132,69 @@ def test_element_get_pv_name_raises_exceptions(simple_epics_element):
 def test_create_EpicsDevice_raises_DataSourceException_if_no_PVs_are_given():
     with pytest.raises(pytac.exceptions.DataSourceException):
         pytac.device.EpicsDevice("device_1", "a_control_system")
+
+
+def test_acquire_element_values_uses_batch_reads(simple_epics_lattice, mock_cs):
+    mock_cs.get_multiple.side_effect = [[1.0], [2.0], [6.0]]
+    stats = simple_epics_lattice.acquire_element_values("family", "x", 3)
+    assert mock_cs.get_multiple.call_count == 3
+    mock_cs.get_multiple.assert_called_with([RB_PV], True)
+    numpy.testing.assert_equal(stats.mean, [3.0])
+    numpy.testing.assert_equal(stats.min, [1.0])
+    numpy.testing.assert_equal(stats.max, [6.0])
+
+
+def test_connect_collects_pvs_of_families(simple_epics_lattice, mock_cs):
+    element = simple_epics_lattice[0]
+    mock_cs.connect_multiple.return_value.result.return_value = [SP_PV]
+    connection = simple_epics_lattice.connect(["family"], timeout=2.0)
+    mock_cs.connect_multiple.assert_called_with([RB_PV, SP_PV], 2.0)
+    assert simple_epics_lattice.connection is connection
+    assert connection.report() == {SP_PV: [(element, "x"), (element, "y")]}
+    simple_epics_lattice.connect(["other"])
+    mock_cs.connect_multiple.assert_called_with([], None)
+    connection = simple_epics_lattice.connect()
+    assert connection.report()[SP_PV][0] == (simple_epics_lattice, "x")
+
+
+def test_lookup_pv_finds_users_of_readback_setpoint_and_enabler_pvs(
+    simple_epics_lattice, mock_cs, unit_uc
+):
+    element = simple_epics_lattice[0]
+    assert simple_epics_lattice.lookup_pv(RB_PV) == [
+        (simple_epics_lattice, "x", pytac.RB),
+        (simple_epics_lattice, "y", pytac.SP),
+        (element, "x", pytac.RB),
+        (element, "y", pytac.SP),
+    ]
+    assert simple_epics_lattice.lookup_pv("unknown") == []
+    enabler = PvEnabler("enable-pv", 1, mock_cs)
+    device = EpicsDevice("z_device", mock_cs, enabler, rb_pv="Z:RB")
+    element.add_device("z", device, unit_uc)
+    assert simple_epics_lattice.lookup_pvs(["Z:RB", "enable-pv"]) == [
+        [(element, "z", pytac.RB)],
+        [(element, "z", None)],
+    ]
+
+
+def test_get_values_masked_skips_conversion_of_failures():
+    cs = InMemoryControlSystem.from_csv("VMX", value=1.0)
+    lattice = pytac.load_csv.load("VMX", cs)
+    pvs = lattice.get_element_pv_names("HSTR", "x_kick", pytac.RB)
+    cs.fail(pvs[1:2])
+    with LogCapture():
+        values = lattice.get_element_values(
+            "HSTR", "x_kick", units=pytac.PHYS, throw=False, masked=True
+        )
+    assert isinstance(values, numpy.ma.MaskedArray)
+    assert values.dtype == numpy.float64
+    assert list(values.mask[:3]) == [False, True, False]
+    uc = lattice.get_elements("HSTR")[0].get_unitconv("x_kick")
+    assert values[0] == uc.eng_to_phys(1.0)
+    assert values.count() == len(pvs) - 1
+    with LogCapture():
+        values = lattice.get_element_values(
+            "HSTR", "x_kick", throw=False, dtype=numpy.int32, masked=True
+        )
+    assert values.dtype == numpy.int32
+    assert values[0] == 1
@@ -0,0 +1,89 @@
+import mock
+import pytest
+
+import pytac
+from pytac import instrument
+from pytac.instrument import InstrumentedControlSystem, TimingRecorder
+from pytac.memory_cs import InMemoryControlSystem
+
+
+@pytest.fixture
+def recorder():
+    yield instrument.enable()
+    instrument.disable()
+
+
+@pytest.fixture(scope="module")
+def instrumented_ring():
+    cs = InMemoryControlSystem.from_csv("VMX", value=1.0)
+    return pytac.load_csv.load("VMX", InstrumentedControlSystem(cs))
+
+
+def test_disabled_by_default(instrumented_ring):
+    assert instrument.recorder is None
+    instrumented_ring.get_element_values("HSTR", "x_kick", units=pytac.PHYS)
+    assert instrument.disable() is None
+
+
+def test_bulk_operations_are_recorded_per_family(instrumented_ring, recorder):
+    n_hstr = len(instrumented_ring.get_elements("HSTR"))
+    instrumented_ring.get_element_values("HSTR", "x_kick", units=pytac.PHYS)
+    instrumented_ring.set_element_values("HSTR", "x_kick", [1.0] * n_hstr)
+    report = recorder.get_report()
+    assert report[("Lattice.get_element_values", "HSTR")].pvs == n_hstr
+    assert report[("ControlSystem.get_multiple", "HSTR")].calls == 1
+    assert report[("ControlSystem.get_multiple", "HSTR")].pvs == n_hstr
+    assert report[("UnitConv.convert", "HSTR")].calls == n_hstr
+    assert report[("Lattice.set_element_values", "HSTR")].calls == 1
+    assert report[("ControlSystem.set_multiple", "HSTR")].pvs == n_hstr
+    assert recorder.current_family is None
+
+
+def test_element_values_are_recorded_outside_families(instrumented_ring, recorder):
+    element = instrumented_ring.get_elements("HSTR")[0]
+    element.get_value("x_kick", units=pytac.PHYS)
+    element.set_value("x_kick", 0.0, units=pytac.ENG)
+    report = recorder.get_report()
+    assert report[("DataSourceManager.get_value", None)].calls == 1
+    assert report[("DataSourceManager.set_value", None)].calls == 1
+    assert report[("ControlSystem.get_single", None)].calls == 1
+    assert report[("ControlSystem.set_single", None)].calls == 1
+
+
+def test_instrumented_cs_can_use_its_own_recorder():
+    own_recorder = TimingRecorder()
+    control_system = InstrumentedControlSystem(mock.Mock(), own_recorder)
+    control_system.get_multiple(["pv1", "pv2"])
+    assert instrument.recorder is None
+    stats = own_recorder.get_report()[("ControlSystem.get_multiple", None)]
+    assert (stats.calls, stats.pvs) == (1, 2)
+    own_recorder.reset()
+    assert own_recorder.get_report() == {}
+
+
+def test_statistics_and_histogram():
+    timing_recorder = TimingRecorder()
+    with timing_recorder.family("BPM"):
+        timing_recorder.add("op", 2e-6, 3)
+        timing_recorder.add("op", 0.5, 3)
+        timing_recorder.add("op", 20.0)
+    stats = timing_recorder.get_report()[("op", "BPM")]
+    assert (stats.calls, stats.pvs) == (3, 7)
+    assert stats.min == 2e-6
+    assert stats.max == 20.0
+    assert stats.mean == pytest.approx(20.500002 / 3)
+    assert stats.histogram[1] == 1
+    assert stats.histogram[12] == 1
+    assert stats.histogram[-1] == 1
+    assert sum(stats.histogram) == 3
+
+
+def test_format_report():
+    timing_recorder = TimingRecorder()
+    timing_recorder.add("op", 0.002, 4, family="BPM")
+    timing_recorder.add("other", 0.001)
+    lines = timing_recorder.format_report(histograms=True).splitlines()
+    assert lines[0].split()[:4] == ["operation", "family", "calls", "pvs"]
+    assert lines[2].split() == ["op", "BPM", "1", "4", "2.000", "2000.0", "2000.0"]
+    assert lines[3].split() == ["<=0.003s:1"]
+    assert lines[4].split()[:2] == ["other", "-"]
@@ -13,6 +13,10 @@ def test_ControlSystem_throws_NotImplementedError():
         test_cs.set_single("dummy", 1, "throw")
     with pytest.raises(NotImplementedError):
         test_cs.set_multiple(["dummy_1", "dummy_2"], [1, 2], "throw")
+    with pytest.raises(NotImplementedError):
+        test_cs.monitor_multiple(["dummy_1", "dummy_2"], lambda value, index: None)
+    with pytest.raises(NotImplementedError):
+        test_cs.connect_multiple(["dummy_1", "dummy_2"], None)
 
 
 def test_DataSource_throws_NotImplementedError():
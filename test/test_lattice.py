@@ -1,11 +1,17 @@
+import os
+
 import mock
 import numpy
 import pytest
 
-from constants import DUMMY_ARRAY, LATTICE_NAME
+from constants import CURRENT_DIR, DUMMY_ARRAY, LATTICE_NAME
 import pytac
+from pytac.data_source import DeviceDataSource
+from pytac.device import EpicsDevice
 from pytac.element import Element
-from pytac.lattice import Lattice
+from pytac.lattice import Lattice, LatticeView
+from pytac.memory_cs import InMemoryControlSystem
+from pytac.units import NullUnitConv
 
 
 def test_create_lattice():
@@ -44,6 +50,18 @@ def test_lattice_cell_properties():
     assert lat.cell_bounds == [1, 4, 5]
 
 
+def test_lattice_cell_properties_follow_symmetry_and_lengths():
+    lat = Lattice("", 2)
+    for i in range(5):
+        lat.add_element(Element(0.5, "DRIFT"))
+    lat.symmetry = 5
+    assert lat.cell_bounds == [1, 2, 3, 4, 5, 5]
+    assert [e.cell for e in lat] == [1, 2, 3, 4, 5]
+    lat[0].length = 2.0
+    assert lat.cell_bounds == [1, 2, 3, 5, 5]
+    assert [e.cell for e in lat] == [1, 3, 4, 4, 5]
+
+
 def test_get_element_devices(simple_lattice):
     devices = simple_lattice.get_element_devices("family", "x")
     assert len(devices) == 1
@@ -168,6 +186,15 @@ def test_get_element_values_returns_numpy_array_if_requested(
     numpy.testing.assert_equal(values, expected)
 
 
+def test_get_element_values_masks_failures(simple_lattice):
+    device = simple_lattice.get_element_devices("family", "x")[0]
+    device.get_value.return_value = None
+    values = simple_lattice.get_element_values(
+        "family", "x", pytac.RB, pytac.PHYS, throw=False, masked=True
+    )
+    assert values.mask.tolist() == [True]
+
+
 def test_set_element_values(simple_lattice):
     simple_lattice.set_element_values("family", "x", [1])
     simple_lattice.get_element_devices("family", "x")[0].set_value.assert_called_with(
@@ -203,6 +230,101 @@ def test_get_family_s(simple_lattice):
     assert simple_lattice.get_family_s("family") == [0, 0, 1.0, 3.5]
 
 
+def test_positions_follow_changes_to_elements(lattice):
+    quad = lattice.get_elements("quad")[0]
+    assert (quad.index, quad.s) == (2, 1.0)
+    lattice[0].length = 2.0
+    assert lattice.get_family_s("quad") == [2.0]
+    quad.add_to_family("new_family")
+    assert lattice.get_family_s("new_family") == [2.0]
+    lattice.add_element(Element(0.5, "BPM"))
+    assert lattice[-1].s == pytest.approx(3.6)
+
+
+def test_family_queries_follow_family_changes_after_a_query(lattice):
+    assert lattice.get_elements("quad") == [lattice[1]]
+    assert lattice.get_family_s("quad") == [1.0]
+    lattice[2].add_to_family("quad")
+    assert lattice.get_elements("quad") == [lattice[1], lattice[2]]
+    assert lattice.get_family_s("quad") == [1.0, 1.5]
+    lattice[1].remove_from_family("quad")
+    assert lattice.get_elements("quad") == [lattice[2]]
+    assert lattice.get_family_s("quad") == [1.5]
+    with pytest.raises(ValueError):
+        lattice[1].remove_from_family("quad")
+
+
+def test_get_element_by_name(lattice):
+    assert lattice.get_element("q1") is lattice[1]
+    assert lattice.get_elements_by_name(["s1", "d1"]) == [lattice[2], lattice[0]]
+    lattice[2].name = "d1"
+    lattice.add_element(Element(0.1, "BPM"))
+    with pytest.raises(ValueError):
+        lattice.get_element("d1")
+    assert lattice.get_elements_by_name(["d1"]) == [lattice[0], lattice[2]]
+    with pytest.raises(ValueError):
+        lattice.get_element("s1")
+    with pytest.raises(ValueError):
+        lattice.get_elements_by_name(["q1", "s1"])
+    with pytest.raises(ValueError):
+        lattice.get_element(None)
+
+
+def test_elements_with_field_follow_added_devices(lattice):
+    assert lattice.get_element_fields() == set(["b1", "b2"])
+    assert lattice.get_elements_with_field("b1") == [lattice[1]]
+    assert lattice.get_element_devices("quad", "b1")[0].rb_pv == "Q1:RB"
+    device = EpicsDevice("S1", mock.MagicMock(), rb_pv="S1:B1")
+    lattice[2].add_device("b1", device, NullUnitConv())
+    assert lattice.get_elements_with_field("b1") == [lattice[1], lattice[2]]
+    assert lattice.get_elements_with_field("b1", "sext") == [lattice[2]]
+    assert lattice.get_element_devices("sext", "b1") == [device]
+    assert lattice.get_element_pv_names("sext", "b1", pytac.RB) == ["S1:B1"]
+    with pytest.raises(ValueError):
+        lattice.get_elements_with_field("x")
+
+
+def test_device_indexes_follow_devices_added_out_of_order(lattice):
+    quad_device = lattice.get_element_devices("quad", "b1")[0]
+    assert lattice.get_elements_with_field("b1") == [lattice[1]]
+    device = EpicsDevice("D1", mock.MagicMock(), rb_pv="D1:B1")
+    lattice[0].add_device("b1", device, NullUnitConv())
+    assert lattice.get_elements_with_field("b1") == [lattice[0], lattice[1]]
+    assert lattice.get_element_devices("quad", "b1") == [quad_device]
+    lattice[0].add_to_family("quad")
+    assert lattice.get_element_devices("quad", "b1") == [device, quad_device]
+    new_device = EpicsDevice("Q1", mock.MagicMock(), rb_pv="Q1:NEW")
+    lattice[1].add_device("b1", new_device, NullUnitConv())
+    assert lattice.get_element_devices("quad", "b1") == [device, new_device]
+    assert lattice.lookup_pv("Q1:NEW") == [(lattice[1], "b1", pytac.RB)]
+    lattice[0].length = 2.0
+    assert lattice.get_element_devices("quad", "b1") == [device, new_device]
+    assert lattice.get_family_s("quad") == [0.0, 2.0]
+
+
+def test_elements_between(lattice):
+    assert lattice.elements_between(1.0, 1.8) == lattice[1:3]
+    assert lattice.elements_between(0.5, 1.0) == []
+    assert lattice.elements_between(0.0, 2.0, "quad") == [lattice[1]]
+    assert lattice.elements_between([0.0, 1.5], [1.0, 10.0]) == [
+        lattice[:1],
+        lattice[2:],
+    ]
+    with pytest.raises(ValueError):
+        lattice.elements_between(0.0, 1.0, "not_a_family")
+
+
+def test_nearest(lattice):
+    assert lattice.nearest(1.6) is lattice[2]
+    assert lattice.nearest(-1.0) is lattice[0]
+    assert lattice.nearest(10.0) is lattice[3]
+    assert lattice.nearest(0.5) is lattice[0]
+    assert lattice.nearest(10.0, "quad") is lattice[1]
+    assert lattice.nearest([1.7, 0.9]) == [lattice[3], lattice[1]]
+    with pytest.raises(ValueError):
+        Lattice("empty").nearest(1.0)
+
+
 def test_get_default_arguments(simple_lattice):
     assert simple_lattice.get_default_units() == pytac.ENG
     assert simple_lattice.get_default_data_source() == pytac.LIVE
@@ -231,6 +353,10 @@ def test_convert_family_values(simple_lattice):
         "family", "y", [12], pytac.ENG, pytac.PHYS
     )
     assert post_values == [24]
+    post_values = simple_lattice.convert_family_values(
+        "family", "y", [None], pytac.ENG, pytac.PHYS
+    )
+    assert post_values == [None]
     post_values = simple_lattice.convert_family_values(
         "family", "y", [12], pytac.ENG, pytac.ENG
     )
@@ -248,3 +374,122 @@ def test_convert_family_values_length_mismatch_raises_IndexError(simple_lattice)
         )
     with pytest.raises(IndexError):
         simple_lattice.convert_family_values("family", "x", [], pytac.ENG, pytac.PHYS)
+
+
+def test_acquire_element_values(simple_lattice):
+    stats = simple_lattice.acquire_element_values("family", "x", 4, buffer_size=2)
+    assert stats.n_readings == 4
+    numpy.testing.assert_equal(stats.mean, DUMMY_ARRAY)
+    numpy.testing.assert_equal(stats.samples, [DUMMY_ARRAY, DUMMY_ARRAY])
+    with pytest.raises(ValueError):
+        simple_lattice.acquire_element_values("family", "x", 0)
+
+
+def test_diff_of_identical_lattices_is_empty(vmx_ring):
+    diff = vmx_ring.diff(vmx_ring)
+    assert not diff
+    assert (diff.removed, diff.inserted, diff.changed) == ([], [], [])
+
+
+def test_diff_of_a_saved_and_reloaded_lattice_is_empty(tmpdir, vmx_ring):
+    vmx_ring.save(str(tmpdir))
+    reloaded = pytac.load_csv.load("VMX", mock.MagicMock(), str(tmpdir), 24)
+    assert not vmx_ring.diff(reloaded)
+
+
+def rebuild(lattice, elements):
+    """Make a lattice with the devices of the given lattice and the given
+    elements, which are moved to the new lattice.
+    """
+    rebuilt = Lattice(lattice.name, lattice.symmetry)
+    rebuilt.set_data_source(DeviceDataSource(), pytac.LIVE)
+    for field in lattice.get_fields()[pytac.LIVE]:
+        device = lattice.get_device(field)
+        rebuilt.add_device(field, device, lattice.get_unitconv(field))
+    for element in elements:
+        rebuilt.add_element(element)
+    return rebuilt
+
+
+def test_diff_aligns_unnamed_elements_around_a_removal_and_an_insertion(vmx_ring):
+    elements = pytac.load_csv.load("VMX", mock.MagicMock(), symmetry=24)[:]
+    del elements[100]
+    inserted = Element(0.5, "DRIFT")
+    elements.insert(1500, inserted)
+    diff = vmx_ring.diff(rebuild(vmx_ring, elements))
+    assert [e.index for e in diff.removed] == [101]
+    assert diff.inserted == [inserted]
+    assert diff.changed == []
+
+
+def test_diff_finds_removed_inserted_and_changed_elements(lattice):
+    cs = mock.MagicMock()
+    other = pytac.load_csv.load("dummy", cs, os.path.join(CURRENT_DIR, "data"), 2)
+    other[0].length = 1.5
+    other[1].add_device("b1", EpicsDevice("Q1", cs, rb_pv="Q1:RB2"), NullUnitConv())
+    other.add_element(Element(0.1, "BPM", "b1"))
+    other.add_device("x", EpicsDevice("X", cs, rb_pv="X:RB"), NullUnitConv())
+    other = rebuild(other, other[:2] + other[3:])
+    diff = lattice.diff(other)
+    assert diff
+    assert diff.removed == [lattice[2]]
+    assert diff.inserted == [other[-1]]
+    assert [(e.index, o.index) for e, o, _ in diff.changed] == [(1, 1), (2, 2)]
+    assert diff.changed[0][2] == {"length": (1.0, 1.5)}
+    assert diff.changed[1][2]["devices"] == {
+        "b1": (("EpicsDevice", "Q1:RB", "Q1:SP"), ("EpicsDevice", "Q1:RB2", None))
+    }
+    assert diff.lattice_differences["devices"] == {
+        "x": (None, ("EpicsDevice", "X:RB", None))
+    }
+    assert "unitconvs" in diff.lattice_differences
+
+
+def test_view_by_key_cell_and_s_range(vmx_ring):
+    view = vmx_ring.view(slice(10, 20))
+    assert view.lattice is vmx_ring
+    assert list(view) == vmx_ring[10:20]
+    assert (len(view), view[0], view[-1]) == (10, vmx_ring[10], vmx_ring[19])
+    assert list(vmx_ring.view([5, 2])) == [vmx_ring[5], vmx_ring[2]]
+    assert vmx_ring.view(cell=3).get_elements() == vmx_ring.get_elements(cell=3)
+    view = vmx_ring.view(s_range=(10.0, 20.0))
+    assert view.get_family_s("BPM") == [
+        s for s in vmx_ring.get_family_s("BPM") if 10.0 <= s < 20.0
+    ]
+    assert view.get_all_families() <= vmx_ring.get_all_families()
+    with pytest.raises(ValueError):
+        view.get_elements("not_a_family")
+    with pytest.raises(ValueError):
+        vmx_ring.view()
+    with pytest.raises(ValueError):
+        vmx_ring.view(slice(0, 2), cell=1)
+    with pytest.raises(ValueError):
+        Lattice("no_cells").view(cell=1)
+
+
+def test_slicing_a_view_gives_a_view_of_its_elements(vmx_ring):
+    view = vmx_ring.view(slice(10, 20))[0:3]
+    assert isinstance(view, LatticeView)
+    assert view.lattice is vmx_ring
+    assert list(view) == vmx_ring[10:13]
+    view = vmx_ring.view([5, 2, 7, 9])[::-2]
+    assert list(view) == [vmx_ring[9], vmx_ring[2]]
+    assert list(view[1:]) == [vmx_ring[2]]
+    assert len(vmx_ring.view(slice(0, 4))[4:]) == 0
+
+
+def test_view_bulk_operations_act_only_on_its_elements():
+    cs = mock.Mock(wraps=InMemoryControlSystem.from_csv("VMX", value=1.0))
+    lattice = pytac.load_csv.load("VMX", cs, symmetry=24)
+    view = lattice.view(cell=2)
+    bpms = view.get_elements("BPM")
+    assert 0 < len(bpms) < len(lattice.get_elements("BPM"))
+    pvs = [bpm.get_pv_name("x", pytac.RB) for bpm in bpms]
+    assert view.get_element_values("BPM", "x") == [1.0] * len(bpms)
+    cs.get_multiple.assert_called_once_with(pvs, True)
+    hstrs = view.get_elements("HSTR")
+    view.set_element_values("HSTR", "x_kick", [2.0] * len(hstrs))
+    assert cs.set_multiple.call_count == 1
+    values = lattice.get_element_values("HSTR", "x_kick")
+    in_view = [e in hstrs for e in lattice.get_elements("HSTR")]
+    assert [value == 2.0 for value in values] == in_view
@@ -1,8 +1,22 @@
+import gc
+import os
+import tracemalloc
+
 from mock import patch
 import pytest
 
 import pytac
-from pytac.load_csv import load
+from pytac.element import Element
+from pytac.lattice import Lattice
+from pytac.load_csv import (
+    DEFAULT_UC,
+    get_lattice_tables,
+    load,
+    load_modes,
+    load_poly_unitconv,
+    read_columns,
+)
+from pytac.memory_cs import InMemoryControlSystem
 
 
 @pytest.fixture
@@ -69,3 +83,167 @@ def test_families_loaded(lattice):
         ["drift", "sext", "quad", "ds", "qf", "qs", "sd"]
     )
     assert lattice.get_elements("quad")[0].families == set(["quad", "qf", "qs"])
+
+
+def test_load_connects_families():
+    cs = InMemoryControlSystem.from_csv("VMX")
+    cs.fail(["SR01C-DI-EBPM-01:SA:X"])
+    lat = load("VMX", cs, connect=["BPM"])
+    unreachable = lat.connection.report(timeout=1.0)
+    assert list(unreachable) == ["SR01C-DI-EBPM-01:SA:X"]
+    assert unreachable["SR01C-DI-EBPM-01:SA:X"] == [(lat.get_elements("BPM")[0], "x")]
+    assert load("VMX", cs).connection is None
+    assert load("VMX", cs, connect=True).connection.pvs[0] == "SR-DI-DCCT-01:SIGNAL"
+
+
+def test_read_columns(tmpdir):
+    filename = str(tmpdir.join("table.csv"))
+    with open(filename, "w") as f:
+        f.write("uc_id,val,units\n2,1.5,m\n1,2.5,\n")
+    data = read_columns(filename, {"uc_id": int, "val": float})
+    assert list(data) == ["uc_id", "val", "units"]
+    assert data["uc_id"].dtype == int
+    assert data["val"].tolist() == [1.5, 2.5]
+    assert data["units"].tolist() == ["m", ""]
+    with open(filename, "w") as f:
+        f.write("uc_id,coeff,val\n")
+    data = read_columns(filename, {"uc_id": int})
+    assert len(data["uc_id"]) == 0
+    assert load_poly_unitconv(filename) == {}
+
+
+def test_poly_coefficients_are_grouped_highest_order_first(tmpdir):
+    filename = str(tmpdir.join("poly.csv"))
+    with open(filename, "w") as f:
+        f.write("uc_id,coeff,val\n3,0,1.0\n1,0,5.0\n3,1,2.0\n1,1,6.0\n")
+    unitconvs = load_poly_unitconv(filename)
+    assert sorted(unitconvs) == [1, 3]
+    assert list(unitconvs[1].p.coeffs) == [6.0, 5.0]
+    assert list(unitconvs[3].p.coeffs) == [2.0, 1.0]
+
+
+def test_saved_lattice_loads_the_same(tmpdir):
+    cs = InMemoryControlSystem.from_csv("VMX", value=1.0)
+    lattice = load("VMX", cs)
+    lattice.save(str(tmpdir), mode="VMX2")
+    saved = load("VMX2", cs, str(tmpdir))
+    assert [(e.name, e.type_, e.length, e.families) for e in saved] == [
+        (e.name, e.type_, e.length, e.families) for e in lattice
+    ]
+    assert saved.get_element_pv_names("BPM", "x", pytac.RB) == (
+        lattice.get_element_pv_names("BPM", "x", pytac.RB)
+    )
+    assert saved.get_element_values("QUAD", "b1", units=pytac.PHYS) == (
+        lattice.get_element_values("QUAD", "b1", units=pytac.PHYS)
+    )
+    assert saved.get_unitconv("energy").phys_units == (
+        lattice.get_unitconv("energy").phys_units
+    )
+    # Identical conversion tables are only saved once.
+    data_dir = os.path.join(os.path.dirname(pytac.__file__), "data")
+    original = read_columns(os.path.join(data_dir, "VMX", "uc_pchip_data.csv"))
+    tables = read_columns(str(tmpdir.join("VMX2", "uc_pchip_data.csv")))
+    assert len(set(tables["uc_id"])) < len(set(original["uc_id"]))
+
+
+def test_save_raises_for_unsupported_unitconvs_and_formats(tmpdir, lattice):
+    with pytest.raises(ValueError):
+        lattice.save(str(tmpdir), format="xml")
+    lattice[0].set_unitconv("a1", pytac.units.UnitConv())
+    with pytest.raises(pytac.exceptions.UnitsException):
+        lattice.save(str(tmpdir))
+
+
+def test_load_modes_shares_identical_parts():
+    cs = InMemoryControlSystem.from_csv("VMX")
+    lattices = load_modes(["VMX", "VMXSP"], cs)
+    assert list(lattices) == ["VMX", "VMXSP"]
+    vmx, vmxsp = lattices.values()
+    bpm, bpm_sp = vmx.get_elements("BPM")[0], vmxsp.get_elements("BPM")[0]
+    assert bpm is not bpm_sp
+    assert bpm.get_device("x") is bpm_sp.get_device("x")
+    assert bpm.get_device("x").rb_pv is bpm_sp.get_device("x").rb_pv
+    quad, quad_sp = vmx.get_elements("QUAD")[0], vmxsp.get_elements("QUAD")[0]
+    uc, uc_sp = quad.get_unitconv("b1"), quad_sp.get_unitconv("b1")
+    assert uc is not uc_sp
+    assert uc.pp is uc_sp.pp
+    # Each lattice keeps its own energy.
+    vmx.set_value("energy", 6000, units=pytac.PHYS)
+    assert vmxsp.rigidity.energy == 3000
+    assert uc.eng_to_phys(70) == pytest.approx(uc_sp.eng_to_phys(70) / 2, 1e-6)
+
+
+def test_each_field_has_its_own_unit_conversion():
+    lattice = load("VMX", InMemoryControlSystem())
+    ucs = [quad.get_unitconv("b1") for quad in lattice.get_elements("QUAD")]
+    limits = [uc.get_conversion_limits() for uc in ucs[1:]]
+    ucs[0].set_conversion_limits(0, 1)
+    assert [uc.get_conversion_limits() for uc in ucs[1:]] == limits
+    assert len(set(map(id, ucs))) == len(ucs)
+
+
+def test_load_modes_gives_each_element_its_own_fields_and_families():
+    cs = InMemoryControlSystem.from_csv("VMX")
+    vmx, vmxsp = load_modes(["VMX", "VMXSP"], cs).values()
+    bpm, bpm_sp = vmx.get_elements("BPM")[0], vmxsp.get_elements("BPM")[0]
+    assert bpm.families is not bpm_sp.families
+    assert bpm._data_source_manager._uc is not bpm_sp._data_source_manager._uc
+    null_uc = pytac.units.NullUnitConv()
+    bpm.add_device("extra", pytac.device.BasicDevice(1.0), DEFAULT_UC)
+    bpm.set_unitconv("x", null_uc)
+    bpm.add_to_family("extra_family")
+    assert "extra" in bpm.get_fields()[pytac.LIVE]
+    assert "extra" not in bpm_sp.get_fields()[pytac.LIVE]
+    assert bpm.get_unitconv("x") is null_uc
+    assert bpm_sp.get_unitconv("x") is not null_uc
+    assert vmx.get_elements("extra_family") == [bpm]
+    assert "extra_family" not in bpm_sp.families
+    assert bpm.get_device("x") is bpm_sp.get_device("x")
+
+
+def _allocated(function):
+    """Call a function and measure the memory still allocated once it returns.
+
+    Returns:
+        tuple: (result, size) where size is in bytes.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = function()
+        gc.collect()
+        return result, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def test_load_modes_takes_less_memory_than_separate_loads():
+    cs = InMemoryControlSystem.from_csv("VMX")
+    load("VMX", cs)
+    one = _allocated(lambda: load("VMX", cs))[1]
+    both = _allocated(lambda: load_modes(["VMX", "VMXSP"], cs))[1]
+    separate = _allocated(lambda: [load("VMX", cs), load("VMXSP", cs)])[1]
+    assert both < 1.9 * one
+    assert both < 0.95 * separate
+
+
+def test_saved_tables_keep_unique_ids():
+    lattice = Lattice("ids")
+    ucs = [
+        pytac.units.PolyUnitConv([1.0, 0.0], name=7),
+        pytac.units.PolyUnitConv([2.0, 0.0], name=3),
+        pytac.units.PolyUnitConv([2.0, 0.0], name=4),
+        pytac.units.PolyUnitConv([3.0, 0.0]),
+        pytac.units.PchipUnitConv([1.0, 2.0], [1.0, 2.0], name=5),
+        pytac.units.PolyUnitConv([4.0, 0.0], name=5),
+        pytac.units.PchipUnitConv([1.0, 2.0], [3.0, 4.0], name=2),
+    ]
+    for uc in ucs:
+        e = Element(1.0, "magnet")
+        e.set_unitconv("b1", uc)
+        lattice.add_element(e)
+    tables = get_lattice_tables(lattice)
+    # Merged, unnamed and clashing tables are numbered after the largest id.
+    assert tables["unitconv.csv"]["uc_id"].tolist() == [7, 8, 8, 9, 10, 11, 2]
+    assert tables["uc_poly_data.csv"]["uc_id"].tolist() == [7, 7, 8, 8, 9, 9, 11, 11]
+    assert tables["uc_pchip_data.csv"]["uc_id"].tolist() == [10, 10, 2, 2]
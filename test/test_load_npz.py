@@ -0,0 +1,89 @@
+import os
+
+import mock
+import numpy
+import pytest
+
+import pytac
+from pytac import load_npz
+from pytac.memory_cs import InMemoryControlSystem
+
+
+CURRENT_DIR = os.path.dirname(__file__)
+
+
+@pytest.fixture
+def dummy_file(tmpdir):
+    filename = str(tmpdir.join("dummy.npz"))
+    load_npz.convert_csv("dummy", filename, os.path.join(CURRENT_DIR, "data"))
+    return filename
+
+
+def test_dummy_lattice_loaded(dummy_file):
+    lattice = load_npz.load(dummy_file, mock.MagicMock(), symmetry=2)
+    assert lattice.name == "dummy"
+    assert len(lattice) == 4
+    assert lattice.get_length() == 2.6
+    quad = lattice.get_elements("quad")[0]
+    assert quad.s == 1.0
+    assert quad.families == set(["quad", "qf", "qs"])
+    assert quad.get_pv_name(field="b1", handle=pytac.RB) == "Q1:RB"
+    assert quad.get_pv_name(field="b1", handle=pytac.SP) == "Q1:SP"
+    assert lattice.get_value("s_position") == [0.0, 1.0, 1.5, 1.8]
+
+
+def test_loaded_lattice_matches_csv(tmpdir):
+    filename = str(tmpdir.join("VMX.npz"))
+    load_npz.convert_csv("VMX", filename)
+    cs = InMemoryControlSystem.from_csv("VMX", value=1.0)
+    expected = pytac.load_csv.load("VMX", cs)
+    lattice = load_npz.load(filename, cs, connect=["BPM"])
+    assert lattice.connection.report() == {}
+    assert [(e.name, e.type_, e.length, e.families) for e in lattice] == [
+        (e.name, e.type_, e.length, e.families) for e in expected
+    ]
+    assert lattice.get_value("s_position") == expected.get_value("s_position")
+    for family, field in [("BPM", "x"), ("QUAD", "b1"), ("HSTR", "x_kick")]:
+        assert lattice.get_element_pv_names(
+            family, field, pytac.RB
+        ) == expected.get_element_pv_names(family, field, pytac.RB)
+        numpy.testing.assert_allclose(
+            lattice.get_element_values(family, field, units=pytac.PHYS),
+            expected.get_element_values(family, field, units=pytac.PHYS),
+        )
+    uc = lattice.get_elements("QUAD")[0].get_unitconv("b1")
+    assert uc.get_conversion_limits() == [0.0, 200.0]
+    assert uc._post_eng_to_phys == lattice.rigidity.div_rigidity
+
+
+def test_fields_have_their_own_unit_conversions_sharing_tables(tmpdir):
+    filename = str(tmpdir.join("VMX.npz"))
+    load_npz.convert_csv("VMX", filename)
+    lattice = load_npz.load(filename, mock.MagicMock())
+    quads = lattice.get_elements("QUAD")
+    ucs = [quad.get_unitconv("b1") for quad in quads]
+    assert len(set(map(id, ucs))) == len(quads)
+    same_table = [uc for uc in ucs if uc.name == ucs[0].name]
+    assert len(same_table) > 1
+    assert all(uc._table is ucs[0]._table for uc in same_table)
+    limits = [uc.get_conversion_limits() for uc in same_table[1:]]
+    ucs[0].set_conversion_limits(0, 1)
+    assert [uc.get_conversion_limits() for uc in same_table[1:]] == limits
+
+
+def test_load_raises_ValueError_for_other_files(tmpdir):
+    filename = str(tmpdir.join("other.npz"))
+    numpy.savez(filename, values=numpy.zeros(3))
+    with pytest.raises(ValueError):
+        load_npz.load(filename, mock.MagicMock())
+
+
+def test_saved_lattice_loads_the_same(tmpdir, dummy_file):
+    lattice = load_npz.load(dummy_file, mock.MagicMock())
+    lattice.save(str(tmpdir), format="npz", mode="saved")
+    saved = load_npz.load(str(tmpdir.join("saved.npz")), mock.MagicMock())
+    assert saved.name == "saved"
+    assert [(e.name, e.length, e.families) for e in saved] == [
+        (e.name, e.length, e.families) for e in lattice
+    ]
+    assert saved.get_element_pv_names("quad", "b1", pytac.SP) == ["Q1:SP"]
@@ -2,13 +2,16 @@
     files in the data directory. These are more like integration tests,
     and allows us to check that the pytac setup is working correctly.
 """
+import pickle
 import re
 
 import mock
 import numpy
 import pytest
+from testfixtures import LogCapture
 
 import pytac
+from pytac.memory_cs import InMemoryControlSystem
 
 
 EPS = 1e-8
@@ -184,6 +187,35 @@ def test_quad_unitconv(vmx_ring):
         numpy.testing.assert_allclose(uc.phys_to_eng(-0.691334652255027), 70)
 
 
+def test_setting_energy_updates_magnet_unitconvs():
+    lattice = get_lattice("VMX")
+    quads = lattice.get_elements("QUAD")
+    before = [q.get_unitconv("b1").eng_to_phys(70) for q in quads]
+    lattice.set_value("energy", 6000, units=pytac.PHYS)
+    assert lattice.rigidity.energy == 6000
+    ratio = pytac.utils.get_rigidity(3000) / pytac.utils.get_rigidity(6000)
+    after = [q.get_unitconv("b1").eng_to_phys(70) for q in quads]
+    numpy.testing.assert_allclose(after, numpy.multiply(before, ratio))
+    uc = pickle.loads(pickle.dumps(quads[0].get_unitconv("b1")))
+    numpy.testing.assert_allclose(uc.eng_to_phys(70), after[0])
+    lattice.set_value("energy", 3.0e9, units=pytac.ENG)
+    assert lattice.rigidity.energy == 3000
+
+
+def test_failed_energy_set_leaves_rigidity_unchanged():
+    cs = InMemoryControlSystem({"SR-ENERGY": 3.0e9})
+    lattice = pytac.load_csv.load("VMX", cs)
+    energy = pytac.device.EpicsDevice("energy", cs, sp_pv="SR-ENERGY")
+    lattice.add_device("energy", energy, lattice.get_unitconv("energy"))
+    cs.fail(["SR-ENERGY"])
+    with LogCapture():
+        lattice.set_value("energy", 6000, units=pytac.PHYS, throw=False)
+    assert lattice.rigidity.energy == 3000
+    cs.restore()
+    lattice.set_value("energy", 6000, units=pytac.PHYS)
+    assert lattice.rigidity.energy == 6000
+
+
 def test_quad_unitconv_raise_exception():
     uc = pytac.units.PchipUnitConv([50.0, 100.0, 180.0], [-4.95, -9.85, -17.56])
     with pytest.raises(pytac.exceptions.UnitsException):
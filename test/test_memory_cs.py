@@ -0,0 +1,114 @@
+import threading
+
+import mock
+import pytest
+from testfixtures import LogCapture
+
+import pytac
+from pytac.memory_cs import InMemoryControlSystem
+
+
+@pytest.fixture
+def cs():
+    return InMemoryControlSystem(
+        {"pv1": 1.0, "pv2": 2.0, "sp": 0.0, "rb": 0.0}, {"sp": "rb"}
+    )
+
+
+def test_get_and_set_values(cs):
+    assert cs.get_single("pv1") == 1.0
+    assert cs.get_multiple(["pv1", "pv2"]) == [1.0, 2.0]
+    assert cs.set_single("pv1", 3.0) is True
+    assert cs.set_multiple(["pv1", "sp"], [4.0, 5.0]) is None
+    assert cs.get_values() == {"pv1": 4.0, "pv2": 2.0, "sp": 5.0, "rb": 5.0}
+
+
+def test_failures_follow_throw(cs):
+    cs.fail(["pv2"])
+    with pytest.raises(pytac.exceptions.ControlSystemException):
+        cs.get_multiple(["pv1", "pv2"])
+    with LogCapture() as log:
+        assert cs.get_multiple(["pv1", "pv2"], throw=False) == [1.0, None]
+        assert cs.set_multiple(["pv1", "pv2"], [0, 0], throw=False) == [True, False]
+        assert cs.get_single("unknown_pv", throw=False) is None
+        assert cs.set_single("pv2", 0, throw=False) is False
+    log.check(
+        ("root", "WARNING", "Cannot connect to pv2."),
+        ("root", "WARNING", "Cannot connect to pv2."),
+        ("root", "WARNING", "Cannot connect to unknown_pv."),
+        ("root", "WARNING", "Cannot connect to pv2."),
+    )
+    with pytest.raises(pytac.exceptions.ControlSystemException):
+        cs.set_single("pv2", 0)
+    cs.restore(["pv2"])
+    assert cs.get_single("pv2") == 2.0
+    cs.fail(["pv1", "pv2"])
+    cs.restore()
+    assert cs.get_multiple(["pv1", "pv2"]) == [0, 2.0]
+    with pytest.raises(ValueError):
+        cs.set_multiple(["pv1"], [1, 2])
+
+
+def test_latency_is_per_call_plus_slowest_pv():
+    sleep = mock.Mock()
+    cs = InMemoryControlSystem(
+        {"pv1": 0, "pv2": 0}, latency=0.1, pv_latency={"pv2": 0.5}, sleep=sleep
+    )
+    cs.get_single("pv1")
+    sleep.assert_called_with(0.1)
+    cs.get_multiple(["pv1", "pv2"])
+    sleep.assert_called_with(0.6)
+
+
+def test_latency_of_a_call_without_pvs():
+    sleep = mock.Mock()
+    cs = InMemoryControlSystem(
+        {"pv1": 0}, latency=0.1, pv_latency={"pv1": 0.5}, sleep=sleep
+    )
+    assert cs.get_multiple([]) == []
+    sleep.assert_called_with(0.1)
+
+
+def test_monitors(cs):
+    callback = mock.Mock()
+    subscription = cs.monitor_multiple(["pv1", "rb"], callback)
+    callback.assert_has_calls([mock.call(1.0, 0), mock.call(0.0, 1)])
+    cs.set_single("sp", 7.0)
+    callback.assert_called_with(7.0, 1)
+    subscription.close()
+    cs.set_single("pv1", 8.0)
+    assert callback.call_count == 3
+
+
+def test_concurrent_access(cs):
+    def worker():
+        for i in range(200):
+            cs.set_multiple(["pv1", "pv2"], [i, i])
+            cs.get_multiple(["pv1", "pv2"])
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cs.get_multiple(["pv1", "pv2"]) == [199, 199]
+
+
+def test_from_csv_preloads_device_pvs():
+    cs = InMemoryControlSystem.from_csv("VMX", value=1.5)
+    lattice = pytac.load_csv.load("VMX", cs)
+    values = lattice.get_element_values("BPM", "x", dtype=float)
+    assert len(values) == 173
+    assert (values == 1.5).all()
+    lattice.set_element_values(
+        "HSTR", "x_kick", [2.0] * len(lattice.get_elements("HSTR"))
+    )
+    kicks = lattice.get_element_values("HSTR", "x_kick", pytac.RB, dtype=float)
+    assert (kicks == 2.0).all()
+
+
+def test_connect_reports_failing_pvs(cs):
+    cs.fail(["pv2"])
+    connection = cs.connect_multiple(["pv1", "pv2", "unknown_pv"])
+    assert connection.done()
+    assert connection.result() == ["pv2", "unknown_pv"]
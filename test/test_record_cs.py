@@ -0,0 +1,147 @@
+import gzip
+import json
+import os
+
+import mock
+import numpy
+import pytest
+
+import pytac
+from pytac.record_cs import ReplayControlSystem, RecordingControlSystem, read_records
+
+
+@pytest.fixture
+def record_file(tmpdir):
+    return os.path.join(str(tmpdir), "calls.rec.gz")
+
+
+@pytest.fixture
+def recorded(record_file):
+    cs = mock.MagicMock()
+    cs.get_single.return_value = 1.0
+    cs.get_multiple.side_effect = [[2.0, numpy.arange(3)], [3.0, None]]
+    cs.set_multiple.return_value = [True, False]
+    with RecordingControlSystem(cs, record_file) as recording_cs:
+        assert recording_cs.get_single("pv1") == 1.0
+        recording_cs.get_multiple(["pv1", "pv2"])
+        recording_cs.get_multiple(["pv1", "pv2"], throw=False)
+        assert recording_cs.set_multiple(["pv1", "pv2"], [4, 5], False) == [True, False]
+        cs.get_single.side_effect = pytac.exceptions.ControlSystemException
+        with pytest.raises(pytac.exceptions.ControlSystemException):
+            recording_cs.get_single("pv3")
+    cs.get_multiple.assert_called_with(["pv1", "pv2"], False)
+    return record_file
+
+
+def test_recording_writes_every_call(recorded):
+    records = read_records(recorded)
+    assert [r.operation for r in records] == [
+        "get_single",
+        "get_multiple",
+        "get_multiple",
+        "set_multiple",
+        "get_single",
+    ]
+    assert records[0].pvs == ["pv1"]
+    assert records[0].results == [1.0]
+    numpy.testing.assert_equal(records[1].results[1], [0, 1, 2])
+    assert records[3].values == [4, 5]
+    assert records[4].results is None
+    assert records[4].error is not None
+    assert all(r.duration >= 0 for r in records)
+
+
+def test_record_file_holds_json_lines(recorded):
+    with gzip.open(recorded, "rb") as f:
+        lines = [json.loads(line.decode("utf-8")) for line in f]
+    assert lines[0][:2] == ["pytac-cs-record", 2]
+    assert lines[1][1:5] == ["get_single", ["pv1"], None, [1.0]]
+    array = read_records(recorded)[1].results[1]
+    assert isinstance(array, numpy.ndarray)
+    assert array.dtype == numpy.arange(3).dtype
+
+
+def test_replay_serves_recorded_values_in_order(recorded):
+    cs = ReplayControlSystem(recorded)
+    assert cs.get_single("pv1") == 1.0
+    values = cs.get_multiple(["pv1", "pv2"], throw=False)
+    assert values[0] == 2.0
+    numpy.testing.assert_equal(values[1], [0, 1, 2])
+    assert cs.get_multiple(["pv1", "pv2"], throw=False) == [3.0, None]
+    # Values start again from the beginning once they run out.
+    assert cs.get_multiple(["pv1", "pv2"])[0] == 1.0
+    assert cs.get_single("pv1") == 2.0
+    assert cs.get_single("unknown_pv", throw=False) is None
+    with pytest.raises(pytac.exceptions.ControlSystemException):
+        cs.get_single("pv3")
+
+
+def test_replay_without_loop_fails_when_values_run_out(recorded):
+    cs = ReplayControlSystem(recorded, loop=False)
+    numpy.testing.assert_equal(cs.get_single("pv2"), [0, 1, 2])
+    assert cs.get_single("pv2", throw=False) is None
+    with pytest.raises(pytac.exceptions.ControlSystemException):
+        cs.get_single("pv2")
+
+
+def test_replay_serves_recorded_set_results(recorded):
+    cs = ReplayControlSystem(recorded)
+    assert cs.set_multiple(["pv1", "pv2"], [0, 0], throw=False) == [True, False]
+    with pytest.raises(pytac.exceptions.ControlSystemException):
+        cs.set_single("pv2", 0)
+    assert cs.set_single("unknown_pv", 0) is True
+    with pytest.raises(ValueError):
+        cs.set_multiple(["pv1"], [1, 2])
+
+
+def test_replay_reproduces_recorded_set_failures(record_file):
+    cs = mock.MagicMock()
+    cs.set_single.side_effect = pytac.exceptions.ControlSystemException
+    cs.set_multiple.side_effect = pytac.exceptions.ControlSystemException
+    with RecordingControlSystem(cs, record_file) as recording_cs:
+        with pytest.raises(pytac.exceptions.ControlSystemException):
+            recording_cs.set_single("pv1", 1)
+        with pytest.raises(pytac.exceptions.ControlSystemException):
+            recording_cs.set_multiple(["pv1", "pv2"], [1, 2])
+    records = read_records(record_file)
+    assert records[0].results == [False]
+    assert records[1].results == [False, False]
+    replay_cs = ReplayControlSystem(record_file)
+    with pytest.raises(pytac.exceptions.ControlSystemException):
+        replay_cs.set_single("pv1", 1)
+    assert replay_cs.set_multiple(["pv1", "pv2"], [1, 2], False) == [False, False]
+
+
+def test_single_calls_record_one_result(record_file):
+    cs = mock.MagicMock()
+    cs.get_single.return_value = [1.0, 2.0]
+    cs.set_multiple.return_value = None
+    with RecordingControlSystem(cs, record_file) as recording_cs:
+        assert recording_cs.get_single("pv1") == [1.0, 2.0]
+        recording_cs.set_multiple(["pv1", "pv2"], [1, 2])
+    records = read_records(record_file)
+    assert records[0].results == [[1.0, 2.0]]
+    assert records[1].results == [True, True]
+    assert ReplayControlSystem(record_file).get_single("pv1") == [1.0, 2.0]
+
+
+def test_replay_without_loop_fails_when_set_results_run_out(recorded):
+    cs = ReplayControlSystem(recorded, loop=False)
+    assert cs.set_single("pv1", 0) is True
+    assert cs.set_single("pv1", 0, throw=False) is False
+    assert cs.set_single("unknown_pv", 0) is True
+
+
+def test_replay_reproduces_latency(recorded):
+    sleep = mock.Mock()
+    cs = ReplayControlSystem(recorded, reproduce_latency=True, sleep=sleep)
+    cs.get_multiple(["pv1", "pv2"])
+    durations = [r.duration for r in read_records(recorded)[1:3]]
+    assert sleep.call_args[0][0] in durations
+
+
+def test_read_records_raises_ValueError_for_other_files(record_file):
+    with open(record_file, "wb") as f:
+        f.write(b"not a record")
+    with pytest.raises(ValueError):
+        read_records(record_file)
@@ -0,0 +1,74 @@
+import json
+import os
+
+import numpy
+import pytest
+
+from constants import RB_PV
+import pytac
+from pytac.recorder import FlightRecorder, dump_flight_record, read_flight_record
+
+
+@pytest.fixture
+def recorder(simple_epics_lattice, tmpdir):
+    filename = os.path.join(str(tmpdir), "record.ring")
+    return FlightRecorder(simple_epics_lattice, [("family", "x")], filename, 3)
+
+
+def test_recorder_header(recorder):
+    header, timestamps, values = read_flight_record(recorder.filename)
+    assert header["capacity"] == 3
+    assert header["row_width"] == 2
+    assert header["units"] == pytac.ENG
+    assert header["channels"] == [
+        {"family": "family", "field": "x", "size": 1, "pvs": [RB_PV], "units": [""]}
+    ]
+    assert timestamps.shape == (0,)
+    assert values.shape == (0, 1)
+
+
+def test_recorder_keeps_latest_rows(recorder, mock_cs):
+    for i in range(5):
+        mock_cs.get_multiple.return_value = [float(i)]
+        recorder.record(timestamp=100.0 + i)
+    assert recorder.n_rows == 5
+    _, timestamps, values = read_flight_record(recorder.filename)
+    numpy.testing.assert_equal(timestamps, [102.0, 103.0, 104.0])
+    numpy.testing.assert_equal(values, [[2.0], [3.0], [4.0]])
+    assert os.path.getsize(recorder.filename) < 1024
+
+
+def test_recorder_records_failures_as_nan(recorder, mock_cs):
+    mock_cs.get_multiple.return_value = [None]
+    recorder.record()
+    mock_cs.get_multiple.assert_called_with([RB_PV], False)
+    _, _, values = read_flight_record(recorder.filename)
+    assert numpy.isnan(values[0, 0])
+
+
+def test_recorder_run_records_at_rate(recorder):
+    recorder.run(rate=1000, duration=0.0035, sleep=lambda seconds: None)
+    assert 3 <= recorder.n_rows <= 5
+
+
+def test_recorder_dump(recorder, tmpdir):
+    recorder.record(timestamp=1.0)
+    dump_filename = os.path.join(str(tmpdir), "dump.npz")
+    recorder.dump(dump_filename)
+    recorder.close()
+    dump = numpy.load(dump_filename)
+    numpy.testing.assert_equal(dump["timestamps"], [1.0])
+    assert json.loads(str(dump["header"]))["lattice"] == "lattice"
+    dump_flight_record(recorder.filename, dump_filename)
+
+
+def test_recorder_raises_errors_correctly(simple_epics_lattice, tmpdir):
+    filename = os.path.join(str(tmpdir), "record.ring")
+    with pytest.raises(ValueError):
+        FlightRecorder(simple_epics_lattice, [("family", "x")], filename, 0)
+    with pytest.raises(ValueError):
+        FlightRecorder(simple_epics_lattice, [], filename, 1)
+    with open(filename, "wb") as f:
+        f.write(b"not a ring file")
+    with pytest.raises(ValueError):
+        read_flight_record(filename)
@@ -0,0 +1,112 @@
+import collections
+
+import mock
+import numpy
+import pytest
+
+from constants import DUMMY_VALUE_1, RB_PV
+import pytac
+from pytac.stream import DROP_NEWEST, DROP_OLDEST, StreamSubscriber
+
+
+def test_polling_stream_is_shared_between_consumers(simple_epics_lattice, mock_cs):
+    consumer1 = simple_epics_lattice.stream("family", "x", maxlen=2)
+    consumer2 = simple_epics_lattice.stream("family", "x", maxlen=2)
+    assert len(simple_epics_lattice._streams) == 1
+    timestamp, values = next(consumer1)
+    assert mock_cs.get_multiple.call_count == 1
+    numpy.testing.assert_equal(values, [DUMMY_VALUE_1])
+    assert not values.flags.writeable
+    assert next(consumer2) == (timestamp, values)
+    assert mock_cs.get_multiple.call_count == 1
+    mock_cs.get_multiple.assert_called_with([RB_PV], True)
+
+
+def test_stream_is_removed_when_last_consumer_closes(simple_epics_lattice):
+    consumer1 = simple_epics_lattice.stream("family", "x")
+    consumer2 = simple_epics_lattice.stream("family", "x")
+    consumer1.close()
+    assert len(simple_epics_lattice._streams) == 1
+    with consumer2:
+        pass
+    assert simple_epics_lattice._streams == {}
+    with pytest.raises(StopIteration):
+        next(consumer2)
+
+
+def test_consumers_with_different_wait_functions_do_not_share(simple_epics_lattice):
+    sleep1, sleep2 = mock.Mock(), mock.Mock()
+    consumer1 = simple_epics_lattice.stream("family", "x", rate=0.001, sleep=sleep1)
+    consumer2 = simple_epics_lattice.stream("family", "x", rate=0.001, sleep=sleep2)
+    assert len(simple_epics_lattice._streams) == 2
+    family_stream = consumer2._stream
+    sleep2.side_effect = lambda seconds: setattr(family_stream, "_next_time", 0.0)
+    next(consumer2)
+    next(consumer2)
+    assert sleep2.called and not sleep1.called
+    consumer1.close()
+    consumer2.close()
+    assert simple_epics_lattice._streams == {}
+
+
+def test_polling_stream_waits_for_rate(simple_epics_lattice, mock_cs):
+    sleep = mock.Mock()
+    consumer = simple_epics_lattice.stream("family", "x", rate=0.001, sleep=sleep)
+    next(consumer)
+    family_stream = consumer._stream
+    sleep.side_effect = lambda seconds: setattr(family_stream, "_next_time", 0.0)
+    next(consumer)
+    sleep.assert_called_once()
+    assert 999 < sleep.call_args[0][0] <= 1000
+    assert mock_cs.get_multiple.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "policy, expected", ((DROP_OLDEST, [2.0, 3.0]), (DROP_NEWEST, [1.0, 2.0]))
+)
+def test_subscriber_queue_policy(policy, expected):
+    subscriber = StreamSubscriber(mock.Mock(), maxlen=2, policy=policy)
+    for value in (1.0, 2.0, 3.0):
+        subscriber.put((0.0, value))
+    assert [subscriber.get()[1] for _ in range(2)] == expected
+    assert subscriber.dropped == 1
+
+
+def test_subscriber_raises_ValueError_for_invalid_arguments():
+    with pytest.raises(ValueError):
+        StreamSubscriber(mock.Mock(), maxlen=0)
+    with pytest.raises(ValueError):
+        StreamSubscriber(mock.Mock(), policy="not_a_policy")
+
+
+def test_monitor_stream_publishes_updates(simple_epics_lattice, mock_cs):
+    consumer = simple_epics_lattice.stream("family", "x", monitor=True, maxlen=3)
+    assert mock_cs.monitor_multiple.call_args[0][0] == [RB_PV]
+    callback = mock_cs.monitor_multiple.call_args[0][1]
+    callback(5.0, 0)
+    callback(None, 0)
+    numpy.testing.assert_equal(next(consumer)[1], [5.0])
+    numpy.testing.assert_equal(next(consumer)[1], [numpy.nan])
+    mock_cs.get_multiple.assert_not_called()
+    consumer.close()
+    mock_cs.monitor_multiple.return_value.close.assert_called_once_with()
+
+
+def test_monitor_stream_with_rate_publishes_only_changes(simple_epics_lattice, mock_cs):
+    consumer = simple_epics_lattice.stream("family", "x", rate=1e6, monitor=True)
+    family_stream = consumer._stream
+    callback = mock_cs.monitor_multiple.call_args[0][1]
+    family_stream.update()
+    assert consumer._queue == collections.deque()
+    callback(3.0, 0)
+    callback(4.0, 0)
+    numpy.testing.assert_equal(next(consumer)[1], [4.0])
+
+
+def test_monitor_stream_raises_DataSourceException_correctly(
+    simple_epics_lattice, simple_lattice
+):
+    with pytest.raises(pytac.exceptions.DataSourceException):
+        simple_epics_lattice.stream("family", "x", monitor=True, data_source=pytac.SIM)
+    with pytest.raises(pytac.exceptions.DataSourceException):
+        simple_lattice.stream("family", "x", monitor=True)
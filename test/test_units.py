@@ -1,3 +1,4 @@
+import copy
 import mock
 import numpy
 import pytest
@@ -172,6 +173,36 @@ def test_PchipInterpolator_raises_ValueError_if_y_not_monotonic():
         PchipUnitConv([1, 2, 3], [1, 3, 2])
 
 
+def test_PchipInterpolator_raises_ValueError_if_x_and_y_lengths_differ():
+    with pytest.raises(ValueError):
+        PchipUnitConv([1, 2, 3], [1, 2])
+
+
+def test_PchipInterpolator_raises_ValueError_if_coefficients_not_finite():
+    with pytest.raises(ValueError):
+        PchipUnitConv([1, 2, float("inf")], [1, 2, 3])
+    with pytest.raises(ValueError):
+        PchipUnitConv([1, 2, 3], [1, 2, float("nan")])
+
+
+def test_PchipUnitConv_builds_interpolator_on_first_use_and_shares_it():
+    pchip_uc = PchipUnitConv([1, 3, 5], [1, 3, 6])
+    copied_uc = copy.copy(pchip_uc)
+    assert pchip_uc._table._interpolator is None
+    assert copied_uc.eng_to_phys(3) == 3
+    assert pchip_uc._table._interpolator is not None
+    assert pchip_uc.pp is copied_uc.pp
+
+
+def test_PolyUnitConv_builds_polynomial_on_first_use_and_shares_it():
+    poly_uc = PolyUnitConv([2, 0])
+    copied_uc = copy.copy(poly_uc)
+    assert poly_uc._table._poly is None
+    assert copied_uc.eng_to_phys(3) == 6
+    assert poly_uc._table._poly is not None
+    assert poly_uc.p is copied_uc.p
+
+
 def test_PchipUnitConv_with_solution_outside_bounds_raises_UnitsException():
     # This is a linear relationship, but the root is 0, outside of the
     # range of measurements.
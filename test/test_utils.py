@@ -21,3 +21,15 @@ def test_get_mult_rigidity():
     assert isinstance(mult, types.FunctionType)
     numpy.testing.assert_almost_equal(mult(numpy.pi), 31437675.329275224)
     numpy.testing.assert_almost_equal(mult(1.0e-8), 0.10006922855944561)
+
+
+def test_Rigidity():
+    rigidity = utils.Rigidity(3.0e9)
+    numpy.testing.assert_almost_equal(rigidity.div_rigidity(1.0e8), 9.993081933333334)
+    numpy.testing.assert_almost_equal(
+        rigidity.mult_rigidity(numpy.array([numpy.pi, 1.0e-8])),
+        [31437675.329275224, 0.10006922855944561],
+    )
+    rigidity.set_energy(6.0e9)
+    assert rigidity.energy == 6.0e9
+    assert rigidity.value == utils.get_rigidity(6.0e9)